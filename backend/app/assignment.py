@@ -2,14 +2,14 @@ from __future__ import annotations
 
 import datetime as dt
 import math
-import re
 from dataclasses import dataclass
-from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, update
 from sqlalchemy.orm import Session
 
-from .models import Manager, Office, RoutingState
+from .models import Manager
+from .routing_counters import next_counter_value, reserve_counter_values
+from .routing_index import OfficeEntry, RoutingIndex, _norm_text, get_routing_index
 
 
 @dataclass(frozen=True)
@@ -18,14 +18,6 @@ class AssignmentResult:
     office_id: int | None
 
 
-def _norm_text(value: str) -> str:
-    return re.sub(r"[^a-zа-я0-9]+", "", (value or "").strip().lower())
-
-
-def _skills_set(skills_raw: str) -> set[str]:
-    return {item.strip().upper() for item in (skills_raw or "").split(",") if item.strip()}
-
-
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     radius_km = 6371.0
     dlat = math.radians(lat2 - lat1)
@@ -39,31 +31,11 @@ def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return 2 * radius_km * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def _get_toggle(session: Session, key: str) -> int:
-    state = session.get(RoutingState, key)
-    if state is None:
-        state = RoutingState(key=key, value_int=0)
-        session.add(state)
-        session.flush()
-    return state.value_int
-
-
-def _set_toggle(session: Session, key: str, value: int) -> None:
-    state = session.get(RoutingState, key)
-    if state is None:
-        state = RoutingState(key=key, value_int=value)
-        session.add(state)
-    else:
-        state.value_int = value
-
-
 def _pick_round_robin(session: Session, key: str, items: list[int]) -> int:
     if len(items) == 1:
         return items[0]
-    toggle = _get_toggle(session, key)
-    picked = items[toggle % len(items)]
-    _set_toggle(session, key, toggle + 1)
-    return picked
+    toggle = next_counter_value(session, key)
+    return items[toggle % len(items)]
 
 
 def _is_spam(state: dict[str, object]) -> bool:
@@ -111,38 +83,27 @@ def _requires_head_specialist_for_data_change(state: dict[str, object]) -> bool:
     return ticket_type in {"сменаданных", "datachange"}
 
 
-def _office_total_load(managers: Iterable[Manager], office_id: int) -> int:
-    return sum(m.active_tickets for m in managers if m.office_id == office_id)
-
-
-def _find_5050_offices(session: Session) -> list[Office]:
-    offices = session.scalars(select(Office)).all()
-    by_norm = {_norm_text(office.name): office for office in offices}
+def _find_5050_offices(index: RoutingIndex) -> list[OfficeEntry]:
+    by_norm = {office.name_norm: office for office in index.offices()}
     astana = by_norm.get("астана")
     almaty = by_norm.get("алматы")
     items = [office for office in [astana, almaty] if office is not None]
     return items
 
 
-def _pick_office_5050(session: Session) -> int | None:
-    offices = _find_5050_offices(session)
+def _pick_office_5050(session: Session, index: RoutingIndex) -> int | None:
+    offices = _find_5050_offices(index)
     if not offices:
         return None
     ids = [office.id for office in offices]
     return _pick_round_robin(session, "office_rr_astana_almaty", ids)
 
 
-def _city_candidate_offices(offices: list[Office], city: str) -> list[Office]:
+def _city_candidate_offices(offices: list[OfficeEntry], city: str) -> list[OfficeEntry]:
     city_norm = _norm_text(city)
     if not city_norm:
         return []
-    candidates = []
-    for office in offices:
-        office_name = _norm_text(office.name)
-        office_address = _norm_text(office.address)
-        if city_norm and (city_norm in office_name or city_norm in office_address):
-            candidates.append(office)
-    return candidates
+    return [office for office in offices if city_norm in office.name_norm or city_norm in office.address_norm]
 
 
 def _extract_city_hint_from_state(state: dict[str, object]) -> str:
@@ -160,12 +121,24 @@ def _extract_city_hint_from_state(state: dict[str, object]) -> str:
     return ""
 
 
-def _pick_known_office(session: Session, state: dict[str, object]) -> int | None:
-    offices = session.scalars(select(Office)).all()
+def _is_unknown_route(state: dict[str, object]) -> bool:
+    city_hint = _extract_city_hint_from_state(state)
+    if city_hint and not str(state.get("city", "")).strip():
+        state["city"] = city_hint
+
+    # If city is explicitly present in text (e.g. "я из Астаны"), treat as known.
+    if _is_foreign_country(state):
+        return True
+    if city_hint:
+        return False
+    return _is_foreign_or_unknown(state)
+
+
+def _known_office_candidates(index: RoutingIndex, state: dict[str, object]) -> list[OfficeEntry]:
+    offices = index.offices()
     if not offices:
-        return None
+        return []
 
-    managers = session.scalars(select(Manager)).all()
     geo_result = state.get("geo_result", {})
     city = str(state.get("city", ""))
 
@@ -190,9 +163,16 @@ def _pick_known_office(session: Session, state: dict[str, object]) -> int | None
             # Keep near-equivalent offices (within 5km), then use load + RR.
             near = [o for o, d in with_dist if d - nearest_dist <= 5.0]
             candidates = near or [min(with_dist, key=lambda x: x[1])[0]]
+    return candidates
+
+
+def _pick_known_office(session: Session, index: RoutingIndex, state: dict[str, object]) -> int | None:
+    candidates = _known_office_candidates(index, state)
+    if not candidates:
+        return None
 
     # 2) Balance by office load.
-    loads = {o.id: _office_total_load(managers, o.id) for o in candidates}
+    loads = {o.id: index.office_load(o.id) for o in candidates}
     min_load = min(loads.values())
     least_loaded = [office.id for office in candidates if loads[office.id] == min_load]
     return _pick_round_robin(session, "office_rr_known_load", sorted(least_loaded))
@@ -200,34 +180,18 @@ def _pick_known_office(session: Session, state: dict[str, object]) -> int | None
 
 def _pick_manager_for_office(
     session: Session,
+    index: RoutingIndex,
     office_id: int,
     required_skills: set[str],
     require_head_specialist: bool,
-) -> Manager | None:
-    managers = session.scalars(select(Manager).where(Manager.office_id == office_id)).all()
-    if not managers:
+) -> int | None:
+    required_mask = index.skill_mask(required_skills)
+    if required_mask is None:
         return None
-
-    eligible: list[Manager] = []
-    for manager in managers:
-        skills = _skills_set(manager.skills)
-        if not required_skills.issubset(skills):
-            continue
-        if require_head_specialist:
-            position = _norm_text(manager.position)
-            if "глав" not in position and "head" not in position:
-                continue
-        eligible.append(manager)
+    eligible = index.eligible_managers(office_id, required_mask, require_head_specialist)
     if not eligible:
         return None
 
-    eligible.sort(
-        key=lambda m: (
-            m.active_tickets,
-            m.last_assigned_at or dt.datetime(1970, 1, 1),
-            m.id,
-        )
-    )
     # Pick only two least loaded candidates, then alternate by round-robin.
     rr_pool = eligible[:2]
     picked_id = _pick_round_robin(
@@ -239,47 +203,148 @@ def _pick_manager_for_office(
         ),
         items=[m.id for m in rr_pool],
     )
-    return next((m for m in rr_pool if m.id == picked_id), None)
+    return picked_id
 
 
-def assign_manager(session: Session, state: dict[str, object]) -> AssignmentResult:
+def assign_manager(
+    session: Session,
+    state: dict[str, object],
+    index: RoutingIndex | None = None,
+) -> AssignmentResult:
+    index = index or get_routing_index()
+    index.ensure_loaded(session)
+
     # 1) Spam never gets assignment.
     if _is_spam(state):
         return AssignmentResult(manager_id=None, office_id=None)
 
-    city_hint = _extract_city_hint_from_state(state)
-    if city_hint and not str(state.get("city", "")).strip():
-        state["city"] = city_hint
-
     # 2) Unknown/foreign -> strict 50/50 between Astana and Almaty.
-    # If city is explicitly present in text (e.g. "я из Астаны"), treat as known.
-    unknown_or_foreign = _is_foreign_or_unknown(state)
-    if _is_foreign_country(state):
-        unknown_or_foreign = True
-    elif city_hint:
-        unknown_or_foreign = False
-
-    if unknown_or_foreign:
-        office_id = _pick_office_5050(session)
+    if _is_unknown_route(state):
+        office_id = _pick_office_5050(session, index)
     else:
         # 3) Known address -> nearest office + load balancing + round-robin.
-        office_id = _pick_known_office(session, state)
+        office_id = _pick_known_office(session, index, state)
 
     if office_id is None:
         return AssignmentResult(manager_id=None, office_id=None)
 
     required_skills = _required_skills(state)
-    manager = _pick_manager_for_office(
+    manager_id = _pick_manager_for_office(
         session,
+        index,
         office_id=office_id,
         required_skills=required_skills,
         require_head_specialist=_requires_head_specialist_for_data_change(state),
     )
-    if manager is None:
+    if manager_id is None:
         # Keep office for visibility even if no suitable manager found.
         return AssignmentResult(manager_id=None, office_id=office_id)
 
-    manager.active_tickets += 1
-    manager.assignments_total += 1
-    manager.last_assigned_at = dt.datetime.utcnow()
-    return AssignmentResult(manager_id=manager.id, office_id=manager.office_id)
+    # Atomic increment: concurrent workers never read-modify-write the manager row.
+    assigned_at = dt.datetime.utcnow()
+    manager_office_id = session.execute(
+        update(Manager)
+        .where(Manager.id == manager_id)
+        .values(
+            active_tickets=Manager.active_tickets + 1,
+            assignments_total=Manager.assignments_total + 1,
+            last_assigned_at=assigned_at,
+        )
+        .returning(Manager.office_id)
+    ).scalar_one_or_none()
+    if manager_office_id is None:
+        return AssignmentResult(manager_id=None, office_id=office_id)
+
+    index.record_assignment(session, manager_id, assigned_at)
+    return AssignmentResult(manager_id=manager_id, office_id=manager_office_id)
+
+
+def _constraint_rank(state: dict[str, object]) -> int:
+    return len(_required_skills(state)) + int(_requires_head_specialist_for_data_change(state))
+
+
+def _apply_manager_deltas(session: Session, deltas: dict[int, int], assigned_at: dt.datetime) -> None:
+    table = Manager.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("manager_id"))
+        .values(
+            active_tickets=table.c.active_tickets + bindparam("delta"),
+            assignments_total=table.c.assignments_total + bindparam("delta"),
+            last_assigned_at=assigned_at,
+        )
+    )
+    session.execute(stmt, [{"manager_id": manager_id, "delta": delta} for manager_id, delta in deltas.items()])
+
+
+def assign_managers_batch(
+    session: Session,
+    states: list[dict[str, object]],
+    index: RoutingIndex | None = None,
+) -> list[AssignmentResult]:
+    """Assign a whole batch against one routing snapshot with projected loads.
+
+    Same rules as ``assign_manager``, but office and manager loads include the
+    assignments already made in this batch. The most constrained tickets (skills,
+    head specialist) pick first, so flexible tickets do not take the only eligible
+    managers. Round-robin slots are reserved in one statement per key, and manager
+    counters are written with a single executemany.
+    """
+    index = index or get_routing_index()
+    index.ensure_loaded(session)
+    results = [AssignmentResult(manager_id=None, office_id=None) for _ in states]
+
+    unknown: list[int] = []
+    known: list[int] = []
+    for position, state in enumerate(states):
+        if _is_spam(state):
+            continue
+        (unknown if _is_unknown_route(state) else known).append(position)
+
+    office_load = {office.id: index.office_load(office.id) for office in index.offices()}
+    office_by_ticket: dict[int, int] = {}
+
+    split_ids = [office.id for office in _find_5050_offices(index)]
+    if unknown and split_ids:
+        start = reserve_counter_values(session, "office_rr_astana_almaty", len(unknown)) if len(split_ids) > 1 else 0
+        for offset, position in enumerate(unknown):
+            office_id = split_ids[(start + offset) % len(split_ids)]
+            office_by_ticket[position] = office_id
+            office_load[office_id] += 1
+
+    if known:
+        start = reserve_counter_values(session, "office_rr_known_load", len(known))
+        for offset, position in enumerate(known):
+            candidates = _known_office_candidates(index, states[position])
+            if not candidates:
+                continue
+            min_load = min(office_load[office.id] for office in candidates)
+            least_loaded = sorted(office.id for office in candidates if office_load[office.id] == min_load)
+            office_id = least_loaded[(start + offset) % len(least_loaded)]
+            office_by_ticket[position] = office_id
+            office_load[office_id] += 1
+
+    deltas: dict[int, int] = {}
+    for position in sorted(office_by_ticket, key=lambda p: -_constraint_rank(states[p])):
+        office_id = office_by_ticket[position]
+        state = states[position]
+        required_mask = index.skill_mask(_required_skills(state))
+        eligible = (
+            index.eligible_managers(office_id, required_mask, _requires_head_specialist_for_data_change(state))
+            if required_mask is not None
+            else []
+        )
+        if not eligible:
+            # Keep office for visibility even if no suitable manager found.
+            results[position] = AssignmentResult(manager_id=None, office_id=office_id)
+            continue
+        picked = min(eligible, key=lambda m: m.active_tickets + deltas.get(m.id, 0))
+        deltas[picked.id] = deltas.get(picked.id, 0) + 1
+        results[position] = AssignmentResult(manager_id=picked.id, office_id=picked.office_id)
+
+    if deltas:
+        assigned_at = dt.datetime.utcnow()
+        _apply_manager_deltas(session, deltas, assigned_at)
+        for manager_id, delta in deltas.items():
+            index.record_assignment(session, manager_id, assigned_at, count=delta)
+    return results
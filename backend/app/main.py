@@ -9,6 +9,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from .ai_agent import router as ai_agent_router
 from .db import init_db
 from .schemas import (
+    AssignBatchRequest,
+    AssignBatchResponse,
     AssignRequest,
     AssignResponse,
     BootstrapResponse,
@@ -78,6 +80,16 @@ def assign_ticket(req: AssignRequest) -> AssignResponse:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@app.post("/api/v1/tickets/assign-batch", response_model=AssignBatchResponse)
+def assign_ticket_batch(req: AssignBatchRequest) -> AssignBatchResponse:
+    try:
+        assignments = service.assign_for_states([dict(payload) for payload in req.payloads])
+        return AssignBatchResponse(assignments=assignments)
+    except Exception as exc:
+        logger.exception("Batch ticket assignment failed")
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 @app.post("/api/v1/tickets/process-csv", response_model=ProcessCsvResponse)
 def process_csv(req: ProcessCsvRequest) -> ProcessCsvResponse:
     try:
@@ -93,8 +105,7 @@ async def process_csv_upload(file: UploadFile = File(...)) -> ProcessCsvResponse
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
     try:
-        content = await file.read()
-        results = service.process_csv_content(content)
+        results = service.process_csv_stream(file.file)
         return ProcessCsvResponse(count=len(results), tickets=results)
     except Exception as exc:
         logger.exception("CSV upload processing failed")
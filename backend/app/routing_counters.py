@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .db import get_session
+from .models import RoutingState
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def add_to_counter(session: Session, key: str, delta: int = 1) -> int:
+    """Atomically add ``delta`` to a routing counter and return its new value.
+
+    Runs as a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` statement,
+    so concurrent workers never read-modify-write the same row and no increment is lost.
+    """
+    insert = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    if insert is None:
+        value = session.execute(
+            update(RoutingState)
+            .where(RoutingState.key == key)
+            .values(value_int=RoutingState.value_int + delta)
+            .returning(RoutingState.value_int)
+        ).scalar_one_or_none()
+        if value is None:
+            session.add(RoutingState(key=key, value_int=delta))
+            session.flush()
+            value = delta
+        return value
+
+    stmt = (
+        insert(RoutingState)
+        .values(key=key, value_int=delta)
+        .on_conflict_do_update(
+            index_elements=[RoutingState.key],
+            set_={"value_int": RoutingState.value_int + delta},
+        )
+        .returning(RoutingState.value_int)
+    )
+    return int(session.execute(stmt).scalar_one())
+
+
+@dataclass
+class _Shard:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    values: dict[str, int] = field(default_factory=dict)
+    pending: dict[str, int] = field(default_factory=dict)
+
+
+class ShardedCounter:
+    """In-process routing counters, striped across locks and reconciled to the database.
+
+    Each key is seeded from the database once, then incremented locally. Accumulated
+    deltas are flushed with ``add_to_counter`` at most every ``reconcile_interval_s``,
+    so hot keys cost one lock acquisition per ticket instead of a row write. With a
+    ``session_factory`` the flush runs in its own committed session, independent of
+    the ticket transaction that triggered it.
+    """
+
+    def __init__(
+        self,
+        reconcile_interval_s: float = 5.0,
+        shards: int = 16,
+        session_factory: Callable[[], AbstractContextManager[Session]] | None = None,
+    ) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._reconcile_interval_s = max(0.0, reconcile_interval_s)
+        self._session_factory = session_factory
+        self._reconcile_lock = threading.Lock()
+        self._last_reconcile = time.monotonic()
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def next_value(self, session: Session, key: str) -> int:
+        """Return the current value for ``key`` and advance it by one."""
+        return self.reserve(session, key, 1)
+
+    def reserve(self, session: Session, key: str, count: int) -> int:
+        """Return the current value for ``key`` and advance it by ``count``."""
+        shard = self._shard(key)
+        with shard.lock:
+            if key not in shard.values:
+                # A plain read: an upsert would lock the row in the ticket
+                # transaction and block the reconcile session.
+                stored = session.scalar(select(RoutingState.value_int).where(RoutingState.key == key))
+                shard.values[key] = int(stored or 0)
+            value = shard.values[key]
+            shard.values[key] = value + count
+            shard.pending[key] = shard.pending.get(key, 0) + count
+
+        if time.monotonic() - self._last_reconcile >= self._reconcile_interval_s:
+            try:
+                self.reconcile(None if self._session_factory is not None else session)
+            except Exception:
+                # Deltas are kept for the next reconcile; routing itself goes on.
+                logger.warning("Routing counter reconcile failed", exc_info=True)
+        return value
+
+    def _restore(self, pending: dict[str, int]) -> None:
+        for key, delta in pending.items():
+            shard = self._shard(key)
+            with shard.lock:
+                shard.pending[key] = shard.pending.get(key, 0) + delta
+
+    def reconcile(self, session: Session | None = None) -> None:
+        """Write pending deltas in ``session``, or in a dedicated session when None.
+
+        If the write fails, the deltas go back into the shards, so none are lost.
+        """
+        if not self._reconcile_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_reconcile = time.monotonic()
+            pending: dict[str, int] = {}
+            for shard in self._shards:
+                with shard.lock:
+                    pending.update(shard.pending)
+                    shard.pending = {}
+            if not pending:
+                return
+            try:
+                if session is not None:
+                    self._flush(session, pending)
+                elif self._session_factory is not None:
+                    with self._session_factory() as own_session:
+                        self._flush(own_session, pending)
+                else:
+                    raise RuntimeError("ShardedCounter.reconcile needs a session or a session_factory")
+            except BaseException:
+                self._restore(pending)
+                raise
+        finally:
+            self._reconcile_lock.release()
+
+    @staticmethod
+    def _flush(session: Session, pending: dict[str, int]) -> None:
+        for key, delta in pending.items():
+            add_to_counter(session, key, delta)
+
+
+_sharded_counter: ShardedCounter | None = None
+_sharded_counter_configured = False
+_sharded_counter_lock = threading.Lock()
+
+
+def _get_sharded_counter() -> ShardedCounter | None:
+    global _sharded_counter, _sharded_counter_configured
+    if not _sharded_counter_configured:
+        with _sharded_counter_lock:
+            if not _sharded_counter_configured:
+                settings = get_settings()
+                if settings.local_routing_counters:
+                    _sharded_counter = ShardedCounter(settings.routing_reconcile_interval_s, session_factory=get_session)
+                _sharded_counter_configured = True
+    return _sharded_counter
+
+
+def next_counter_value(session: Session, key: str) -> int:
+    """Return the current value of a round-robin counter and advance it by one."""
+    return reserve_counter_values(session, key, 1)
+
+
+def reserve_counter_values(session: Session, key: str, count: int) -> int:
+    """Reserve ``count`` consecutive round-robin values and return the first one."""
+    counter = _get_sharded_counter()
+    if counter is None:
+        return add_to_counter(session, key, count) - count
+    return counter.reserve(session, key, count)
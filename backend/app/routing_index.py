@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import datetime as dt
+import re
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, SessionTransaction
+
+from .models import Manager, Office
+
+_EPOCH = dt.datetime(1970, 1, 1)
+# Session.info key for index updates waiting on the session's commit.
+_PENDING_KEY = "routing_index_pending"
+
+
+def _norm_text(value: str) -> str:
+    return re.sub(r"[^a-zа-я0-9]+", "", (value or "").strip().lower())
+
+
+def _skills_set(skills_raw: str) -> set[str]:
+    return {item.strip().upper() for item in (skills_raw or "").split(",") if item.strip()}
+
+
+def _is_head_position(position: str) -> bool:
+    norm = _norm_text(position)
+    return "глав" in norm or "head" in norm
+
+
+@dataclass(frozen=True)
+class OfficeEntry:
+    id: int
+    name: str
+    address: str
+    name_norm: str
+    address_norm: str
+    lat: float | None
+    lon: float | None
+
+
+@dataclass
+class ManagerEntry:
+    id: int
+    office_id: int
+    full_name: str
+    skill_mask: int
+    is_head: bool
+    active_tickets: int
+    last_assigned_at: dt.datetime | None
+
+
+class RoutingIndex:
+    """In-memory snapshot of offices and managers used by assignment.
+
+    Office coordinates, managers bucketed by office, skill bitmasks and per-office
+    load counters are built once from the database and then maintained
+    incrementally as tickets are assigned. Call ``refresh`` after reference data
+    changes (bootstrap) to rebuild it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._offices: dict[int, OfficeEntry] = {}
+        self._managers: dict[int, ManagerEntry] = {}
+        self._managers_by_office: dict[int, list[ManagerEntry]] = {}
+        self._office_load: dict[int, int] = {}
+        self._skill_bits: dict[str, int] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def refresh(self, session: Session) -> None:
+        offices = session.scalars(select(Office)).all()
+        managers = session.scalars(select(Manager)).all()
+
+        skill_bits: dict[str, int] = {}
+        office_entries = {
+            office.id: OfficeEntry(
+                id=office.id,
+                name=office.name,
+                address=office.address,
+                name_norm=_norm_text(office.name),
+                address_norm=_norm_text(office.address),
+                lat=office.lat,
+                lon=office.lon,
+            )
+            for office in offices
+        }
+        manager_entries: dict[int, ManagerEntry] = {}
+        by_office: dict[int, list[ManagerEntry]] = {office_id: [] for office_id in office_entries}
+        office_load: dict[int, int] = {office_id: 0 for office_id in office_entries}
+        for manager in managers:
+            mask = 0
+            for skill in _skills_set(manager.skills):
+                bit = skill_bits.setdefault(skill, 1 << len(skill_bits))
+                mask |= bit
+            entry = ManagerEntry(
+                id=manager.id,
+                office_id=manager.office_id,
+                full_name=manager.full_name,
+                skill_mask=mask,
+                is_head=_is_head_position(manager.position),
+                active_tickets=manager.active_tickets or 0,
+                last_assigned_at=manager.last_assigned_at,
+            )
+            manager_entries[manager.id] = entry
+            by_office.setdefault(manager.office_id, []).append(entry)
+            office_load[manager.office_id] = office_load.get(manager.office_id, 0) + entry.active_tickets
+
+        with self._lock:
+            self._offices = office_entries
+            self._managers = manager_entries
+            self._managers_by_office = by_office
+            self._office_load = office_load
+            self._skill_bits = skill_bits
+            self._loaded = True
+
+    def ensure_loaded(self, session: Session) -> None:
+        if not self._loaded:
+            self.refresh(session)
+
+    def offices(self) -> list[OfficeEntry]:
+        return list(self._offices.values())
+
+    def office(self, office_id: int) -> OfficeEntry | None:
+        return self._offices.get(office_id)
+
+    def manager(self, manager_id: int) -> ManagerEntry | None:
+        return self._managers.get(manager_id)
+
+    def office_load(self, office_id: int) -> int:
+        return self._office_load.get(office_id, 0)
+
+    def skill_mask(self, skills: set[str]) -> int | None:
+        """Bitmask for ``skills``, or None if some skill is held by no manager at all."""
+        mask = 0
+        for skill in skills:
+            bit = self._skill_bits.get(skill)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def eligible_managers(self, office_id: int, required_mask: int, require_head: bool) -> list[ManagerEntry]:
+        with self._lock:
+            eligible = [
+                manager
+                for manager in self._managers_by_office.get(office_id, [])
+                if manager.skill_mask & required_mask == required_mask and (manager.is_head or not require_head)
+            ]
+            eligible.sort(key=lambda m: (m.active_tickets, m.last_assigned_at or _EPOCH, m.id))
+            return eligible
+
+    def record_assignment(self, session: Session, manager_id: int, assigned_at: dt.datetime, count: int = 1) -> None:
+        """Count an assignment made in ``session`` once that session commits.
+
+        Applying it earlier would leave the in-memory loads ahead of the database
+        whenever the transaction rolls back. Assignments made inside a savepoint
+        are dropped again if that savepoint rolls back.
+        """
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        session.info.setdefault(_PENDING_KEY, []).append((transaction, self, manager_id, assigned_at, count))
+
+    def _apply_assignment(self, manager_id: int, assigned_at: dt.datetime, count: int) -> None:
+        with self._lock:
+            manager = self._managers.get(manager_id)
+            if manager is None:
+                return
+            manager.active_tickets += count
+            manager.last_assigned_at = assigned_at
+            self._office_load[manager.office_id] = self._office_load.get(manager.office_id, 0) + count
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_assignments(session: Session) -> None:
+    # Also fired when a savepoint is released; only the outermost commit counts.
+    if session.in_nested_transaction():
+        return
+    for _, index, manager_id, assigned_at, count in session.info.pop(_PENDING_KEY, []):
+        index._apply_assignment(manager_id, assigned_at, count)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_assignments(session: Session, previous_transaction: SessionTransaction) -> None:
+    # A savepoint rollback only undoes the assignments made inside it; the outer
+    # transaction may still commit the rest.
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        pending[:] = [entry for entry in pending if not _within(entry[0], previous_transaction)]
+
+
+def _within(transaction: SessionTransaction | None, ancestor: SessionTransaction) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+_routing_index = RoutingIndex()
+
+
+def get_routing_index() -> RoutingIndex:
+    return _routing_index
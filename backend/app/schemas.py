@@ -13,6 +13,10 @@ class AssignRequest(BaseModel):
     payload: dict[str, Any]
 
 
+class AssignBatchRequest(BaseModel):
+    payloads: list[dict[str, Any]]
+
+
 class ProcessCsvRequest(BaseModel):
     csv_path: str | None = None
 
@@ -35,5 +39,9 @@ class AssignResponse(BaseModel):
     assignment: dict[str, Any]
 
 
+class AssignBatchResponse(BaseModel):
+    assignments: list[dict[str, Any]]
+
+
 class RecentResponse(BaseModel):
     items: list[dict[str, Any]] = Field(default_factory=list)
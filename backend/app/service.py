@@ -2,23 +2,27 @@ from __future__ import annotations
 
 import concurrent.futures
 import csv
+import io
 import logging
 from dataclasses import dataclass
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Any
+from typing import IO, Any, Iterable, Iterator
 
 from sqlalchemy import select
+from sqlalchemy.orm import Session
 
-from .assignment import assign_manager
+from .assignment import AssignmentResult, assign_manager, assign_managers_batch
 from .bootstrap import seed_managers, seed_offices
 from .config import get_settings
 from .db import get_session
 from .models import Manager, Office, TicketResult
 from .pipeline_integration import _ensure_pipeline_import_path
+from .routing_index import get_routing_index
 
 _ensure_pipeline_import_path()
+from pipeline_service.application.graph.batch_runner import TicketBatchRunner
 from pipeline_service.application.graph.ticket_graph import build_ticket_graph
+from pipeline_service.application.services.ticket_dedup import dedup_tickets
 
 logger = logging.getLogger(__name__)
 
@@ -33,84 +37,184 @@ class TicketProcessingService:
     def __init__(self) -> None:
         self._settings = get_settings()
         self._graph = build_ticket_graph()
+        self._batch_runner = TicketBatchRunner()
+        self._routing_index = get_routing_index()
 
     def bootstrap_reference_data(self) -> BootstrapStats:
         with get_session() as session:
             offices = seed_offices(session, self._settings.offices_csv_path)
             managers = seed_managers(session, self._settings.managers_csv_path)
+            session.flush()
+            self._routing_index.refresh(session)
             return BootstrapStats(offices=offices, managers=managers)
 
     def process_one_ticket(self, payload: dict[str, Any]) -> dict[str, Any]:
         state = self._graph.invoke(payload)
-        assignment_payload = self.assign_for_state(state)
+        return self._store_result(state)
+
+    def _process_duplicate(
+        self, payload: dict[str, Any], leader: concurrent.futures.Future[dict[str, Any]]
+    ) -> dict[str, Any]:
+        # Reuses the cluster leader's enrichment; falls back to a full run if the leader failed.
+        try:
+            leader_state = leader.result()
+        except Exception:
+            return self.process_one_ticket(payload)
+        batch = self._batch_runner.run_duplicate(payload, leader_state)  # type: ignore[arg-type]
+        if not batch.states:
+            return self.process_one_ticket(payload)
+        return self._store_result(dict(batch.states[0]))
+
+    def _store_result(self, state: dict[str, Any]) -> dict[str, Any]:
         with get_session() as session:
-            state.update(assignment_payload)
+            return self._assign_and_insert(session, [state])[0]
+
+    def _store_results(self, states: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not states:
+            return []
+        # Assignment and insert share one transaction, so a ticket whose row is not
+        # stored never leaves a manager load increment behind.
+        with get_session() as session:
+            try:
+                with session.begin_nested():
+                    return self._assign_and_insert(session, states)
+            except Exception:
+                logger.exception("Bulk store of %s ticket results failed, storing one by one", len(states))
+            stored: list[dict[str, Any]] = []
+            for state in states:
+                try:
+                    with session.begin_nested():
+                        stored.extend(self._assign_and_insert(session, [state]))
+                except Exception:
+                    logger.exception("Storing ticket result failed for ticket_id=%s", state.get("ticket_id"))
+            return stored
 
-            ticket_row = TicketResult(
-                external_ticket_id=str(state.get("ticket_id", "")),
-                segment=str(state.get("segment", "")),
-                language=str(state.get("language", "")),
-                sentiment=str(state.get("sentiment", "")),
-                ticket_type=str(state.get("ticket_type", "")),
-                priority=int(state.get("priority", 1) or 1),
-                summary=str(state.get("summary", "")),
-                recommendation=str(state.get("recommendation", "")),
-                enriched_text=str(state.get("enriched_text", "")),
-                geo_result=state.get("geo_result", {}) if isinstance(state.get("geo_result"), dict) else {},
-                manager_id=state.get("manager_id"),
-                office_id=state.get("office_id"),
-                payload=dict(state),
+    def _assign_and_insert(self, session: Session, states: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        for state, assignment_payload in zip(states, self._assign(session, states)):
+            state.update(assignment_payload)
+        rows: list[TicketResult] = []
+        for state in states:
+            rows.append(
+                TicketResult(
+                    external_ticket_id=str(state.get("ticket_id", "")),
+                    segment=str(state.get("segment", "")),
+                    language=str(state.get("language", "")),
+                    sentiment=str(state.get("sentiment", "")),
+                    ticket_type=str(state.get("ticket_type", "")),
+                    priority=int(state.get("priority", 1) or 1),
+                    summary=str(state.get("summary", "")),
+                    recommendation=str(state.get("recommendation", "")),
+                    enriched_text=str(state.get("enriched_text", "")),
+                    geo_result=state.get("geo_result", {}) if isinstance(state.get("geo_result"), dict) else {},
+                    manager_id=state.get("manager_id"),
+                    office_id=state.get("office_id"),
+                    payload=dict(state),
+                )
             )
-            session.add(ticket_row)
-            session.flush()
-            state["db_ticket_id"] = ticket_row.id
-        return state
+        session.add_all(rows)
+        session.flush()
+        for state, row in zip(states, rows):
+            state["db_ticket_id"] = row.id
+        return states
 
     def assign_for_state(self, state: dict[str, Any]) -> dict[str, Any]:
         with get_session() as session:
-            assignment = assign_manager(session, state)
-            manager_name = None
-            office_name = None
-            office_address = None
-            if assignment.manager_id is not None:
-                manager = session.get(Manager, assignment.manager_id)
-                manager_name = manager.full_name if manager else None
-            if assignment.office_id is not None:
-                office = session.get(Office, assignment.office_id)
-                office_name = office.name if office else None
-                office_address = office.address if office else None
-            return {
-                "manager_id": assignment.manager_id,
-                "manager_name": manager_name,
-                "office_id": assignment.office_id,
-                "office_name": office_name,
-                "office_address": office_address,
-            }
+            return self._assign(session, [state])[0]
+
+    def assign_for_states(self, states: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not states:
+            return []
+        with get_session() as session:
+            return self._assign(session, states)
+
+    def _assign(self, session: Session, states: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if len(states) == 1:
+            assignments = [assign_manager(session, states[0], self._routing_index)]
+        else:
+            assignments = assign_managers_batch(session, states, self._routing_index)
+        return [self._assignment_payload(assignment) for assignment in assignments]
+
+    def _assignment_payload(self, assignment: AssignmentResult) -> dict[str, Any]:
+        manager_name = None
+        office_name = None
+        office_address = None
+        if assignment.manager_id is not None:
+            manager = self._routing_index.manager(assignment.manager_id)
+            manager_name = manager.full_name if manager else None
+        if assignment.office_id is not None:
+            office = self._routing_index.office(assignment.office_id)
+            office_name = office.name if office else None
+            office_address = office.address if office else None
+        return {
+            "manager_id": assignment.manager_id,
+            "manager_name": manager_name,
+            "office_id": assignment.office_id,
+            "office_name": office_name,
+            "office_address": office_address,
+        }
 
     def process_csv(self, csv_path: str | Path | None = None) -> list[dict[str, Any]]:
         path = Path(csv_path) if csv_path is not None else self._settings.tickets_csv_path
-        tickets = _load_tickets_from_csv_robust(path)
-        return self._process_tickets_concurrently(tickets)
+        with path.open("r", encoding="utf-8-sig", newline="") as fh:
+            return self._process_tickets(_iter_tickets_from_csv_robust(fh))
 
     def process_csv_content(self, content: bytes) -> list[dict[str, Any]]:
-        with NamedTemporaryFile(suffix=".csv", delete=True) as tmp:
-            tmp.write(content)
-            tmp.flush()
-            tickets = _load_tickets_from_csv_robust(Path(tmp.name))
+        return self.process_csv_stream(io.BytesIO(content))
+
+    def process_csv_stream(self, stream: IO[bytes]) -> list[dict[str, Any]]:
+        # Rows are decoded and parsed as the workers pull them; the upload is never
+        # copied to a temp file or materialized as a list of tickets.
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            return self._process_tickets(_iter_tickets_from_csv_robust(text))
+        finally:
+            text.detach()
+
+    def _process_tickets(self, tickets: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self._settings.batch_size > 0:
+            return self._process_tickets_in_batches(tickets)
         return self._process_tickets_concurrently(tickets)
 
-    def _process_tickets_concurrently(self, tickets: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        if not tickets:
-            return []
+    def _process_tickets_in_batches(self, tickets: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        for batch in self._batch_runner.run_batches(tickets, self._settings.batch_size):
+            logger.info(
+                "Processed batch tickets=%s failed=%s stage_timings_ms=%s",
+                len(batch.states),
+                len(batch.failures),
+                {stage: round(ms, 2) for stage, ms in batch.stage_timings_ms.items()},
+            )
+            try:
+                results.extend(self._store_results([dict(state) for state in batch.states]))
+            except Exception:
+                logger.exception("Storing batch of %s tickets failed", len(batch.states))
+        return results
 
+    def _process_tickets_concurrently(self, tickets: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
         results: list[dict[str, Any]] = []
+        # Backpressure: only pull the next ticket from the stream once a slot frees up.
+        max_in_flight = self._settings.max_workers * 2
+        # Duplicates wait on their cluster leader's future. The pool is FIFO, so a
+        # leader always starts before the duplicates that block on it.
+        leaders: dict[str, concurrent.futures.Future[dict[str, Any]]] = {}
         with concurrent.futures.ThreadPoolExecutor(max_workers=self._settings.max_workers) as pool:
-            futures = [pool.submit(self.process_one_ticket, ticket) for ticket in tickets]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    results.append(future.result())
-                except Exception:
-                    logger.exception("Ticket processing failed in worker thread")
+            pending: set[concurrent.futures.Future[dict[str, Any]]] = set()
+            for ticket in tickets:
+                if len(pending) >= max_in_flight:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    _collect_results(done, results)
+                key = ticket.get("dedup_key", "")
+                leader = leaders.get(key) if ticket.get("duplicate_of") else None
+                if leader is not None:
+                    pending.add(pool.submit(self._process_duplicate, ticket, leader))
+                    continue
+                future = pool.submit(self.process_one_ticket, ticket)
+                if key and not ticket.get("duplicate_of"):
+                    leaders[key] = future
+                pending.add(future)
+            _collect_results(concurrent.futures.as_completed(pending), results)
         return results
 
     def list_recent(self, limit: int = 50) -> list[dict[str, Any]]:
@@ -222,6 +326,16 @@ class TicketProcessingService:
             ]
 
 
+def _collect_results(
+    futures: Iterable[concurrent.futures.Future[dict[str, Any]]], results: list[dict[str, Any]]
+) -> None:
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception:
+            logger.exception("Ticket processing failed in worker thread")
+
+
 def _clean_header(value: str) -> str:
     return (value or "").replace("\ufeff", "").strip()
 
@@ -234,13 +348,14 @@ def _build_raw_address(country: str, region: str, city: str, street: str, house:
     return ", ".join([p for p in [country, region, city, street, house] if p])
 
 
-def _load_tickets_from_csv_robust(path: Path) -> list[dict[str, Any]]:
-    with path.open("r", encoding="utf-8-sig", newline="") as fh:
-        reader = csv.DictReader(fh)
-        rows = [_normalize_row_keys(row) for row in reader]
+def _iter_tickets_from_csv_robust(fh: IO[str]) -> Iterator[dict[str, Any]]:
+    # Tagged with duplicate clusters so each cluster is enriched once.
+    return dedup_tickets(_iter_rows_robust(fh))  # type: ignore[arg-type,return-value]
 
-    tickets: list[dict[str, Any]] = []
-    for row in rows:
+
+def _iter_rows_robust(fh: IO[str]) -> Iterator[dict[str, Any]]:
+    for raw_row in csv.DictReader(fh):
+        row = _normalize_row_keys(raw_row)
         ticket_id = row.get("GUID клиента", "").strip()
         if not ticket_id:
             continue
@@ -251,20 +366,17 @@ def _load_tickets_from_csv_robust(path: Path) -> list[dict[str, Any]]:
         house = row.get("Дом", "").strip()
         raw_text = row.get("Описание", row.get("Описание ", "")).strip()
 
-        tickets.append(
-            {
-                "ticket_id": ticket_id,
-                "raw_text": raw_text,
-                "raw_address": _build_raw_address(country, region, city, street, house),
-                "country": country,
-                "region": region,
-                "city": city,
-                "street": street,
-                "house": house,
-                "gender": row.get("Пол клиента", "").strip(),
-                "birth_date": row.get("Дата рождения", "").strip(),
-                "segment": row.get("Сегмент клиента", "").strip(),
-                "attachments": row.get("Вложения", "").strip(),
-            }
-        )
-    return tickets
+        yield {
+            "ticket_id": ticket_id,
+            "raw_text": raw_text,
+            "raw_address": _build_raw_address(country, region, city, street, house),
+            "country": country,
+            "region": region,
+            "city": city,
+            "street": street,
+            "house": house,
+            "gender": row.get("Пол клиента", "").strip(),
+            "birth_date": row.get("Дата рождения", "").strip(),
+            "segment": row.get("Сегмент клиента", "").strip(),
+            "attachments": row.get("Вложения", "").strip(),
+        }
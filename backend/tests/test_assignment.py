@@ -0,0 +1,190 @@
+import os
+
+os.environ.setdefault("BACKEND_DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.app.assignment import assign_manager, assign_managers_batch
+from backend.app.db import Base
+from backend.app.models import Manager, Office, RoutingState
+from backend.app.routing_counters import ShardedCounter, add_to_counter
+from backend.app.routing_index import RoutingIndex
+
+
+def _seed(session: Session) -> None:
+    astana = Office(name="Астана", address="ул. Достык, 1", lat=51.13, lon=71.43)
+    almaty = Office(name="Алматы", address="пр. Абая, 10", lat=43.24, lon=76.89)
+    session.add_all([astana, almaty])
+    session.flush()
+    session.add_all(
+        [
+            Manager(full_name="A1", position="Специалист", office_id=astana.id, skills="VIP, KZ", active_tickets=3),
+            Manager(full_name="A2", position="Главный специалист", office_id=astana.id, skills="VIP", active_tickets=1),
+            Manager(full_name="A3", position="Специалист", office_id=astana.id, skills="ENG", active_tickets=0),
+            Manager(full_name="B1", position="Специалист", office_id=almaty.id, skills="", active_tickets=5),
+        ]
+    )
+    session.flush()
+
+
+def test_routing_index_assigns_and_tracks_load() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        _seed(session)
+        index = RoutingIndex()
+        index.refresh(session)
+
+        astana = next(office for office in index.offices() if office.name == "Астана")
+        assert index.office_load(astana.id) == 4
+
+        state = {
+            "segment": "VIP",
+            "language": "RU",
+            "country": "KZ",
+            "city": "Астана",
+            "geo_result": {"status": "ok", "lat": 51.12, "lon": 71.44},
+        }
+        result = assign_manager(session, state, index)
+
+        manager = session.get(Manager, result.manager_id)
+        assert result.office_id == astana.id
+        assert manager is not None and manager.full_name == "A2"
+        assert manager.active_tickets == 2
+        # The index only counts the assignment once it is committed.
+        assert index.office_load(astana.id) == 4
+        session.commit()
+        assert index.office_load(astana.id) == 5
+        assert index.manager(manager.id).active_tickets == 2  # type: ignore[union-attr]
+
+
+def test_routing_index_ignores_rolled_back_assignments() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        _seed(session)
+        session.commit()
+        index = RoutingIndex()
+        index.refresh(session)
+        astana = next(office for office in index.offices() if office.name == "Астана")
+
+        state = {"country": "KZ", "city": "Астана", "geo_result": {"status": "ok", "lat": 51.12, "lon": 71.44}}
+        result = assign_manager(session, state, index)
+        session.rollback()
+
+        assert result.manager_id is not None
+        assert index.office_load(astana.id) == 4
+        assert index.manager(result.manager_id).active_tickets == session.get(Manager, result.manager_id).active_tickets  # type: ignore[union-attr]
+
+
+def test_routing_index_drops_assignments_of_rolled_back_savepoints() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        _seed(session)
+        session.commit()
+        index = RoutingIndex()
+        index.refresh(session)
+        astana = next(office for office in index.offices() if office.name == "Астана")
+        state = {"country": "KZ", "city": "Астана", "geo_result": {"status": "ok", "lat": 51.12, "lon": 71.44}}
+
+        try:
+            with session.begin_nested():
+                assign_manager(session, dict(state), index)
+                raise RuntimeError("insert failed")
+        except RuntimeError:
+            pass
+        with session.begin_nested():
+            kept = assign_manager(session, dict(state), index)
+        assert index.office_load(astana.id) == 4
+        session.commit()
+
+        assert index.office_load(astana.id) == 5
+        assert index.manager(kept.manager_id).active_tickets == session.get(Manager, kept.manager_id).active_tickets  # type: ignore[arg-type,union-attr]
+
+
+def test_routing_index_requires_known_skills() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        _seed(session)
+        index = RoutingIndex()
+        index.refresh(session)
+
+        assert index.skill_mask({"CHINESE"}) is None
+        head_vip = index.eligible_managers(
+            next(office.id for office in index.offices() if office.name == "Астана"),
+            index.skill_mask({"VIP"}) or 0,
+            require_head=True,
+        )
+        assert [manager.full_name for manager in head_vip] == ["A2"]
+
+
+def test_round_robin_counters_are_atomic_upserts() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        assert [add_to_counter(session, "rr_key") for _ in range(3)] == [1, 2, 3]
+        assert add_to_counter(session, "rr_key", 0) == 3
+
+
+def test_sharded_counter_reconciles_deltas() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        add_to_counter(session, "rr_key", 10)
+        counter = ShardedCounter(reconcile_interval_s=3600)
+
+        assert [counter.next_value(session, "rr_key") for _ in range(3)] == [10, 11, 12]
+        assert session.get(RoutingState, "rr_key").value_int == 10  # type: ignore[union-attr]
+
+        counter.reconcile(session)
+        assert add_to_counter(session, "rr_key", 0) == 13
+
+
+def test_batch_assignment_balances_load_across_batch() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        _seed(session)
+        index = RoutingIndex()
+        index.refresh(session)
+        astana_geo = {"status": "ok", "lat": 51.12, "lon": 71.44}
+        states = [
+            {"ticket_type": "Спам"},
+            {"country": "KZ", "city": "Астана", "segment": "Mass", "language": "RU", "geo_result": astana_geo},
+            {"country": "KZ", "city": "Астана", "segment": "Mass", "language": "RU", "geo_result": astana_geo},
+            {"country": "KZ", "city": "Астана", "segment": "VIP", "language": "RU", "geo_result": astana_geo},
+        ]
+
+        results = assign_managers_batch(session, states, index)
+
+        assert results[0].manager_id is None and results[0].office_id is None
+        names = [session.get(Manager, result.manager_id).full_name for result in results[1:]]  # type: ignore[union-attr]
+        # The VIP ticket is placed first, then the flexible ones go to the least loaded managers.
+        assert names == ["A3", "A3", "A2"]
+        session.expire_all()
+        assert session.get(Manager, results[3].manager_id).active_tickets == 2  # type: ignore[union-attr]
+        assert session.get(Manager, results[1].manager_id).assignments_total == 2  # type: ignore[union-attr]
+
+
+def test_sharded_counter_keeps_deltas_when_reconcile_fails() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        add_to_counter(session, "rr_key", 10)
+        session.commit()
+
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        counter = ShardedCounter(reconcile_interval_s=3600, session_factory=broken_session)
+        assert [counter.next_value(session, "rr_key") for _ in range(2)] == [10, 11]
+
+        try:
+            counter.reconcile()
+        except RuntimeError:
+            pass
+        counter.reconcile(session)
+        assert add_to_counter(session, "rr_key", 0) == 12
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from pipeline_service.application.services.csv_ingestion_service import iter_tickets_from_csv
+
+_SAMPLE_TEXTS = [
+    "Здравствуйте. Приложение не открывается после обновления, ошибка при входе.",
+    "Подскажите, как сменить номер телефона в профиле?",
+    "Вы выиграли бесплатно промокод казино! Перейдите по ссылке.",
+    "С моей карты списали деньги без моего ведома, это мошенники.",
+    "Спасибо за быструю помощь, всё работает отлично.",
+    "Хочу подать претензию: верните деньги за неоказанную услугу.",
+]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load_states(csv_path: str | None, limit: int) -> list[dict[str, object]]:
+    if csv_path:
+        states = []
+        for ticket in iter_tickets_from_csv(csv_path):
+            states.append(dict(ticket))
+            if len(states) >= limit:
+                break
+        return states
+    return [{"raw_text": text, "enriched_text": text} for text in (_SAMPLE_TEXTS * (limit // len(_SAMPLE_TEXTS) + 1))[:limit]]
+
+
+def _run_separate(states: list[dict[str, object]]) -> None:
+    from pipeline_service.application.nodes import classify_ticket, get_sentiment, get_type, is_spam
+
+    # Feed the separate models exactly the texts the unified node reads.
+    texts = [classify_ticket._text(state) for state in states]  # type: ignore[arg-type]
+    spam_flags = is_spam.detect_many(texts)
+    get_type.classify_many([text for text, flag in zip(texts, spam_flags) if not flag])
+    get_sentiment.classify_many([classify_ticket._sentiment_text(state) for state in states])  # type: ignore[arg-type]
+
+
+def _run_unified(states: list[dict[str, object]]) -> None:
+    from pipeline_service.application.nodes import classify_ticket
+
+    if not classify_ticket._model_ready():
+        raise SystemExit("Multi-head model is not available at MULTI_HEAD_MODEL_PATH")
+    classify_ticket.classify_many(states)  # type: ignore[arg-type]
+
+
+def _measure(mode: str, states: list[dict[str, object]], rounds: int) -> dict[str, object]:
+    runner = _run_unified if mode == "unified" else _run_separate
+    rss_before = _peak_rss_mb()
+    started_at = time.perf_counter()
+    runner(states[:1])  # model load + warmup
+    load_ms = (time.perf_counter() - started_at) * 1000
+
+    cpu_before = time.process_time()
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        runner(states)
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    cpu_ms = (time.process_time() - cpu_before) * 1000
+    tickets = len(states) * rounds
+    return {
+        "mode": mode,
+        "tickets": tickets,
+        "load_ms": round(load_ms, 2),
+        "wall_ms_per_ticket": round(elapsed_ms / tickets, 3),
+        "cpu_ms_per_ticket": round(cpu_ms / tickets, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare three-model and shared-encoder classification")
+    parser.add_argument("--mode", choices=["separate", "unified", "both"], default="both")
+    parser.add_argument("--csv", default=None, help="Tickets CSV to sample texts from (default: built-in samples)")
+    parser.add_argument("--limit", type=int, default=256, help="Tickets per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.mode == "both":
+        # Each mode runs in a fresh process so resident memory is not shared between them.
+        for mode in ("separate", "unified"):
+            command = [sys.executable, __file__, "--mode", mode, "--limit", str(args.limit), "--rounds", str(args.rounds)]
+            if args.csv:
+                command += ["--csv", args.csv]
+            subprocess.run(command, check=False)
+        return 0
+
+    states = _load_states(args.csv, max(1, args.limit))
+    print(json.dumps(_measure(args.mode, states, max(1, args.rounds)), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+
+from pipeline_service.application.nodes import (
+    assign_manager,
+    classify_ticket,
+    extract_ocr_text,
+    get_enriched_data,
+    get_geo_data,
+    get_language,
+    get_priority,
+    get_sentiment,
+    get_summary_recommendation,
+    get_type,
+    is_spam,
+    ingest_data,
+    persist,
+    start,
+    type_gate,
+)
+from pipeline_service.application.services.ticket_dedup import ENRICHMENT_FIELDS, fan_out
+from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+NodeRun = Callable[[TicketState], dict[str, object]]
+BatchRun = Callable[[list[TicketState]], list[dict[str, object]]]
+
+
+# Enrichment of recently finished cluster leaders, kept for duplicates in later batches.
+_LEADER_MEMORY = 10_000
+
+
+@dataclass(frozen=True)
+class BatchStage:
+    name: str
+    run_one: NodeRun
+    run_many: BatchRun | None = None
+    # Per-ticket stages also run for duplicates; the others run once per cluster.
+    per_ticket: bool = False
+
+
+@dataclass
+class BatchRunResult:
+    states: list[TicketState]
+    failures: list[dict[str, str]] = field(default_factory=list)
+    stage_timings_ms: dict[str, float] = field(default_factory=dict)
+
+
+def _spam_text(state: TicketState) -> str:
+    return state.get("enriched_text") or state.get("raw_text") or ""
+
+
+def _language_many(states: list[TicketState]) -> list[dict[str, object]]:
+    languages = get_language.detect_many([state.get("raw_text", "") for state in states])
+    return [{"language": language} for language in languages]
+
+
+def _sentiment_many(states: list[TicketState]) -> list[dict[str, object]]:
+    sentiments = get_sentiment.classify_many([state.get("raw_text", "") for state in states])
+    return [{"sentiment": sentiment} for sentiment in sentiments]
+
+
+def _spam_many(states: list[TicketState]) -> list[dict[str, object]]:
+    flags = is_spam.detect_many([_spam_text(state) for state in states])
+    return [{"is_spam": True, "ticket_type": "Спам"} if flag else {"is_spam": False} for flag in flags]
+
+
+def _type_one(state: TicketState) -> dict[str, object]:
+    # Per-ticket fallback of _type_many; must not overwrite the spam label either.
+    if state.get("is_spam"):
+        return {}
+    return get_type.run(state)
+
+
+def _type_many(states: list[TicketState]) -> list[dict[str, object]]:
+    # Mirrors the graph's conditional edge: spam tickets skip get_type entirely.
+    updates: list[dict[str, object]] = [{} for _ in states]
+    pending = [idx for idx, state in enumerate(states) if not state.get("is_spam")]
+    texts = [_spam_text(states[idx]) for idx in pending]
+    for idx, ticket_type in zip(pending, get_type.classify_many(texts)):
+        updates[idx] = {"ticket_type": ticket_type}
+    return updates
+
+
+# Same order of dependencies as build_ticket_graph(): every stage only reads keys
+# produced by stages listed before it.
+DEFAULT_STAGES: tuple[BatchStage, ...] = (
+    BatchStage("start", start.run, per_ticket=True),
+    BatchStage("ingest_data", ingest_data.run, per_ticket=True),
+    BatchStage("get_language", get_language.run, _language_many),
+    BatchStage("get_sentiment", get_sentiment.run, _sentiment_many),
+    BatchStage("extract_ocr_text", extract_ocr_text.run),
+    BatchStage("get_geo_data", get_geo_data.run),
+    BatchStage("get_enriched_data", get_enriched_data.run),
+    BatchStage("get_summary_recommendation", get_summary_recommendation.run),
+    BatchStage("is_spam", is_spam.run, _spam_many),
+    BatchStage("get_type", _type_one, _type_many),
+    BatchStage("type_gate", type_gate.run),
+    BatchStage("get_priority", get_priority.run),
+    BatchStage("assign_manager", assign_manager.run, assign_manager.run_many, per_ticket=True),
+    BatchStage("persist", persist.run, persist.run_many, per_ticket=True),
+)
+
+# Unified-classifier variant: spam, type and sentiment come from one encoder pass.
+UNIFIED_STAGES: tuple[BatchStage, ...] = (
+    BatchStage("start", start.run, per_ticket=True),
+    BatchStage("ingest_data", ingest_data.run, per_ticket=True),
+    BatchStage("get_language", get_language.run, _language_many),
+    BatchStage("extract_ocr_text", extract_ocr_text.run),
+    BatchStage("get_geo_data", get_geo_data.run),
+    BatchStage("get_enriched_data", get_enriched_data.run),
+    BatchStage("get_summary_recommendation", get_summary_recommendation.run),
+    BatchStage("classify_ticket", classify_ticket.run, classify_ticket.classify_many),
+    BatchStage("type_gate", type_gate.run),
+    BatchStage("get_priority", get_priority.run),
+    BatchStage("assign_manager", assign_manager.run, assign_manager.run_many, per_ticket=True),
+    BatchStage("persist", persist.run, persist.run_many, per_ticket=True),
+)
+
+
+class LeaderMemory:
+    """Enrichment of finished cluster leaders, kept for their later duplicates.
+
+    Scoped to one ticket stream (a ``run_batches`` call or one CLI run), so
+    clusters never leak between unrelated requests that share a runner.
+    """
+
+    def __init__(self, max_leaders: int = _LEADER_MEMORY) -> None:
+        self._max_leaders = max(1, max_leaders)
+        self._leaders: OrderedDict[str, TicketState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, state: TicketState) -> None:
+        key = state.get("dedup_key")
+        if not key:
+            return
+        enrichment = {name: state[name] for name in ENRICHMENT_FIELDS if name in state}  # type: ignore[literal-required]
+        with self._lock:
+            # A fanned-out duplicate only carries a copy of what is already stored.
+            if state.get("duplicate_of") and key in self._leaders:
+                return
+            self._leaders[key] = enrichment  # type: ignore[assignment]
+            self._leaders.move_to_end(key)
+            while len(self._leaders) > self._max_leaders:
+                self._leaders.popitem(last=False)
+
+    def get(self, key: str | None) -> TicketState | None:
+        with self._lock:
+            return self._leaders.get(key or "")
+
+    def knows_leader(self, ticket: TicketState) -> bool:
+        return bool(ticket.get("duplicate_of")) and self.get(ticket.get("dedup_key")) is not None
+
+
+class TicketBatchRunner:
+    def __init__(self, stages: Iterable[BatchStage] | None = None) -> None:
+        if stages is None:
+            stages = UNIFIED_STAGES if get_settings().unified_classifier else DEFAULT_STAGES
+        self._stages = tuple(stages)
+
+    def run(self, tickets: Iterable[TicketState], leaders: LeaderMemory | None = None) -> BatchRunResult:
+        """Run ``tickets`` through all stages; duplicates reuse leaders from this batch or ``leaders``."""
+        leaders = leaders if leaders is not None else LeaderMemory()
+        states: list[TicketState] = [dict(ticket) for ticket in tickets]  # type: ignore[misc]
+        result = BatchRunResult(states=[])
+        states, duplicates = self._split_duplicates(states, leaders)
+        # Duplicates whose leader fails are re-run in full from their original state.
+        originals = {id(state): dict(state) for state in duplicates}
+        orphans: list[TicketState] = []
+        shared_ran = False
+        for stage in self._stages:
+            if not states and not duplicates:
+                break
+            started_at = time.perf_counter()
+            if not stage.per_ticket:
+                shared_ran = True
+                states = self._run_stage(stage, states, result.failures)
+            else:
+                if duplicates and shared_ran:
+                    states.extend(self._fan_out(states, duplicates, leaders, orphans))
+                    duplicates = []
+                # Duplicates still waiting for their leader share the per-ticket stages.
+                waiting = {id(state) for state in duplicates}
+                survivors = self._run_stage(stage, states + duplicates, result.failures)
+                states = [state for state in survivors if id(state) not in waiting]
+                duplicates = [state for state in survivors if id(state) in waiting]
+            result.stage_timings_ms[stage.name] = (time.perf_counter() - started_at) * 1000
+        if duplicates:
+            states.extend(self._fan_out(states, duplicates, leaders, orphans))
+        for state in states:
+            leaders.remember(state)
+        if orphans:
+            logger.info("Re-running %s duplicates of failed cluster leaders in full", len(orphans))
+            rerun = self.run([originals[id(state)] for state in orphans], leaders)
+            states.extend(rerun.states)
+            result.failures.extend(rerun.failures)
+            for stage_name, elapsed_ms in rerun.stage_timings_ms.items():
+                result.stage_timings_ms[stage_name] = result.stage_timings_ms.get(stage_name, 0.0) + elapsed_ms
+        result.states = states
+        return result
+
+    def _split_duplicates(
+        self, states: list[TicketState], leaders: LeaderMemory
+    ) -> tuple[list[TicketState], list[TicketState]]:
+        # A duplicate whose leader is neither in this batch nor remembered runs in full.
+        leader_keys = {state.get("dedup_key") for state in states if not state.get("duplicate_of")}
+        primaries: list[TicketState] = []
+        duplicates: list[TicketState] = []
+        for state in states:
+            key = state.get("dedup_key")
+            if state.get("duplicate_of") and (key in leader_keys or leaders.get(key) is not None):
+                duplicates.append(state)
+            else:
+                primaries.append(state)
+        return primaries, duplicates
+
+    def _fan_out(
+        self,
+        primaries: list[TicketState],
+        duplicates: list[TicketState],
+        leaders: LeaderMemory,
+        orphans: list[TicketState],
+    ) -> list[TicketState]:
+        for primary in primaries:
+            leaders.remember(primary)
+        fanned: list[TicketState] = []
+        for state in duplicates:
+            leader_state = leaders.get(state.get("dedup_key"))
+            if leader_state is None:
+                orphans.append(state)
+                continue
+            fanned.append(fan_out(leader_state, state))
+        if fanned:
+            logger.info("Fanned out enrichment to %s duplicate tickets", len(fanned))
+        return fanned
+
+    def run_duplicate(self, ticket: TicketState, leader_state: TicketState) -> BatchRunResult:
+        """Finish a duplicate from its leader's final state, running only per-ticket stages."""
+        leaders = LeaderMemory(max_leaders=1)
+        leaders.remember(leader_state)
+        return self.run([ticket], leaders)
+
+    def run_batches(self, tickets: Iterable[TicketState], batch_size: int) -> Iterator[BatchRunResult]:
+        iterator = iter(tickets)
+        batch_size = max(1, batch_size)
+        leaders = LeaderMemory()
+        while True:
+            chunk = list(itertools.islice(iterator, batch_size))
+            if not chunk:
+                return
+            yield self.run(chunk, leaders)
+
+    def _run_stage(
+        self,
+        stage: BatchStage,
+        states: list[TicketState],
+        failures: list[dict[str, str]],
+    ) -> list[TicketState]:
+        if stage.run_many is not None:
+            try:
+                updates = stage.run_many(states)
+                if len(updates) != len(states):
+                    raise RuntimeError(
+                        f"Stage {stage.name} returned {len(updates)} updates for {len(states)} tickets"
+                    )
+                for state, update in zip(states, updates):
+                    state.update(update)  # type: ignore[typeddict-item]
+                return states
+            except Exception:
+                logger.exception("Batch stage %s failed, falling back to per-ticket execution", stage.name)
+
+        survivors: list[TicketState] = []
+        for state in states:
+            try:
+                state.update(stage.run_one(state))  # type: ignore[typeddict-item]
+                survivors.append(state)
+            except Exception as exc:
+                logger.exception(
+                    "Batch stage %s failed for ticket_id=%s",
+                    stage.name,
+                    state.get("ticket_id"),
+                )
+                failures.append(
+                    {
+                        "ticket_id": str(state.get("ticket_id", "")),
+                        "stage": stage.name,
+                        "error": f"{type(exc).__name__}: {exc}",
+                    }
+                )
+        return survivors
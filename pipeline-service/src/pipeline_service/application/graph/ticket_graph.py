@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from langgraph.graph import END, START, StateGraph
 
 from pipeline_service.application.nodes import (
     assign_manager,
+    classify_ticket,
     extract_ocr_text,
     get_enriched_data,
     get_geo_data,
@@ -19,30 +26,34 @@ from pipeline_service.application.nodes import (
     type_gate,
 )
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.settings import get_settings
+
+
+_ASYNC_CPU_WORKERS = int(os.getenv("PIPELINE_ASYNC_CPU_WORKERS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+_ASYNC_EXECUTOR: ThreadPoolExecutor | None = None
+_ASYNC_EXECUTOR_LOCK = threading.Lock()
+
 
+def _route_after_spam_check(state: TicketState) -> str:
+    if state.get("is_spam"):
+        return "type_gate"
+    return "get_type"
 
-def build_ticket_graph():
-    def _route_after_spam_check(state: TicketState) -> str:
-        if state.get("is_spam"):
-            return "type_gate"
-        return "get_type"
 
+_SEPARATE_CLASSIFIER_NODES = ("is_spam", "get_type", "get_sentiment")
+
+
+def _build_graph(nodes: dict[str, Callable[..., Any]], unified: bool | None = None):
+    if unified is None:
+        unified = get_settings().unified_classifier
     graph = StateGraph(TicketState)
 
-    graph.add_node("start", start.run)
-    graph.add_node("ingest_data", ingest_data.run)
-    graph.add_node("extract_ocr_text", extract_ocr_text.run)
-    graph.add_node("get_geo_data", get_geo_data.run)
-    graph.add_node("get_enriched_data", get_enriched_data.run)
-    graph.add_node("get_summary_recommendation", get_summary_recommendation.run)
-    graph.add_node("is_spam", is_spam.run)
-    graph.add_node("get_type", get_type.run)
-    graph.add_node("type_gate", type_gate.run)
-    graph.add_node("get_sentiment", get_sentiment.run)
-    graph.add_node("get_language", get_language.run)
-    graph.add_node("get_priority", get_priority.run)
-    graph.add_node("assign_manager", assign_manager.run)
-    graph.add_node("persist", persist.run)
+    for name, node in nodes.items():
+        if unified and name in _SEPARATE_CLASSIFIER_NODES:
+            continue
+        if not unified and name == "classify_ticket":
+            continue
+        graph.add_node(name, node)
 
     graph.add_edge(START, "start")
     graph.add_edge("start", "ingest_data")
@@ -51,20 +62,25 @@ def build_ticket_graph():
     graph.add_edge("extract_ocr_text", "get_geo_data")
     graph.add_edge("get_geo_data", "get_enriched_data")
     graph.add_edge("get_enriched_data", "get_summary_recommendation")
-    graph.add_edge("get_enriched_data", "is_spam")
-    graph.add_edge("ingest_data", "get_sentiment")
     graph.add_edge("ingest_data", "get_language")
-    graph.add_conditional_edges(
-        "is_spam",
-        _route_after_spam_check,
-        path_map={
-            "type_gate": "type_gate",
-            "get_type": "get_type",
-        },
-    )
-    graph.add_edge("get_type", "type_gate")
-
-    graph.add_edge(["get_sentiment", "type_gate"], "get_priority")
+    if unified:
+        # One encoder pass yields spam, type and sentiment together.
+        graph.add_edge("get_enriched_data", "classify_ticket")
+        graph.add_edge("classify_ticket", "type_gate")
+        graph.add_edge("type_gate", "get_priority")
+    else:
+        graph.add_edge("get_enriched_data", "is_spam")
+        graph.add_edge("ingest_data", "get_sentiment")
+        graph.add_conditional_edges(
+            "is_spam",
+            _route_after_spam_check,
+            path_map={
+                "type_gate": "type_gate",
+                "get_type": "get_type",
+            },
+        )
+        graph.add_edge("get_type", "type_gate")
+        graph.add_edge(["get_sentiment", "type_gate"], "get_priority")
 
     graph.add_edge(["get_priority", "get_language", "get_summary_recommendation"], "assign_manager")
     graph.add_edge("assign_manager", "persist")
@@ -72,3 +88,79 @@ def build_ticket_graph():
     graph.add_edge("persist", END)
 
     return graph.compile()
+
+
+def build_ticket_graph(unified: bool | None = None):
+    return _build_graph(
+        {
+            "start": start.run,
+            "ingest_data": ingest_data.run,
+            "extract_ocr_text": extract_ocr_text.run,
+            "get_geo_data": get_geo_data.run,
+            "get_enriched_data": get_enriched_data.run,
+            "get_summary_recommendation": get_summary_recommendation.run,
+            "is_spam": is_spam.run,
+            "get_type": get_type.run,
+            "classify_ticket": classify_ticket.run,
+            "type_gate": type_gate.run,
+            "get_sentiment": get_sentiment.run,
+            "get_language": get_language.run,
+            "get_priority": get_priority.run,
+            "assign_manager": assign_manager.run,
+            "persist": persist.run,
+        },
+        unified,
+    )
+
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    global _ASYNC_EXECUTOR
+    with _ASYNC_EXECUTOR_LOCK:
+        if _ASYNC_EXECUTOR is None:
+            _ASYNC_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_ASYNC_CPU_WORKERS,
+                thread_name_prefix="pipeline-cpu",
+            )
+        return _ASYNC_EXECUTOR
+
+
+def _inline(node: Callable[[TicketState], dict[str, object]]):
+    async def _run(state: TicketState) -> dict[str, object]:
+        return node(state)
+
+    return _run
+
+
+def _offload(node: Callable[[TicketState], dict[str, object]], executor: ThreadPoolExecutor):
+    async def _run(state: TicketState) -> dict[str, object]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, node, state)
+
+    return _run
+
+
+def build_async_ticket_graph(executor: ThreadPoolExecutor | None = None, unified: bool | None = None):
+    # Same topology as build_ticket_graph(), meant for ainvoke(): HTTP-bound nodes
+    # await a pooled async client, model/OCR/persistence nodes run on a bounded
+    # executor, and cheap pure nodes run inline on the event loop.
+    cpu_executor = executor or _get_async_executor()
+    return _build_graph(
+        {
+            "start": _inline(start.run),
+            "ingest_data": _inline(ingest_data.run),
+            "extract_ocr_text": _offload(extract_ocr_text.run, cpu_executor),
+            "get_geo_data": get_geo_data.arun,
+            "get_enriched_data": _inline(get_enriched_data.run),
+            "get_summary_recommendation": _inline(get_summary_recommendation.run),
+            "is_spam": _offload(is_spam.run, cpu_executor),
+            "get_type": _offload(get_type.run, cpu_executor),
+            "classify_ticket": _offload(classify_ticket.run, cpu_executor),
+            "type_gate": _inline(type_gate.run),
+            "get_sentiment": _offload(get_sentiment.run, cpu_executor),
+            "get_language": _offload(get_language.run, cpu_executor),
+            "get_priority": _inline(get_priority.run),
+            "assign_manager": assign_manager.arun,
+            "persist": _offload(persist.run, cpu_executor),
+        },
+        unified,
+    )
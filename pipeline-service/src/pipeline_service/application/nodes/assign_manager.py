@@ -5,10 +5,52 @@ import logging
 import requests
 
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.http import get_async_client
 from pipeline_service.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+_EMPTY_ASSIGNMENT = {
+    "manager_id": None,
+    "manager_name": None,
+    "office_id": None,
+    "office_name": None,
+    "office_address": None,
+}
+
+
+def _assign_url() -> str:
+    base_url = get_settings().backend_base_url.rstrip("/")
+    return f"{base_url}/api/v1/tickets/assign"
+
+
+def _assign_batch_url() -> str:
+    base_url = get_settings().backend_base_url.rstrip("/")
+    return f"{base_url}/api/v1/tickets/assign-batch"
+
+
+def _timeout() -> int:
+    return max(1, get_settings().backend_assign_timeout_seconds)
+
+
+def _batch_timeout() -> int:
+    # Fixed, not per ticket: the backend assigns a chunk in one transaction.
+    return max(1, get_settings().backend_assign_batch_timeout_seconds)
+
+
+def _parse_assignment(body: object) -> dict[str, object]:
+    assignment = body.get("assignment", {}) if isinstance(body, dict) else {}
+    if not isinstance(assignment, dict):
+        logger.warning("Assign endpoint returned unexpected payload: %s", body)
+        return {}
+    return {
+        "manager_id": assignment.get("manager_id"),
+        "manager_name": assignment.get("manager_name"),
+        "office_id": assignment.get("office_id"),
+        "office_name": assignment.get("office_name"),
+        "office_address": assignment.get("office_address"),
+    }
+
 
 def run(state: TicketState) -> dict[str, object]:
     settings = get_settings()
@@ -16,33 +58,60 @@ def run(state: TicketState) -> dict[str, object]:
         return {}
 
     if bool(state.get("is_spam")):
-        return {
-            "manager_id": None,
-            "manager_name": None,
-            "office_id": None,
-            "office_name": None,
-            "office_address": None,
-        }
-
-    base_url = settings.backend_base_url.rstrip("/")
-    url = f"{base_url}/api/v1/tickets/assign"
+        return dict(_EMPTY_ASSIGNMENT)
+
     payload = {"payload": dict(state)}
-    timeout = max(1, settings.backend_assign_timeout_seconds)
     try:
-        response = requests.post(url, json=payload, timeout=timeout)
+        response = requests.post(_assign_url(), json=payload, timeout=_timeout())
         response.raise_for_status()
-        body = response.json()
-        assignment = body.get("assignment", {}) if isinstance(body, dict) else {}
-        if not isinstance(assignment, dict):
-            logger.warning("Assign endpoint returned unexpected payload: %s", body)
-            return {}
-        return {
-            "manager_id": assignment.get("manager_id"),
-            "manager_name": assignment.get("manager_name"),
-            "office_id": assignment.get("office_id"),
-            "office_name": assignment.get("office_name"),
-            "office_address": assignment.get("office_address"),
-        }
+        return _parse_assignment(response.json())
     except Exception as exc:
         logger.warning("Assignment step failed, continuing without assignment: %s", exc)
         return {}
+
+
+async def arun(state: TicketState) -> dict[str, object]:
+    settings = get_settings()
+    if not settings.assign_enabled:
+        return {}
+
+    if bool(state.get("is_spam")):
+        return dict(_EMPTY_ASSIGNMENT)
+
+    payload = {"payload": dict(state)}
+    try:
+        response = await get_async_client().post(_assign_url(), json=payload, timeout=_timeout())
+        response.raise_for_status()
+        return _parse_assignment(response.json())
+    except Exception as exc:
+        logger.warning("Assignment step failed, continuing without assignment: %s", exc)
+        return {}
+
+
+def run_many(states: list[TicketState]) -> list[dict[str, object]]:
+    """Assign a whole batch with one request so the backend can balance load across it."""
+    settings = get_settings()
+    if not settings.assign_enabled:
+        return [{} for _ in states]
+
+    updates: list[dict[str, object]] = [dict(_EMPTY_ASSIGNMENT) for _ in states]
+    pending = [idx for idx, state in enumerate(states) if not bool(state.get("is_spam"))]
+    if not pending:
+        return updates
+
+    payload = {"payloads": [dict(states[idx]) for idx in pending]}
+    try:
+        response = requests.post(_assign_batch_url(), json=payload, timeout=_batch_timeout())
+        response.raise_for_status()
+        assignments = response.json().get("assignments", [])
+        if len(assignments) != len(pending):
+            raise RuntimeError(f"assign-batch returned {len(assignments)} assignments for {len(pending)} tickets")
+    except Exception as exc:
+        logger.warning("Batch assignment step failed, continuing without assignment: %s", exc)
+        for idx in pending:
+            updates[idx] = {}
+        return updates
+
+    for idx, assignment in zip(pending, assignments):
+        updates[idx] = _parse_assignment({"assignment": assignment})
+    return updates
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from pipeline_service.application.nodes import get_sentiment, get_type, is_spam
+from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.batching import length_buckets
+
+# Unified mode: one shared encoder forward pass feeds three linear heads (spam, type,
+# sentiment). The model directory holds a Hugging Face encoder + tokenizer and:
+#   heads.json - {"spam": [...labels], "type": [...labels], "sentiment": [...labels],
+#                 "pooling": "cls" | "mean"}
+#   heads.pt   - state_dict with "<head>.weight" / "<head>.bias" for each head
+LOCAL_MODEL_PATH = os.getenv("MULTI_HEAD_MODEL_PATH", "models/multi_head")
+MAX_TEXT_LENGTH = 600
+BATCH_BUCKET_SIZE = int(os.getenv("MULTI_HEAD_BATCH_SIZE", "16"))
+_HEADS = ("spam", "type", "sentiment")
+_PROJECT_ROOT = Path(__file__).resolve().parents[4]
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_model_path(model_path_value: str) -> Path:
+    model_path = Path(model_path_value).expanduser()
+    if model_path.is_absolute():
+        return model_path
+
+    cwd_path = (Path.cwd() / model_path).resolve()
+    if cwd_path.exists():
+        return cwd_path
+
+    return (_PROJECT_ROOT / model_path).resolve()
+
+
+@lru_cache(maxsize=1)
+def _get_local_components():
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    if not model_path.is_dir():
+        raise RuntimeError(f"Multi-head model path is not a directory: {model_path}")
+
+    heads_config = json.loads((model_path / "heads.json").read_text(encoding="utf-8"))
+    head_weights = torch.load(str(model_path / "heads.pt"), map_location="cpu")
+
+    tokenizer = AutoTokenizer.from_pretrained(str(model_path), local_files_only=True)
+    encoder = AutoModel.from_pretrained(str(model_path), local_files_only=True)
+    encoder.eval()
+
+    heads: dict[str, torch.nn.Linear] = {}
+    labels: dict[str, list[str]] = {}
+    for name in _HEADS:
+        weight = head_weights[f"{name}.weight"]
+        head = torch.nn.Linear(weight.shape[1], weight.shape[0])
+        head.load_state_dict({"weight": weight, "bias": head_weights[f"{name}.bias"]})
+        head.eval()
+        heads[name] = head
+        labels[name] = [str(label) for label in heads_config[name]]
+        if len(labels[name]) != weight.shape[0]:
+            raise RuntimeError(f"Head {name} has {weight.shape[0]} outputs but {len(labels[name])} labels")
+
+    pooling = str(heads_config.get("pooling", "cls")).lower()
+    return tokenizer, encoder, heads, labels, pooling
+
+
+@lru_cache(maxsize=1)
+def _model_ready() -> bool:
+    try:
+        _get_local_components()
+        return True
+    except Exception:
+        logger.warning(
+            "Multi-head model is not loadable, falling back to separate models: %s",
+            _resolve_model_path(LOCAL_MODEL_PATH),
+            exc_info=True,
+        )
+        return False
+
+
+def _spam_index(spam_labels: list[str]) -> int:
+    for idx, label in enumerate(spam_labels):
+        normalized = label.lower()
+        if normalized in {"spam", "label_1", "1"}:
+            return idx
+    return len(spam_labels) - 1
+
+
+def _infer_heads_many(texts: list[str]) -> list[dict[str, object]]:
+    import torch
+
+    tokenizer, encoder, heads, labels, pooling = _get_local_components()
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_TEXT_LENGTH)
+    spam_idx = _spam_index(labels["spam"])
+    results: list[dict[str, object]] = [{} for _ in texts]
+
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    for bucket in length_buckets(lengths, BATCH_BUCKET_SIZE):
+        features = [{key: encoded[key][idx] for key in encoded.keys()} for idx in bucket]
+        padded = tokenizer.pad(features, padding="longest", return_tensors="pt")
+        with torch.inference_mode():
+            hidden = encoder(**padded).last_hidden_state
+            if pooling == "mean":
+                mask = padded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+            else:
+                pooled = hidden[:, 0]
+            spam_probs = torch.nn.functional.softmax(heads["spam"](pooled), dim=-1)[:, spam_idx]
+            type_indices = torch.argmax(heads["type"](pooled), dim=-1)
+            sentiment_indices = torch.argmax(heads["sentiment"](pooled), dim=-1)
+
+        for row, idx in enumerate(bucket):
+            results[idx] = {
+                "spam_probability": float(spam_probs[row].item()),
+                "type_label": labels["type"][int(type_indices[row].item())],
+                "sentiment_label": labels["sentiment"][int(sentiment_indices[row].item())],
+            }
+    return results
+
+
+def _to_updates(result: dict[str, object], sentiment_label: str, keyword_spam: bool) -> dict[str, object]:
+    sentiment = get_sentiment._map_model_label(sentiment_label)
+    if keyword_spam or float(result["spam_probability"]) >= is_spam.DEFAULT_SPAM_THRESHOLD:
+        return {"is_spam": True, "ticket_type": "Спам", "sentiment": sentiment}
+    return {
+        "is_spam": False,
+        "ticket_type": get_type._map_model_label(str(result["type_label"])),
+        "sentiment": sentiment,
+    }
+
+
+def _classify_separately(state: TicketState) -> dict[str, object]:
+    updates: dict[str, object] = dict(get_sentiment.run(state))
+    updates.update(is_spam.run(state))
+    if not updates.get("is_spam"):
+        updates.update(get_type.run({**state, **updates}))  # type: ignore[typeddict-item]
+    return updates
+
+
+def _text(state: TicketState) -> str:
+    return (state.get("enriched_text") or state.get("raw_text") or "").strip()[:MAX_TEXT_LENGTH]
+
+
+def _sentiment_text(state: TicketState) -> str:
+    # Like get_sentiment, judge the customer's own words, not the OCR text appended to them.
+    return (state.get("raw_text") or "").strip()[:MAX_TEXT_LENGTH]
+
+
+def _classify(pairs: list[tuple[str, str]]) -> list[dict[str, object]]:
+    # Spam and type read the enriched text, sentiment the raw one. Both usually coincide,
+    # so the union of texts rarely costs more than one encoder row per ticket.
+    unique_texts = list(dict.fromkeys(text for pair in pairs for text in pair if text))
+    results = dict(zip(unique_texts, _infer_heads_many(unique_texts)))
+    updates = []
+    for text, sentiment_text in pairs:
+        sentiment_label = str(results[sentiment_text]["sentiment_label"]) if sentiment_text else ""
+        updates.append(_to_updates(results[text], sentiment_label, is_spam._keyword_is_spam(text.lower())))
+    return updates
+
+
+def run(state: TicketState) -> dict[str, object]:
+    text = _text(state)
+    if not text:
+        return {"is_spam": False, "ticket_type": get_type.DEFAULT_TICKET_TYPE, "sentiment": get_sentiment.DEFAULT_SENTIMENT}
+    if not _model_ready():
+        return _classify_separately(state)
+
+    try:
+        return _classify([(text, _sentiment_text(state))])[0]
+    except Exception:
+        logger.exception("Multi-head inference failed for local model at %s", LOCAL_MODEL_PATH)
+        return _classify_separately(state)
+
+
+def classify_many(states: list[TicketState]) -> list[dict[str, object]]:
+    if not _model_ready():
+        return [_classify_separately(state) for state in states]
+
+    updates: list[dict[str, object]] = [
+        {"is_spam": False, "ticket_type": get_type.DEFAULT_TICKET_TYPE, "sentiment": get_sentiment.DEFAULT_SENTIMENT}
+        for _ in states
+    ]
+    positions: dict[tuple[str, str], list[int]] = {}
+    for idx, state in enumerate(states):
+        text = _text(state)
+        if text:
+            positions.setdefault((text, _sentiment_text(state)), []).append(idx)
+    if not positions:
+        return updates
+
+    unique_pairs = list(positions)
+    try:
+        results = _classify(unique_pairs)
+    except Exception:
+        logger.exception("Batch multi-head inference failed for local model at %s", LOCAL_MODEL_PATH)
+        return [_classify_separately(state) for state in states]
+
+    for pair, update in zip(unique_pairs, results):
+        for idx in positions[pair]:
+            updates[idx] = dict(update)
+    return updates
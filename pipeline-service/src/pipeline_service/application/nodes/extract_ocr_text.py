@@ -2,16 +2,29 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from pathlib import Path
 
-from pipeline_service.application.services.ocr_cleanup import clean_ocr_text
+from pipeline_service.application.services.ocr_cleanup import clean_ocr_text_with_status
 from pipeline_service.application.state.ticket_state import TicketState
 from pipeline_service.domain.services.normalization import normalize_whitespace
-from pipeline_service.infrastructure.ocr import PaddleOcrClient
+from pipeline_service.infrastructure.ocr import (
+    PaddleOcrClient,
+    PooledOcrClient,
+    attachment_digest,
+    enabled_variants,
+    get_ocr_cache,
+    get_ocr_process_pool,
+)
+from pipeline_service.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
-_OCR_CLIENTS: dict[str, PaddleOcrClient] = {}
+OCR_PROCESS_WORKERS = int(os.getenv("OCR_PROCESS_WORKERS", "0"))
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+
+_OCR_CLIENTS: dict[str, PaddleOcrClient | PooledOcrClient] = {}
+_OCR_CLIENTS_LOCK = threading.Lock()
 
 
 def _append_error(state: TicketState, error_code: str) -> list[str]:
@@ -35,12 +48,24 @@ def _select_ocr_lang() -> str:
     return aliases.get(configured, configured)
 
 
-def _get_ocr_client(lang: str) -> PaddleOcrClient:
-    client = _OCR_CLIENTS.get(lang)
-    if client is None:
-        client = PaddleOcrClient(lang=lang)
-        _OCR_CLIENTS[lang] = client
-    return client
+def _preload_langs() -> tuple[str, ...]:
+    configured = os.getenv("OCR_PRELOAD_LANGS", "").strip()
+    if not configured:
+        return (_select_ocr_lang(),)
+    return tuple(dict.fromkeys(item.strip().lower() for item in configured.split(",") if item.strip()))
+
+
+def _get_ocr_client(lang: str) -> PaddleOcrClient | PooledOcrClient:
+    with _OCR_CLIENTS_LOCK:
+        client = _OCR_CLIENTS.get(lang)
+        if client is None:
+            if OCR_PROCESS_WORKERS > 0:
+                pool = get_ocr_process_pool(OCR_PROCESS_WORKERS, _preload_langs(), OCR_TIMEOUT_SECONDS)
+                client = PooledOcrClient(pool, lang)
+            else:
+                client = PaddleOcrClient(lang=lang)
+            _OCR_CLIENTS[lang] = client
+        return client
 
 
 def _resolve_attachment_path(attachment_path: str) -> Path:
@@ -68,19 +93,48 @@ def run(state: TicketState) -> dict[str, object]:
         }
 
     ocr_lang = _select_ocr_lang()
-    raw_ocr_text = _get_ocr_client(ocr_lang).extract_text(str(resolved_path))
-    best_text = clean_ocr_text(
-        raw_ocr_text=raw_ocr_text,
-        use_llm=_env_true("OCR_CLEAN_WITH_LLM", "0"),
-    )
+    use_llm = _env_true("OCR_CLEAN_WITH_LLM", "0")
+    # The rewrite depends on the model, so switching models must not reuse old results.
+    clean_mode = f"llm:{get_settings().ollama_model}" if use_llm else "plain"
+    variants = ",".join(enabled_variants())
+    try:
+        data: bytes | None = resolved_path.read_bytes()
+    except OSError:
+        data = None
+    digest = attachment_digest(data) if data is not None else ""
+
+    cache = get_ocr_cache()
+    cached = cache.get(digest, ocr_lang, variants) if digest else None
+    if cached is not None:
+        raw_ocr_text = str(cached.get("raw_text", ""))
+        cleaned = dict(cached.get("cleaned") or {})
+    else:
+        client = _get_ocr_client(ocr_lang)
+        if data is not None:
+            raw_ocr_text = client.extract_text_from_bytes(data, source=str(resolved_path))
+        else:
+            raw_ocr_text = client.extract_text(str(resolved_path))
+        cleaned = {}
+
+    best_text = cleaned.get(clean_mode)
+    if best_text is None:
+        best_text, llm_applied = clean_ocr_text_with_status(raw_ocr_text=raw_ocr_text, use_llm=use_llm)
+        # A failed LLM rewrite falls back to plain cleanup; caching that under the
+        # LLM mode would keep the fallback forever, so it is retried next time.
+        if llm_applied or not use_llm:
+            cleaned[clean_mode] = best_text
+        # Empty OCR output may mean the engine is unavailable, so it is not cached.
+        if digest and raw_ocr_text and (clean_mode in cleaned or cached is None):
+            cache.put(digest, ocr_lang, variants, raw_ocr_text, cleaned)
 
     logger.info(
-        "OCR completed for ticket_id=%s path=%s raw_length=%s clean_length=%s lang=%s",
+        "OCR completed for ticket_id=%s path=%s raw_length=%s clean_length=%s lang=%s cached=%s",
         state.get("ticket_id", ""),
         str(resolved_path),
         len(raw_ocr_text),
         len(best_text),
         ocr_lang,
+        cached is not None,
     )
 
     if not best_text:
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import logging
 import os
+from dataclasses import dataclass
 
 from pipeline_service.application.state.ticket_state import TicketState
 from pipeline_service.domain.services.normalization import (
@@ -11,7 +12,17 @@ from pipeline_service.domain.services.normalization import (
     normalize_country_code,
     normalize_whitespace,
 )
-from pipeline_service.infrastructure.geo import NominatimClient
+from pipeline_service.infrastructure.geo import (
+    AsyncNominatimClient,
+    GazetteerMatch,
+    NominatimClient,
+    RaceOutcome,
+    arace_variants,
+    get_gazetteer,
+    hedge_delay_ms,
+    host_latency_ewma_ms,
+    race_variants,
+)
 from pipeline_service.infrastructure.llm.ollama_client import OllamaClient
 
 logger = logging.getLogger(__name__)
@@ -108,7 +119,7 @@ def _is_locality_level_hit(result: dict[str, object], city: str) -> bool:
     return has_locality or (city_lower and city_lower in display_name)
 
 
-def _normalize_query_with_llm(
+def _llm_prompt(
     country: str,
     region: str,
     city: str,
@@ -117,10 +128,7 @@ def _normalize_query_with_llm(
     raw_address: str,
     raw_text: str,
 ) -> str:
-    if not _env_true("GEO_USE_LLM_NORMALIZATION", "1"):
-        return ""
-
-    prompt = (
+    return (
         "Нормализуй адрес для геокодирования в Казахстане. "
         "Верни только одну строку адреса без пояснений. "
         "Используй формат: '<город>, <область>, Казахстан, <улица> <дом>' если возможно.\n\n"
@@ -132,138 +140,207 @@ def _normalize_query_with_llm(
         f"raw_address={raw_address}\n"
         f"raw_text={raw_text}\n"
     )
+
+
+def _parse_llm_query(response: str) -> str:
+    normalized = normalize_whitespace(response.splitlines()[0] if response else "")
+    if not normalized or normalized.lower().startswith("stub-llm-response"):
+        return ""
+    return normalized
+
+
+def _normalize_query_with_llm(
+    country: str,
+    region: str,
+    city: str,
+    street: str,
+    house: str,
+    raw_address: str,
+    raw_text: str,
+) -> str:
+    if not _env_true("GEO_USE_LLM_NORMALIZATION", "1"):
+        return ""
+
+    prompt = _llm_prompt(country, region, city, street, house, raw_address, raw_text)
     try:
-        response = OllamaClient().generate(prompt=prompt)
-        normalized = normalize_whitespace(response.splitlines()[0] if response else "")
-        if not normalized or normalized.lower().startswith("stub-llm-response"):
-            return ""
-        return normalized
+        return _parse_llm_query(OllamaClient().generate_first_line(prompt=prompt))
     except Exception:
         return ""
 
 
-def run(state: TicketState) -> dict[str, object]:
+async def _anormalize_query_with_llm(
+    country: str,
+    region: str,
+    city: str,
+    street: str,
+    house: str,
+    raw_address: str,
+    raw_text: str,
+) -> str:
+    if not _env_true("GEO_USE_LLM_NORMALIZATION", "1"):
+        return ""
+
+    prompt = _llm_prompt(country, region, city, street, house, raw_address, raw_text)
     try:
-        country_raw = state.get("country")
-        country = normalize_country_code(country_raw)
-        if not country:
-            return _fallback(
-                "empty_country",
-                "",
-                normalize_whitespace(state.get("region")),
-                normalize_whitespace(state.get("city")),
-                normalize_whitespace(state.get("street")),
-                normalize_whitespace(state.get("house")),
-            )
-
-        if country != "KZ":
-            return _fallback(
-                "non_kz",
-                country,
-                normalize_whitespace(state.get("region")),
-                normalize_whitespace(state.get("city")),
-                normalize_whitespace(state.get("street")),
-                normalize_whitespace(state.get("house")),
-            )
-
-        region = normalize_whitespace(state.get("region"))
-        city = normalize_whitespace(state.get("city"))
-        street = normalize_whitespace(state.get("street"))
-        house = normalize_whitespace(state.get("house"))
-        raw_address = normalize_whitespace(state.get("raw_address"))
-        raw_text = normalize_whitespace(state.get("raw_text"))
-
-        hints = extract_address_hints(raw_address, raw_text)
-        region = region or hints.get("region", "")
-        city = city or hints.get("city", "")
-        street = street or hints.get("street", "")
-        house = house or hints.get("house", "")
-
-        normalized_address = build_normalized_address(country, region, city, street, house)
-
-        has_geocode_input = bool((city and (street or house or region))
-                                 or raw_address or normalized_address)
-        if not has_geocode_input:
-            return _fallback("empty_address", country, region, city, street,
-                             house)
-
-        if not _env_true("GEOCODER_ENABLED", "0"):
-            return {
-                "country": country,
-                "region": region,
-                "city": city,
-                "street": street,
-                "house": house,
-                "geo_result": {
-                    "status": "ok",
-                    "lat": 43.238949,
-                    "lon": 76.889709,
-                    "source": "stub_almaty",
-                    "normalized_address": normalized_address,
-                },
-            }
-
-        client = NominatimClient(
-            base_url=os.getenv("GEOCODER_BASE_URL",
-                               "https://nominatim.openstreetmap.org"),
-            user_agent=os.getenv("GEOCODER_USER_AGENT",
-                                 "fire-pipeline-service/0.1"),
-            timeout_s=_timeout_seconds(),
+        return _parse_llm_query(await OllamaClient().agenerate_first_line(prompt=prompt))
+    except Exception:
+        return ""
+
+
+def _lookup_locality(region: str, city: str) -> GazetteerMatch | None:
+    if not _env_true("GEO_GAZETTEER_ENABLED", "1"):
+        return None
+    gazetteer = get_gazetteer()
+    if city:
+        return gazetteer.lookup(city, region=region)
+    if region:
+        return gazetteer.lookup_region(region)
+    return None
+
+
+def _gazetteer_result(
+    match: GazetteerMatch,
+    country: str,
+    region: str,
+    city: str,
+    street: str,
+    house: str,
+    normalized_address: str,
+) -> dict[str, object]:
+    locality = match.locality
+    return {
+        "country": country,
+        "region": region,
+        "city": city,
+        "street": street,
+        "house": house,
+        "geo_result": {
+            "status": "ok",
+            "lat": locality.lat,
+            "lon": locality.lon,
+            "source": "gazetteer_region" if locality.kind == "region" else "gazetteer_locality",
+            "normalized_address": normalized_address,
+            "matched_name": locality.name,
+        },
+    }
+
+
+@dataclass(frozen=True)
+class _GeoRequest:
+    country: str
+    region: str
+    city: str
+    street: str
+    house: str
+    raw_address: str
+    raw_text: str
+    normalized_address: str
+    locality: GazetteerMatch | None = None
+    locality_hint: str = ""
+
+    def fallback(self, reason: str) -> dict[str, object]:
+        if self.locality is not None:
+            return _gazetteer_result(self.locality, self.country, self.region, self.city, self.street, self.house,
+                                     self.normalized_address)
+        return _fallback(reason, self.country, self.region, self.city, self.street, self.house)
+
+    def query_variants(self, llm_query: str) -> list[str]:
+        variants = _build_query_variants(
+            country=self.country,
+            region=self.region,
+            city=self.city,
+            street=self.street,
+            house=self.house,
+            raw_address=self.raw_address,
+            llm_query=llm_query,
         )
+        if self.locality_hint:
+            hint = normalize_whitespace(", ".join(part for part in (self.locality_hint, self.region, "Казахстан") if part))
+            if hint.casefold() not in {variant.casefold() for variant in variants}:
+                variants.append(hint)
+        return variants
+
+    def broad_query(self) -> str:
+        return normalize_whitespace(f"{self.city}, Казахстан") if self.city else ""
+
+    def race_queries(self, llm_query: str) -> list[str]:
+        # The city-only query is the last resort when the gazetteer cannot back us up.
+        queries = self.query_variants(llm_query)
+        broad_query = self.broad_query()
+        if self.locality is None and broad_query and broad_query not in queries:
+            queries.append(broad_query)
+        return queries
+
+
+def _exception_fallback(state: TicketState) -> dict[str, object]:
+    return _fallback(
+        "exception",
+        normalize_whitespace(state.get("country")),
+        normalize_whitespace(state.get("region")),
+        normalize_whitespace(state.get("city")),
+        normalize_whitespace(state.get("street")),
+        normalize_whitespace(state.get("house")),
+    )
 
-        llm_query = _normalize_query_with_llm(
-            country=country,
-            region=region,
-            city=city,
-            street=street,
-            house=house,
-            raw_address=raw_address,
-            raw_text=raw_text,
+
+def _prepare(state: TicketState) -> dict[str, object] | _GeoRequest:
+    # Returns a final state update when no geocoder call is needed.
+    country_raw = state.get("country")
+    country = normalize_country_code(country_raw)
+    if not country:
+        return _fallback(
+            "empty_country",
+            "",
+            normalize_whitespace(state.get("region")),
+            normalize_whitespace(state.get("city")),
+            normalize_whitespace(state.get("street")),
+            normalize_whitespace(state.get("house")),
         )
-        query_variants = _build_query_variants(
-            country=country,
-            region=region,
-            city=city,
-            street=street,
-            house=house,
-            raw_address=raw_address,
-            llm_query=llm_query,
+
+    if country != "KZ":
+        return _fallback(
+            "non_kz",
+            country,
+            normalize_whitespace(state.get("region")),
+            normalize_whitespace(state.get("city")),
+            normalize_whitespace(state.get("street")),
+            normalize_whitespace(state.get("house")),
         )
 
-        result = None
-        attempted: list[str] = []
-        for query in query_variants:
-            detailed = client.geocode_detailed(query=query, country_codes="kz")
-            attempted.append(query)
-            logger.info(
-                "Geocode attempt query=%r first_candidate=%s error=%s",
-                query,
-                detailed.get("first_candidate"),
-                detailed.get("error"),
-            )
-            result = detailed.get("result")
-            if result:
-                break
-
-        if not result:
-            broad_query = normalize_whitespace(f"{city}, Казахстан") if city else ""
-            if broad_query and broad_query not in attempted:
-                detailed = client.geocode_detailed(query=broad_query, country_codes="kz")
-                logger.info(
-                    "Geocode broad fallback query=%r first_candidate=%s error=%s",
-                    broad_query,
-                    detailed.get("first_candidate"),
-                    detailed.get("error"),
-                )
-                result = detailed.get("result")
-
-        if not result:
-            return _fallback("geocode_failed", country, region, city, street, house)
-
-        source = "nominatim"
-        if city and _is_locality_level_hit(result, city) and not (street and house):
-            source = "nominatim_locality"
+    region = normalize_whitespace(state.get("region"))
+    city = normalize_whitespace(state.get("city"))
+    street = normalize_whitespace(state.get("street"))
+    house = normalize_whitespace(state.get("house"))
+    raw_address = normalize_whitespace(state.get("raw_address"))
+    raw_text = normalize_whitespace(state.get("raw_text"))
 
+    hints = extract_address_hints(raw_address, raw_text)
+    region = region or hints.get("region", "")
+    city = city or hints.get("city", "")
+    street = street or hints.get("street", "")
+    house = house or hints.get("house", "")
+
+    normalized_address = build_normalized_address(country, region, city, street, house)
+
+    has_geocode_input = bool((city and (street or house or region))
+                             or raw_address or normalized_address)
+    if not has_geocode_input:
+        return _fallback("empty_address", country, region, city, street,
+                         house)
+
+    # City-level precision is all the gazetteer can give, so only street+house
+    # addresses still need Nominatim; it also backs up a disabled or failing geocoder.
+    # Prefix and fuzzy matches are only guesses: with a geocoder they become an
+    # extra query variant instead of final coordinates.
+    locality = _lookup_locality(region, city)
+    geocoder_enabled = _env_true("GEOCODER_ENABLED", "0")
+    exact = locality is not None and locality.match == "exact"
+    if locality is not None and (
+        not geocoder_enabled or (exact and locality.locality.kind != "region" and not (street and house))
+    ):
+        return _gazetteer_result(locality, country, region, city, street, house, normalized_address)
+
+    if not geocoder_enabled:
         return {
             "country": country,
             "region": region,
@@ -272,18 +349,132 @@ def run(state: TicketState) -> dict[str, object]:
             "house": house,
             "geo_result": {
                 "status": "ok",
-                "lat": result["lat"],
-                "lon": result["lon"],
-                "source": source,
+                "lat": 43.238949,
+                "lon": 76.889709,
+                "source": "stub_almaty",
                 "normalized_address": normalized_address,
             },
         }
+
+    hint = locality.locality.name if locality is not None and not exact and locality.locality.kind != "region" else ""
+    return _GeoRequest(
+        country=country,
+        region=region,
+        city=city,
+        street=street,
+        house=house,
+        raw_address=raw_address,
+        raw_text=raw_text,
+        normalized_address=normalized_address,
+        locality=locality if exact else None,
+        locality_hint=hint,
+    )
+
+
+def _client_kwargs() -> dict[str, object]:
+    return {
+        "base_url": os.getenv("GEOCODER_BASE_URL",
+                              "https://nominatim.openstreetmap.org"),
+        "user_agent": os.getenv("GEOCODER_USER_AGENT",
+                                "fire-pipeline-service/0.1"),
+        "timeout_s": _timeout_seconds(),
+    }
+
+
+def _success(request: _GeoRequest, result: dict[str, object] | None) -> dict[str, object]:
+    if not result:
+        return request.fallback("geocode_failed")
+
+    source = "nominatim"
+    if request.city and _is_locality_level_hit(result, request.city) and not (request.street and request.house):
+        source = "nominatim_locality"
+
+    return {
+        "country": request.country,
+        "region": request.region,
+        "city": request.city,
+        "street": request.street,
+        "house": request.house,
+        "geo_result": {
+            "status": "ok",
+            "lat": result["lat"],
+            "lon": result["lon"],
+            "source": source,
+            "normalized_address": request.normalized_address,
+        },
+    }
+
+
+def _log_attempt(label: str, query: str, detailed: dict[str, object]) -> None:
+    logger.info(
+        "%s query=%r first_candidate=%s error=%s",
+        label,
+        query,
+        detailed.get("first_candidate"),
+        detailed.get("error"),
+    )
+
+
+def _race_result(request: _GeoRequest, outcome: RaceOutcome) -> dict[str, object]:
+    for query, detailed in outcome.attempts:
+        _log_attempt("Geocode attempt", query, detailed)
+    detailed = outcome.detailed or {}
+    return _success(request, detailed.get("result"))
+
+
+def run(state: TicketState) -> dict[str, object]:
+    try:
+        request = _prepare(state)
+        if isinstance(request, dict):
+            return request
+
+        client_kwargs = _client_kwargs()
+        client = NominatimClient(**client_kwargs)
+
+        llm_query = _normalize_query_with_llm(
+            country=request.country,
+            region=request.region,
+            city=request.city,
+            street=request.street,
+            house=request.house,
+            raw_address=request.raw_address,
+            raw_text=request.raw_text,
+        )
+
+        outcome = race_variants(
+            request.race_queries(llm_query),
+            lambda query: client.geocode_detailed(query=query, country_codes="kz"),
+            hedge_ms=hedge_delay_ms(host_latency_ewma_ms(str(client_kwargs["base_url"]))),
+        )
+        return _race_result(request, outcome)
     except Exception:
-        return _fallback(
-            "exception",
-            normalize_whitespace(state.get("country")),
-            normalize_whitespace(state.get("region")),
-            normalize_whitespace(state.get("city")),
-            normalize_whitespace(state.get("street")),
-            normalize_whitespace(state.get("house")),
+        return _exception_fallback(state)
+
+
+async def arun(state: TicketState) -> dict[str, object]:
+    try:
+        request = _prepare(state)
+        if isinstance(request, dict):
+            return request
+
+        client_kwargs = _client_kwargs()
+        client = AsyncNominatimClient(**client_kwargs)
+
+        llm_query = await _anormalize_query_with_llm(
+            country=request.country,
+            region=request.region,
+            city=request.city,
+            street=request.street,
+            house=request.house,
+            raw_address=request.raw_address,
+            raw_text=request.raw_text,
         )
+
+        outcome = await arace_variants(
+            request.race_queries(llm_query),
+            lambda query: client.ageocode_detailed(query=query, country_codes="kz"),
+            hedge_ms=hedge_delay_ms(host_latency_ewma_ms(str(client_kwargs["base_url"]))),
+        )
+        return _race_result(request, outcome)
+    except Exception:
+        return _exception_fallback(state)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import os
 import re
 
@@ -13,6 +14,13 @@ from pipeline_service.application.state.ticket_state import TicketState
 _DEFAULT_LANGUAGE = "RU"
 _CONFIDENCE_THRESHOLD = 0.7
 _MODEL_PATH = os.getenv("FASTTEXT_MODEL_PATH", "lid.176.ftz")
+_LABEL_TO_LANGUAGE = {
+    "ru": "RU",
+    "kk": "KZ",
+    "en": "ENG",
+}
+
+logger = logging.getLogger(__name__)
 
 try:
     _FASTTEXT_MODEL = fasttext.load_model(_MODEL_PATH) if fasttext is not None else None
@@ -24,6 +32,17 @@ def _normalize_text(value: str) -> str:
     return re.sub(r"\s+", " ", value.lower().strip())
 
 
+def _map_prediction(labels: object, scores: object) -> str:
+    if labels is None or scores is None or len(labels) == 0 or len(scores) == 0:
+        return _DEFAULT_LANGUAGE
+
+    label = str(labels[0]).replace("__label__", "")
+    confidence = float(scores[0])
+    if confidence < _CONFIDENCE_THRESHOLD:
+        return _DEFAULT_LANGUAGE
+    return _LABEL_TO_LANGUAGE.get(label, _DEFAULT_LANGUAGE)
+
+
 def run(state: TicketState) -> dict[str, object]:
     try:
         text = _normalize_text(state.get("raw_text", ""))
@@ -31,21 +50,38 @@ def run(state: TicketState) -> dict[str, object]:
             return {"language": _DEFAULT_LANGUAGE}
 
         labels, scores = _FASTTEXT_MODEL.predict(text, k=1)
-        if not labels or not scores:
-            return {"language": _DEFAULT_LANGUAGE}
-
-        label = str(labels[0]).replace("__label__", "")
-        confidence = float(scores[0])
-        if confidence < _CONFIDENCE_THRESHOLD:
-            return {"language": _DEFAULT_LANGUAGE}
-
-        mapping = {
-            "ru": "RU",
-            "kk": "KZ",
-            "en": "ENG",
-        }
-        language = mapping.get(label, _DEFAULT_LANGUAGE)
+        language = _map_prediction(labels, scores)
     except Exception:
         language = _DEFAULT_LANGUAGE
 
     return {"language": language}
+
+
+def detect_many(texts: list[str]) -> list[str]:
+    languages = [_DEFAULT_LANGUAGE] * len(texts)
+    if _FASTTEXT_MODEL is None:
+        return languages
+
+    positions: list[int] = []
+    normalized: list[str] = []
+    for idx, text in enumerate(texts):
+        value = _normalize_text(text or "")
+        if value:
+            positions.append(idx)
+            normalized.append(value)
+    if not normalized:
+        return languages
+
+    try:
+        # One native call for the whole batch instead of one predict() per ticket.
+        batch_labels, batch_scores = _FASTTEXT_MODEL.predict(normalized, k=1)
+    except Exception:
+        logger.warning("Batch language detection failed, using default language", exc_info=True)
+        return languages
+
+    for idx, labels, scores in zip(positions, batch_labels, batch_scores):
+        try:
+            languages[idx] = _map_prediction(labels, scores)
+        except Exception:
+            languages[idx] = _DEFAULT_LANGUAGE
+    return languages
@@ -7,6 +7,9 @@ from functools import lru_cache
 from pathlib import Path
 
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.batching import length_buckets
+from pipeline_service.infrastructure.cache import InferenceCache, get_inference_cache
+from pipeline_service.infrastructure.onnx_runtime import load_onnx_classifier, onnx_runtime_enabled, softmax
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[4]
 LOCAL_MODEL_PATH = os.getenv(
@@ -16,6 +19,7 @@ LOCAL_MODEL_PATH = os.getenv(
 DEFAULT_SENTIMENT = "Нейтральный"
 MAX_TEXT_LENGTH = 600
 ENABLE_INT8_QUANTIZATION = os.getenv("SENTIMENT_INT8", "1") == "1"
+BATCH_BUCKET_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))
 
 _LABEL_TO_SENTIMENT = {
     "negative": "Негативный",
@@ -79,12 +83,9 @@ def _ensure_torch_compile_compat(model_path: Path) -> None:
         logger.debug("Failed to apply ModernBERT compile compatibility patch", exc_info=True)
 
 
-@lru_cache(maxsize=1)
-def _get_local_components():
+def _load_fp_model(model_path: Path):
     from transformers import AutoModelForSequenceClassification, AutoTokenizer
-    import torch
 
-    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
     _ensure_torch_compile_compat(model_path)
     if not model_path.exists():
         raise RuntimeError(f"Sentiment model path does not exist: {model_path}")
@@ -103,6 +104,16 @@ def _get_local_components():
             model.config.reference_compile = False
         except Exception:
             logger.debug("Unable to disable ModernBERT reference_compile", exc_info=True)
+    model.eval()
+    return tokenizer, model
+
+
+@lru_cache(maxsize=1)
+def _get_local_components():
+    import torch
+
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    tokenizer, model = _load_fp_model(model_path)
 
     if ENABLE_INT8_QUANTIZATION:
         try:
@@ -120,6 +131,29 @@ def _get_local_components():
     return tokenizer, model
 
 
+@lru_cache(maxsize=1)
+def _get_onnx_components():
+    from transformers import AutoConfig, AutoTokenizer
+
+    # No torch import here, so the ModernBERT torch.compile patch is not needed.
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    tokenizer = AutoTokenizer.from_pretrained(str(model_path), local_files_only=True)
+    config = AutoConfig.from_pretrained(str(model_path), local_files_only=True)
+    return tokenizer, load_onnx_classifier(model_path), getattr(config, "id2label", {}) or {}
+
+
+@lru_cache(maxsize=1)
+def _onnx_ready() -> bool:
+    if not onnx_runtime_enabled():
+        return False
+    try:
+        _get_onnx_components()
+        return True
+    except Exception:
+        logger.warning("ONNX sentiment model is not loadable, using PyTorch", exc_info=True)
+        return False
+
+
 def _extract_label(result: object) -> str:
     if isinstance(result, list) and result:
         item = result[0]
@@ -135,27 +169,69 @@ def _extract_label(result: object) -> str:
     return str(getattr(result, "label", "neutral"))
 
 
-@lru_cache(maxsize=512)
-def _infer_text_classification(text: str):
-    import torch
-
-    tokenizer, model = _get_local_components()
+def _run_model_many(texts: list[str]) -> list[dict[str, object]]:
+    use_onnx = _onnx_ready()
+    if use_onnx:
+        tokenizer, classifier, id2label = _get_onnx_components()
+    else:
+        tokenizer, model = _get_local_components()
+        id2label = getattr(model.config, "id2label", {}) or {}
     encoded = tokenizer(
-        text,
-        return_tensors="pt",
+        texts,
         truncation=True,
         max_length=MAX_TEXT_LENGTH,
     )
+    results: list[dict[str, object]] = [{} for _ in texts]
+
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    for bucket in length_buckets(lengths, BATCH_BUCKET_SIZE):
+        features = [{key: encoded[key][idx] for key in encoded.keys()} for idx in bucket]
+        if use_onnx:
+            padded = tokenizer.pad(features, padding="longest", return_tensors="np")
+            probs = softmax(classifier.logits(padded))
+            pred_indices = probs.argmax(axis=-1).tolist()
+            scores = probs.max(axis=-1).tolist()
+        else:
+            import torch
+
+            padded = tokenizer.pad(features, padding="longest", return_tensors="pt")
+            with torch.inference_mode():
+                logits = model(**padded).logits
+                probs = torch.nn.functional.softmax(logits, dim=-1)
+                max_scores, max_indices = torch.max(probs, dim=-1)
+            pred_indices = max_indices.tolist()
+            scores = max_scores.tolist()
+
+        for row, idx in enumerate(bucket):
+            pred_idx = int(pred_indices[row])
+            label = id2label.get(pred_idx) or id2label.get(str(pred_idx)) or f"label_{pred_idx}"
+            results[idx] = {"label": label, "score": float(scores[row])}
+    return results
+
+
+def _model_files() -> list[Path]:
+    if _onnx_ready():
+        _, classifier, _ = _get_onnx_components()
+        return [classifier.model_file]
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    return [model_path / name for name in ("model.safetensors", "pytorch_model.bin", "config.json")]
 
-    with torch.inference_mode():
-        logits = model(**encoded).logits
-        probs = torch.nn.functional.softmax(logits, dim=-1)
-        pred_idx = int(torch.argmax(probs, dim=-1).item())
-        score = float(probs[0, pred_idx].item())
 
-    id2label = getattr(model.config, "id2label", {}) or {}
-    label = id2label.get(pred_idx) or id2label.get(str(pred_idx)) or f"label_{pred_idx}"
-    return {"label": label, "score": score}
+@lru_cache(maxsize=1)
+def _inference_cache() -> InferenceCache:
+    if _onnx_ready():
+        runtime = "onnx"
+    else:
+        runtime = "torch-int8" if ENABLE_INT8_QUANTIZATION else "torch"
+    return get_inference_cache(f"sentiment:{runtime}", _model_files)
+
+
+def _infer_text_classification_many(texts: list[str]) -> list[dict[str, object]]:
+    return _inference_cache().resolve_many(texts, _run_model_many)
+
+
+def _infer_text_classification(text: str):
+    return _infer_text_classification_many([text])[0]
 
 
 def _map_model_label(label: str) -> str:
@@ -177,3 +253,27 @@ def run(state: TicketState) -> dict[str, object]:
         sentiment = DEFAULT_SENTIMENT
 
     return {"sentiment": sentiment}
+
+
+def classify_many(texts: list[str]) -> list[str]:
+    sentiments = [DEFAULT_SENTIMENT] * len(texts)
+    positions: dict[str, list[int]] = {}
+    for idx, text in enumerate(texts):
+        prepared = (text or "").strip()[:MAX_TEXT_LENGTH]
+        if prepared:
+            positions.setdefault(prepared, []).append(idx)
+    if not positions:
+        return sentiments
+
+    unique_texts = list(positions)
+    try:
+        results = _infer_text_classification_many(unique_texts)
+    except Exception:
+        logger.exception("Batch sentiment inference failed for local model at %s", LOCAL_MODEL_PATH)
+        return sentiments
+
+    for text, result in zip(unique_texts, results):
+        sentiment = _map_model_label(_extract_label(result))
+        for idx in positions[text]:
+            sentiments[idx] = sentiment
+    return sentiments
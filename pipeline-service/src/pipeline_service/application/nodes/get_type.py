@@ -7,6 +7,10 @@ from functools import lru_cache
 from pathlib import Path
 
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.batching import MicroBatcher, length_buckets
+from pipeline_service.infrastructure.cache import InferenceCache, get_inference_cache
+from pipeline_service.infrastructure.cascade import InferenceCascade, KeywordScorer
+from pipeline_service.infrastructure.onnx_runtime import load_onnx_classifier, onnx_runtime_enabled
 
 TICKET_TYPES = [
     "Жалоба",
@@ -21,6 +25,11 @@ TICKET_TYPES = [
 DEFAULT_TICKET_TYPE = "Консультация"
 MAX_TEXT_LENGTH = 600
 LOCAL_MODEL_PATH = os.getenv("TYPE_MODEL_PATH", "models/type_recognition")
+BATCH_MAX_SIZE = int(os.getenv("TYPE_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("TYPE_BATCH_MAX_WAIT_MS", "5"))
+CASCADE_ENABLED = os.getenv("TYPE_CASCADE_ENABLED", "0") in {"1", "true", "True"}
+CASCADE_THRESHOLD = float(os.getenv("TYPE_CASCADE_THRESHOLD", "0.7"))
+CASCADE_AUDIT_RATE = float(os.getenv("TYPE_CASCADE_AUDIT_RATE", "0.05"))
 _PROJECT_ROOT = Path(__file__).resolve().parents[4]
 
 _LABEL_TO_TICKET_TYPE = {
@@ -47,8 +56,66 @@ _LABEL_TO_TICKET_TYPE = {
     "label_6": "Спам",
 }
 
+# Fast-path rules for the cascade. Weights are tuned so that only strong, unopposed
+# evidence clears CASCADE_THRESHOLD; everything else goes to XLM-R.
+_TYPE_KEYWORD_RULES = {
+    "Мошеннические действия": (
+        ("мошенн", 2.0),
+        ("украли", 1.5),
+        ("взлом", 1.5),
+        ("без моего ведома", 2.0),
+        ("несанкционирован", 2.0),
+    ),
+    "Неработоспособность приложения": (
+        ("не открыва", 2.0),
+        ("не могу войти", 2.0),
+        ("не работает", 1.5),
+        ("вылета", 1.5),
+        ("зависа", 1.5),
+        ("ошибка", 1.0),
+    ),
+    "Смена данных": (
+        ("смена данных", 3.0),
+        ("изменить данные", 2.0),
+        ("сменить номер", 2.0),
+        ("изменить номер", 2.0),
+        ("поменять номер", 2.0),
+        ("смена номера", 2.0),
+        ("сменить фамил", 2.0),
+        ("обновить паспорт", 2.0),
+    ),
+    "Претензия": (
+        ("претензи", 3.0),
+        ("верните деньги", 2.0),
+        ("возврат средств", 1.5),
+        ("компенсац", 1.5),
+    ),
+    "Жалоба": (
+        ("жалоб", 2.5),
+        ("недоволен", 1.5),
+        ("недовольн", 1.5),
+        ("безобраз", 1.5),
+        ("ужасн", 1.0),
+    ),
+    "Консультация": (
+        ("подскажите", 1.5),
+        ("можно ли", 1.5),
+        ("хотел бы узнать", 1.5),
+        ("хотела бы узнать", 1.5),
+        ("вопрос", 1.0),
+    ),
+}
+
 logger = logging.getLogger(__name__)
 
+_CASCADE = InferenceCascade(
+    "get_type",
+    KeywordScorer(_TYPE_KEYWORD_RULES),
+    threshold=CASCADE_THRESHOLD,
+    audit_rate=CASCADE_AUDIT_RATE,
+    enabled=CASCADE_ENABLED,
+)
+
 try:
     from sklearn.exceptions import InconsistentVersionWarning as _SklearnVersionWarning
 except Exception:  # pragma: no cover - fallback for older/newer sklearn variants
@@ -84,16 +151,8 @@ def _resolve_existing_model_path(model_path_value: str) -> Path:
     return primary
 
 
-@lru_cache(maxsize=1)
-def _get_local_components():
-    import joblib
-    import torch
-    from transformers import AutoTokenizer
-    from transformers.models.xlm_roberta.configuration_xlm_roberta import XLMRobertaConfig
-    from transformers.models.xlm_roberta.modeling_xlm_roberta import (
-        XLMRobertaForSequenceClassification,
-    )
-
+def _resolve_artifacts() -> tuple[Path, Path, Path]:
+    """Return (artifact_dir, tokenizer_dir, label_encoder_path) for the type model."""
     model_path = _resolve_existing_model_path(LOCAL_MODEL_PATH)
     if not model_path.exists():
         raise RuntimeError(f"Type model path does not exist: {model_path}")
@@ -110,6 +169,34 @@ def _get_local_components():
     label_encoder_path = artifact_dir / "label_encoder.pkl"
     if not label_encoder_path.exists():
         raise RuntimeError(f"Type label encoder does not exist: {label_encoder_path}")
+    return artifact_dir, tokenizer_dir, label_encoder_path
+
+
+def _load_label_encoder(label_encoder_path: Path):
+    import joblib
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore",
+            category=_SklearnVersionWarning,
+            message=r"Trying to unpickle estimator LabelEncoder from version .*",
+        )
+        label_encoder = joblib.load(str(label_encoder_path))
+    if len(getattr(label_encoder, "classes_", [])) <= 0:
+        raise RuntimeError(f"Type label encoder has no classes: {label_encoder_path}")
+    return label_encoder
+
+
+@lru_cache(maxsize=1)
+def _get_local_components():
+    import torch
+    from transformers import AutoTokenizer
+    from transformers.models.xlm_roberta.configuration_xlm_roberta import XLMRobertaConfig
+    from transformers.models.xlm_roberta.modeling_xlm_roberta import (
+        XLMRobertaForSequenceClassification,
+    )
+
+    artifact_dir, tokenizer_dir, label_encoder_path = _resolve_artifacts()
 
     weights_path = artifact_dir / "best_model.pt"
     if not weights_path.exists():
@@ -121,16 +208,8 @@ def _get_local_components():
                 f"Type model weights do not exist: {weights_path} or {alt_weights}"
             )
 
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            category=_SklearnVersionWarning,
-            message=r"Trying to unpickle estimator LabelEncoder from version .*",
-        )
-        label_encoder = joblib.load(str(label_encoder_path))
-    num_labels = len(getattr(label_encoder, "classes_", []))
-    if num_labels <= 0:
-        raise RuntimeError(f"Type label encoder has no classes: {label_encoder_path}")
+    label_encoder = _load_label_encoder(label_encoder_path)
+    num_labels = len(label_encoder.classes_)
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     tokenizer = AutoTokenizer.from_pretrained(str(tokenizer_dir), local_files_only=True)
@@ -158,17 +237,51 @@ def _get_local_components():
     return tokenizer, model, label_encoder, device
 
 
-@lru_cache(maxsize=512)
-def _infer_text_classification(text: str):
+@lru_cache(maxsize=1)
+def _get_onnx_components():
+    from transformers import AutoTokenizer
+
+    artifact_dir, tokenizer_dir, label_encoder_path = _resolve_artifacts()
+    tokenizer = AutoTokenizer.from_pretrained(str(tokenizer_dir), local_files_only=True)
+    return tokenizer, load_onnx_classifier(artifact_dir), _load_label_encoder(label_encoder_path)
+
+
+@lru_cache(maxsize=1)
+def _onnx_ready() -> bool:
+    if not onnx_runtime_enabled():
+        return False
+    try:
+        _get_onnx_components()
+        return True
+    except Exception:
+        logger.warning("ONNX type model is not loadable, using PyTorch", exc_info=True)
+        return False
+
+
+def _predict_indices_onnx(texts: list[str]) -> tuple[list[int], object]:
+    tokenizer, classifier, label_encoder = _get_onnx_components()
+    encoded = tokenizer(
+        texts,
+        return_tensors="np",
+        truncation=True,
+        max_length=MAX_TEXT_LENGTH,
+        padding="longest",
+    )
+    logits = classifier.logits(encoded)
+    return [int(idx) for idx in logits.argmax(axis=-1).tolist()], label_encoder
+
+
+def _predict_indices_torch(texts: list[str]) -> tuple[list[int], object]:
     import torch
 
     tokenizer, model, label_encoder, device = _get_local_components()
+    # Pad only to the longest text in the batch instead of a fixed length.
     encoded = tokenizer(
-        text,
+        texts,
         return_tensors="pt",
         truncation=True,
         max_length=MAX_TEXT_LENGTH,
-        padding=True,
+        padding="longest",
     )
     encoded = {key: value.to(device) for key, value in encoded.items()}
     with torch.inference_mode():
@@ -179,14 +292,55 @@ def _infer_text_classification(text: str):
                 message=r"`encoder_attention_mask` is deprecated.*",
             )
             logits = model(**encoded).logits
-        probs = torch.nn.functional.softmax(logits, dim=-1)
-        pred_idx = int(torch.argmax(probs, dim=-1).item())
+        pred_indices = [int(idx) for idx in torch.argmax(logits, dim=-1).tolist()]
+    return pred_indices, label_encoder
+
+
+def _infer_text_classification_batch(texts: list[str]) -> list[dict[str, str]]:
+    if _onnx_ready():
+        pred_indices, label_encoder = _predict_indices_onnx(texts)
+    else:
+        pred_indices, label_encoder = _predict_indices_torch(texts)
 
     if hasattr(label_encoder, "inverse_transform"):
-        label = str(label_encoder.inverse_transform([pred_idx])[0])
+        labels = [str(label) for label in label_encoder.inverse_transform(pred_indices)]
     else:
-        label = f"label_{pred_idx}"
-    return {"label": str(label)}
+        labels = [f"label_{idx}" for idx in pred_indices]
+    return [{"label": label} for label in labels]
+
+
+@lru_cache(maxsize=1)
+def _get_batcher() -> MicroBatcher[str, dict[str, str]]:
+    # Shared by every thread in the process so concurrent tickets share forward passes.
+    return MicroBatcher(
+        _infer_text_classification_batch,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_MAX_WAIT_MS,
+        name="type-classifier-batcher",
+    )
+
+
+def _model_files() -> list[Path]:
+    artifact_dir, _, label_encoder_path = _resolve_artifacts()
+    if _onnx_ready():
+        _, classifier, _ = _get_onnx_components()
+        return [classifier.model_file, label_encoder_path]
+    return [artifact_dir / "best_model.pt", artifact_dir / "xlmr_final.pt", label_encoder_path]
+
+
+@lru_cache(maxsize=1)
+def _inference_cache() -> InferenceCache:
+    return get_inference_cache(f"type:{'onnx' if _onnx_ready() else 'torch'}", _model_files)
+
+
+def _infer_text_classification(text: str):
+    cache = _inference_cache()
+    cached = cache.get(text)
+    if cached is not None:
+        return cached
+    result = _get_batcher().run(text)
+    cache.put(text, result)
+    return result
 
 
 def _extract_label(result: object) -> str:
@@ -222,20 +376,50 @@ def _map_model_label(label: str) -> str:
     return ticket_type
 
 
-def run(state: TicketState) -> dict[str, object]:
-    text = (state.get("enriched_text") or state.get("raw_text") or "").strip()
-    if not text:
-        return {"ticket_type": DEFAULT_TICKET_TYPE}
-
-    text = text[:MAX_TEXT_LENGTH]
-    fallback_type = _keyword_fallback(text.lower())
-
+def _classify_with_model(text: str) -> str:
     try:
         result = _infer_text_classification(text)
         label = _extract_label(result)
-        ticket_type = _map_model_label(label)
+        return _map_model_label(label)
     except Exception:
         logger.exception("Type recognition inference failed for local model at %s", LOCAL_MODEL_PATH)
-        ticket_type = fallback_type
+        return _keyword_fallback(text.lower())
 
-    return {"ticket_type": ticket_type}
+
+def _classify_many_with_model(texts: list[str]) -> list[str]:
+    labels: dict[str, str] = {}
+    try:
+        for bucket in length_buckets([len(text) for text in texts], BATCH_MAX_SIZE):
+            bucket_texts = [texts[idx] for idx in bucket]
+            results = _inference_cache().resolve_many(bucket_texts, _infer_text_classification_batch)
+            for text, result in zip(bucket_texts, results):
+                labels[text] = _map_model_label(_extract_label(result))
+    except Exception:
+        logger.exception("Batch type recognition failed for local model at %s", LOCAL_MODEL_PATH)
+    return [labels.get(text) or _keyword_fallback(text.lower()) for text in texts]
+
+
+def run(state: TicketState) -> dict[str, object]:
+    text = (state.get("enriched_text") or state.get("raw_text") or "").strip()
+    if not text:
+        return {"ticket_type": DEFAULT_TICKET_TYPE}
+
+    text = text[:MAX_TEXT_LENGTH]
+    return {"ticket_type": _CASCADE.classify(text, _classify_with_model)}
+
+
+def classify_many(texts: list[str]) -> list[str]:
+    ticket_types = [DEFAULT_TICKET_TYPE] * len(texts)
+    positions: dict[str, list[int]] = {}
+    for idx, text in enumerate(texts):
+        prepared = (text or "").strip()[:MAX_TEXT_LENGTH]
+        if prepared:
+            positions.setdefault(prepared, []).append(idx)
+    if not positions:
+        return ticket_types
+
+    unique_texts = list(positions)
+    for text, ticket_type in zip(unique_texts, _CASCADE.classify_many(unique_texts, _classify_many_with_model)):
+        for idx in positions[text]:
+            ticket_types[idx] = ticket_type
+    return ticket_types
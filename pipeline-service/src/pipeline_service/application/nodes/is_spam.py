@@ -7,11 +7,17 @@ from functools import lru_cache
 from pathlib import Path
 
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.cache import InferenceCache, get_inference_cache
+from pipeline_service.infrastructure.cascade import InferenceCascade
+from pipeline_service.infrastructure.onnx_runtime import load_onnx_classifier, onnx_runtime_enabled, softmax
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[4]
 LOCAL_MODEL_PATH = os.getenv("SPAM_MODEL_PATH", "models/spam_detection")
 MAX_TEXT_LENGTH = 600
 DEFAULT_SPAM_THRESHOLD = float(os.getenv("SPAM_THRESHOLD", "0.5"))
+CASCADE_AUDIT_RATE = float(os.getenv("SPAM_CASCADE_AUDIT_RATE", "0"))
+_SPAM = "spam"
+_HAM = "ham"
 
 _SPAM_KEYWORDS = (
     "spam",
@@ -115,6 +121,27 @@ def _get_local_components():
     return tokenizer, model
 
 
+@lru_cache(maxsize=1)
+def _get_onnx_components():
+    from transformers import AutoConfig
+
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    config = AutoConfig.from_pretrained(str(model_path), local_files_only=True)
+    return _load_tokenizer(model_path), load_onnx_classifier(model_path), getattr(config, "id2label", {}) or {}
+
+
+@lru_cache(maxsize=1)
+def _onnx_ready() -> bool:
+    if not onnx_runtime_enabled():
+        return False
+    try:
+        _get_onnx_components()
+        return True
+    except Exception:
+        logger.warning("ONNX spam model is not loadable, using PyTorch", exc_info=True)
+        return False
+
+
 @lru_cache(maxsize=1)
 def _model_ready() -> bool:
     if not _model_path_exists():
@@ -124,6 +151,8 @@ def _model_ready() -> bool:
         )
         return False
 
+    if _onnx_ready():
+        return True
     try:
         _get_local_components()
         return True
@@ -136,58 +165,135 @@ def _model_ready() -> bool:
         return False
 
 
-@lru_cache(maxsize=512)
-def _infer_spam_probability(text: str) -> float:
+def _spam_probability(probs, id2label: dict) -> float:
+    pred_idx = int(probs.argmax().item())
+    pred_score = float(probs[pred_idx].item())
+    label = str(id2label.get(pred_idx, f"label_{pred_idx}")).lower()
+    if "spam" in label or label == "label_1":
+        return pred_score
+    if "nospam" in label or "ham" in label or label == "label_0":
+        return 1.0 - pred_score
+    return float(probs[1].item()) if probs.shape[-1] > 1 else pred_score
+
+
+def _predict_spam_probabilities(texts: list[str]) -> list[float]:
+    if _onnx_ready():
+        tokenizer, classifier, id2label = _get_onnx_components()
+        encoded = tokenizer(
+            texts,
+            return_tensors="np",
+            truncation=True,
+            max_length=MAX_TEXT_LENGTH,
+            padding="longest",
+        )
+        probs = softmax(classifier.logits(encoded))
+        return [_spam_probability(row, id2label) for row in probs]
+
     import torch
 
     tokenizer, model = _get_local_components()
     encoded = tokenizer(
-        text,
+        texts,
         return_tensors="pt",
         truncation=True,
         max_length=MAX_TEXT_LENGTH,
+        padding="longest",
     )
     with torch.inference_mode():
         logits = model(**encoded).logits
         probs = torch.nn.functional.softmax(logits, dim=-1)
-        pred_idx = int(torch.argmax(probs, dim=-1).item())
-        pred_score = float(probs[0, pred_idx].item())
 
     id2label = getattr(model.config, "id2label", {}) or {}
-    label = str(id2label.get(pred_idx, f"label_{pred_idx}")).lower()
-    if "spam" in label or label == "label_1":
-        return pred_score
-    if "nospam" in label or "ham" in label or label == "label_0":
-        return 1.0 - pred_score
-    return float(probs[0, 1].item()) if probs.shape[-1] > 1 else pred_score
+    return [_spam_probability(row, id2label) for row in probs]
+
+
+def _model_files() -> list[Path]:
+    if _onnx_ready():
+        _, classifier, _ = _get_onnx_components()
+        return [classifier.model_file]
+    model_path = _resolve_model_path(LOCAL_MODEL_PATH)
+    return [model_path / name for name in ("model.safetensors", "pytorch_model.bin", "config.json")]
+
+
+@lru_cache(maxsize=1)
+def _inference_cache() -> InferenceCache:
+    return get_inference_cache(f"spam:{'onnx' if _onnx_ready() else 'torch'}", _model_files)
+
+
+def _infer_spam_probabilities(texts: list[str]) -> list[float]:
+    return _inference_cache().resolve_many(texts, _predict_spam_probabilities)
+
+
+def _infer_spam_probability(text: str) -> float:
+    return _infer_spam_probabilities([text])[0]
 
 
 def _keyword_is_spam(text: str) -> bool:
     return any(keyword in text for keyword in _SPAM_KEYWORDS)
 
 
-def run(state: TicketState) -> dict[str, object]:
-    text = (state.get("enriched_text") or state.get("raw_text") or "").lower().strip()
-    if not text:
-        return {"is_spam": False}
+def _keyword_scorer(text: str) -> tuple[str | None, float]:
+    # Keywords only ever confirm spam; anything else is left to the model.
+    return (_SPAM, 1.0) if _keyword_is_spam(text) else (None, 0.0)
 
-    text = text[:MAX_TEXT_LENGTH]
-    if _keyword_is_spam(text):
-        return {"is_spam": True, "ticket_type": "Спам"}
 
-    if not _model_ready():
-        return {"is_spam": False}
+_CASCADE = InferenceCascade("is_spam", _keyword_scorer, threshold=1.0, audit_rate=CASCADE_AUDIT_RATE)
 
+
+def _classify_with_model(text: str) -> str:
+    if not _model_ready():
+        return _HAM
     try:
-        spam_probability = _infer_spam_probability(text)
-        if spam_probability >= DEFAULT_SPAM_THRESHOLD:
-            return {"is_spam": True, "ticket_type": "Спам"}
+        if _infer_spam_probability(text) >= DEFAULT_SPAM_THRESHOLD:
+            return _SPAM
     except Exception:
         logger.warning(
             "Spam detection inference failed for local model at %s",
             LOCAL_MODEL_PATH,
             exc_info=True,
         )
+    return _HAM
 
+
+def _classify_many_with_model(texts: list[str]) -> list[str]:
+    if not _model_ready():
+        return [_HAM] * len(texts)
+    try:
+        probabilities = _infer_spam_probabilities(texts)
+    except Exception:
+        logger.warning(
+            "Batch spam detection inference failed for local model at %s",
+            LOCAL_MODEL_PATH,
+            exc_info=True,
+        )
+        return [_HAM] * len(texts)
+    return [_SPAM if probability >= DEFAULT_SPAM_THRESHOLD else _HAM for probability in probabilities]
+
+
+def run(state: TicketState) -> dict[str, object]:
+    text = (state.get("enriched_text") or state.get("raw_text") or "").lower().strip()
+    if not text:
+        return {"is_spam": False}
+
+    text = text[:MAX_TEXT_LENGTH]
+    if _CASCADE.classify(text, _classify_with_model) == _SPAM:
+        return {"is_spam": True, "ticket_type": "Спам"}
     return {"is_spam": False}
 
+
+def detect_many(texts: list[str]) -> list[bool]:
+    flags = [False] * len(texts)
+    positions: dict[str, list[int]] = {}
+    for idx, text in enumerate(texts):
+        prepared = (text or "").lower().strip()[:MAX_TEXT_LENGTH]
+        if prepared:
+            positions.setdefault(prepared, []).append(idx)
+    if not positions:
+        return flags
+
+    unique_texts = list(positions)
+    for text, label in zip(unique_texts, _CASCADE.classify_many(unique_texts, _classify_many_with_model)):
+        if label == _SPAM:
+            for idx in positions[text]:
+                flags[idx] = True
+    return flags
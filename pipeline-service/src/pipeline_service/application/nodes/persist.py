@@ -1,19 +1,50 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.batching import MicroBatcher
 from pipeline_service.infrastructure.persistence.repository import build_ticket_repository
+from pipeline_service.settings import get_settings
 
 _repository = build_ticket_repository()
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _get_batcher() -> MicroBatcher[dict[str, object], str]:
+    # Group commit: tickets persisted concurrently share one multi-row INSERT,
+    # flushed once PERSIST_BATCH_SIZE rows are buffered or the interval elapses.
+    # If the group insert fails, rows are saved one by one so a bad row only
+    # fails its own ticket.
+    settings = get_settings()
+    return MicroBatcher(
+        _repository.save_many,
+        max_batch_size=settings.persist_batch_size,
+        max_wait_ms=settings.persist_flush_interval_ms,
+        name="persist-batcher",
+        item_fn=_repository.save,
+    )
+
+
+def _save(payload: dict[str, object]) -> str:
+    if get_settings().persist_batch_size > 1:
+        return _get_batcher().run(payload)
+    return _repository.save(payload)
+
+
 def run(state: TicketState) -> dict[str, object]:
-    persist_id = _repository.save(dict(state))
+    persist_id = _save(dict(state))
     logger.info(
         "Persisted ticket ticket_id=%s persist_id=%s",
         state.get("ticket_id"),
         persist_id,
     )
     return {"persist_id": persist_id}
+
+
+def run_many(states: list[TicketState]) -> list[dict[str, object]]:
+    persist_ids = _repository.save_many([dict(state) for state in states])
+    logger.info("Persisted %s tickets in one batch", len(persist_ids))
+    return [{"persist_id": persist_id} for persist_id in persist_ids]
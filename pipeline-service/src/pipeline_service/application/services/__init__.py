@@ -1,5 +1,11 @@
 """Application services."""
 
-from pipeline_service.application.services.ocr_cleanup import clean_ocr_text
+from pipeline_service.application.services.ocr_cleanup import clean_ocr_text, clean_ocr_text_with_status
+from pipeline_service.application.services.ticket_dedup import (
+    TicketDeduplicator,
+    dedup_tickets,
+    fan_out,
+    get_dedup_stats,
+)
 
-__all__ = ["clean_ocr_text"]
+__all__ = ["TicketDeduplicator", "clean_ocr_text", "clean_ocr_text_with_status", "dedup_tickets", "fan_out", "get_dedup_stats"]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
+from typing import IO, Iterator
 
+from pipeline_service.application.services.ticket_dedup import dedup_tickets
 from pipeline_service.application.state.ticket_state import TicketState
-from pipeline_service.infrastructure.ingestion.csv_reader import read_csv_rows
+from pipeline_service.infrastructure.ingestion.csv_reader import iter_csv_rows
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +34,17 @@ def _build_raw_address(country: str, region: str, city: str, street: str, house:
     return ", ".join([part for part in parts if part])
 
 
-def load_tickets_from_csv(path: str) -> list[TicketState]:
-    rows = read_csv_rows(path, required_headers=REQUIRED_COLUMNS)
-    tickets: list[TicketState] = []
+def iter_tickets_from_csv(source: str | Path | IO[str]) -> Iterator[TicketState]:
+    """Parse tickets lazily so processing can start on the first row.
+
+    Tickets are tagged with their duplicate cluster (see ``ticket_dedup``) so
+    the runners enrich each cluster once.
+    """
+    return dedup_tickets(_iter_rows(source))
+
 
+def _iter_rows(source: str | Path | IO[str]) -> Iterator[TicketState]:
+    rows = iter_csv_rows(source, required_headers=REQUIRED_COLUMNS)
     for index, row in enumerate(rows, start=1):
         ticket_id = _clean(row.get("GUID клиента"))
         if not ticket_id:
@@ -64,6 +74,8 @@ def load_tickets_from_csv(path: str) -> list[TicketState]:
             "segment": _clean(row.get("Сегмент клиента")),
             "attachments": _clean(row.get("Вложения")),
         }
-        tickets.append(state)
+        yield state
 
-    return tickets
+
+def load_tickets_from_csv(path: str) -> list[TicketState]:
+    return list(iter_tickets_from_csv(path))
@@ -74,6 +74,11 @@ def _llm_rewrite(text: str) -> str:
 
 
 def clean_ocr_text(raw_ocr_text: str, use_llm: bool = False) -> str:
+    return clean_ocr_text_with_status(raw_ocr_text, use_llm=use_llm)[0]
+
+
+def clean_ocr_text_with_status(raw_ocr_text: str, use_llm: bool = False) -> tuple[str, bool]:
+    """Clean OCR output; the flag says whether the LLM rewrite produced the text."""
     raw_ocr_text = raw_ocr_text or ""
 
     normalized_lines = [normalize_whitespace(line) for line in raw_ocr_text.splitlines()]
@@ -84,14 +89,14 @@ def clean_ocr_text(raw_ocr_text: str, use_llm: bool = False) -> str:
 
     cleaned = "\n".join(filtered[:20]).strip()
     if not cleaned:
-        return ""
+        return "", False
 
     if use_llm:
         try:
             llm_cleaned = _llm_rewrite(cleaned)
             if llm_cleaned:
-                return llm_cleaned
+                return llm_cleaned, True
         except Exception:
             pass
 
-    return cleaned
+    return cleaned, False
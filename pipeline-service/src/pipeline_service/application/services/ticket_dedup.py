@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Iterable, Iterator
+
+from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.domain.services.normalization import normalize_whitespace
+from pipeline_service.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# State produced by the shared (per-content) stages; duplicates receive a copy of
+# the cluster leader's values instead of recomputing them. Address fields are
+# included because the geocoder fills them in from hints.
+ENRICHMENT_FIELDS: tuple[str, ...] = (
+    "country",
+    "region",
+    "city",
+    "street",
+    "house",
+    "extracted_text",
+    "geo_result",
+    "enriched_text",
+    "language",
+    "sentiment",
+    "is_spam",
+    "ticket_type",
+    "summary",
+    "recommendation",
+    "priority",
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+_NEAR_BUCKET_SIZE = 64
+
+_STATS_LOCK = threading.Lock()
+_STATS: Counter[str] = Counter()
+
+
+def normalize_for_dedup(value: str | None) -> str:
+    return normalize_whitespace(unicodedata.normalize("NFKC", value or "")).casefold()
+
+
+def _context(ticket: TicketState) -> str:
+    # Everything besides the text that shared stages read: two tickets are only
+    # interchangeable when they also agree on address, attachments and segment.
+    parts = (ticket.get("raw_address"), ticket.get("attachments"), ticket.get("segment"))
+    return "\x1f".join(normalize_for_dedup(part) for part in parts)
+
+
+def exact_key(ticket: TicketState) -> str:
+    material = f"{_context(ticket)}\x1e{normalize_for_dedup(ticket.get('raw_text'))}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word unigrams and bigrams of the normalized text."""
+    tokens = _TOKEN_RE.findall(normalize_for_dedup(text))
+    features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+    weights = [0] * 64
+    for feature, count in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def fan_out(leader_state: TicketState, ticket: TicketState) -> TicketState:
+    """Copy the leader's enrichment onto a duplicate, keeping the duplicate's own identity fields."""
+    state: TicketState = dict(ticket)  # type: ignore[assignment]
+    for name in ENRICHMENT_FIELDS:
+        if name in leader_state:
+            state[name] = copy.deepcopy(leader_state[name])  # type: ignore[literal-required]
+    return state
+
+
+class TicketDeduplicator:
+    """Assigns each ticket to a duplicate cluster as it is ingested.
+
+    The first ticket of a cluster is its leader; later ones get ``duplicate_of``
+    set to the leader's ticket id. Clusters are exact matches on normalized text
+    plus context, or, with ``near_duplicates``, texts whose SimHash differs in at
+    most ``max_distance`` bits within the same context. Both ``dedup_key`` and
+    ``duplicate_of`` travel with the ticket into the persisted payload.
+    """
+
+    def __init__(self, near_duplicates: bool = False, max_distance: int = 3, max_clusters: int = 50_000) -> None:
+        self._near_duplicates = near_duplicates
+        self._max_distance = max_distance
+        self._max_clusters = max(1, max_clusters)
+        self._lock = threading.Lock()
+        # exact key -> (cluster key, leader ticket id)
+        self._exact: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        # context hash -> recent (simhash, cluster key, leader ticket id)
+        self._near: dict[str, list[tuple[int, str, str]]] = {}
+
+    def _find_near(self, context_key: str, fingerprint: int) -> tuple[str, str] | None:
+        best: tuple[int, str, str] | None = None
+        for candidate, cluster_key, leader_id in self._near.get(context_key, ()):
+            distance = hamming_distance(candidate, fingerprint)
+            if distance <= self._max_distance and (best is None or distance < best[0]):
+                best = (distance, cluster_key, leader_id)
+        return None if best is None else (best[1], best[2])
+
+    def assign(self, ticket: TicketState) -> TicketState:
+        state: TicketState = dict(ticket)  # type: ignore[assignment]
+        key = exact_key(ticket)
+        kind = "leaders"
+        with self._lock:
+            match = self._exact.get(key)
+            if match is not None:
+                self._exact.move_to_end(key)
+                kind = "exact_duplicates"
+            elif self._near_duplicates:
+                context_key = hashlib.sha256(_context(ticket).encode("utf-8")).hexdigest()
+                fingerprint = simhash(ticket.get("raw_text", ""))
+                match = self._find_near(context_key, fingerprint)
+                if match is not None:
+                    kind = "near_duplicates"
+                else:
+                    bucket = self._near.setdefault(context_key, [])
+                    bucket.append((fingerprint, key, str(ticket.get("ticket_id", ""))))
+                    del bucket[:-_NEAR_BUCKET_SIZE]
+
+            if match is None:
+                match = (key, str(ticket.get("ticket_id", "")))
+            self._exact[key] = match
+            if len(self._exact) > self._max_clusters:
+                self._exact.popitem(last=False)
+
+        cluster_key, leader_id = match
+        state["dedup_key"] = cluster_key
+        if kind != "leaders":
+            state["duplicate_of"] = leader_id
+            logger.info(
+                "Ticket ticket_id=%s is a %s duplicate of ticket_id=%s",
+                ticket.get("ticket_id"),
+                "near" if kind == "near_duplicates" else "exact",
+                leader_id,
+            )
+        with _STATS_LOCK:
+            _STATS["tickets"] += 1
+            _STATS[kind] += 1
+        return state
+
+    def annotate(self, tickets: Iterable[TicketState]) -> Iterator[TicketState]:
+        for ticket in tickets:
+            yield self.assign(ticket)
+
+
+def build_ticket_deduplicator() -> TicketDeduplicator | None:
+    settings = get_settings()
+    if not settings.ticket_dedup_enabled:
+        return None
+    return TicketDeduplicator(
+        near_duplicates=settings.ticket_dedup_near,
+        max_distance=settings.ticket_dedup_max_distance,
+    )
+
+
+def dedup_tickets(tickets: Iterable[TicketState]) -> Iterator[TicketState]:
+    """Annotate a ticket stream with duplicate clusters when TICKET_DEDUP_ENABLED is on."""
+    deduplicator = build_ticket_deduplicator()
+    if deduplicator is None:
+        yield from tickets
+        return
+    yield from deduplicator.annotate(tickets)
+
+
+def get_dedup_stats() -> dict[str, int]:
+    with _STATS_LOCK:
+        return {name: _STATS[name] for name in ("tickets", "leaders", "exact_duplicates", "near_duplicates")}
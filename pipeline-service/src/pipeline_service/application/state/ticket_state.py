@@ -37,4 +37,6 @@ class TicketState(TypedDict, total=False):
     office_address: str
 
     persist_id: str
+    dedup_key: str
+    duplicate_of: str
     errors: NotRequired[list[str]]
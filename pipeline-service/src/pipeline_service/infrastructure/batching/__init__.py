@@ -0,0 +1,6 @@
+"""Request batching helpers."""
+
+from pipeline_service.infrastructure.batching.bucketing import length_buckets
+from pipeline_service.infrastructure.batching.micro_batcher import MicroBatcher
+
+__all__ = ["MicroBatcher", "length_buckets"]
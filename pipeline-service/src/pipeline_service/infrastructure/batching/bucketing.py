@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+
+def length_buckets(lengths: list[int], bucket_size: int) -> list[list[int]]:
+    # Groups item indices by similar length so each bucket pads to its own max length.
+    bucket_size = max(1, bucket_size)
+    order = sorted(range(len(lengths)), key=lambda idx: lengths[idx])
+    return [order[start : start + bucket_size] for start in range(0, len(order), bucket_size)]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# Collects items submitted from many threads and runs them through one batch call.
+# A batch is dispatched once `max_batch_size` items are queued or `max_wait_ms` has
+# passed since the first item of the batch arrived, whichever comes first. With
+# `item_fn`, a failed batch is retried item by item so one bad item only fails
+# its own caller.
+class MicroBatcher(Generic[T, R]):
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[T]], list[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+        item_fn: Callable[[T], R] | None = None,
+    ) -> None:
+        self._batch_fn = batch_fn
+        self._item_fn = item_fn
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self._name = name
+        self._queue: queue.Queue[tuple[T, Future[R]]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    def submit(self, item: T) -> Future[R]:
+        future: Future[R] = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def run(self, item: T) -> R:
+        return self.submit(item).result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._loop, name=self._name, daemon=True)
+            self._worker.start()
+
+    def _collect(self) -> list[tuple[T, Future[R]]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait_s
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            pending = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+
+            try:
+                results = self._batch_fn([item for item, _ in pending])
+                if len(results) != len(pending):
+                    raise RuntimeError(
+                        f"{self._name}: batch function returned {len(results)} results for {len(pending)} items"
+                    )
+            except Exception as exc:
+                if self._item_fn is None:
+                    logger.debug("%s: batch of %s failed", self._name, len(pending), exc_info=True)
+                    for _, future in pending:
+                        future.set_exception(exc)
+                    continue
+                logger.warning(
+                    "%s: batch of %s failed, retrying items one by one", self._name, len(pending), exc_info=True
+                )
+                for item, future in pending:
+                    try:
+                        future.set_result(self._item_fn(item))
+                    except Exception as item_exc:
+                        future.set_exception(item_exc)
+                continue
+
+            for (_, future), result in zip(pending, results):
+                future.set_result(result)
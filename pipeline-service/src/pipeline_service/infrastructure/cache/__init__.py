@@ -0,0 +1,21 @@
+"""Cache stores shared by infrastructure adapters."""
+
+from pipeline_service.infrastructure.cache.inference_cache import (
+    InferenceCache,
+    get_inference_cache,
+    get_inference_cache_stats,
+)
+from pipeline_service.infrastructure.cache.memory_store import MemoryCacheStore
+from pipeline_service.infrastructure.cache.sqlite_store import SqliteCacheStore
+from pipeline_service.infrastructure.cache.store import CacheCounters, CacheStore, open_cache_store
+
+__all__ = [
+    "CacheCounters",
+    "CacheStore",
+    "InferenceCache",
+    "MemoryCacheStore",
+    "SqliteCacheStore",
+    "get_inference_cache",
+    "get_inference_cache_stats",
+    "open_cache_store",
+]
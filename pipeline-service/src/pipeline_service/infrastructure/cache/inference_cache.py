@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from pipeline_service.infrastructure.cache.memory_store import MemoryCacheStore
+from pipeline_service.infrastructure.cache.store import CacheCounters, CacheStore, open_cache_store
+from pipeline_service.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_MEMORY_ENTRIES = 512
+_REGISTRY: dict[str, "InferenceCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def normalize_inference_text(text: str) -> str:
+    # Only changes that cannot alter tokenizer output; case and inner whitespace are kept.
+    return unicodedata.normalize("NFC", text or "").strip()
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_fingerprint(files: Iterable[Path]) -> str:
+    """Content hash of the model artifacts that exist among ``files``."""
+    digest = hashlib.sha256()
+    found = False
+    for path in files:
+        if not path.is_file():
+            continue
+        stat = path.stat()
+        digest.update(path.name.encode("utf-8"))
+        digest.update(_file_digest(str(path.resolve()), stat.st_size, stat.st_mtime_ns).encode("ascii"))
+        found = True
+    if not found:
+        raise FileNotFoundError("None of the model artifact files exist")
+    return digest.hexdigest()[:16]
+
+
+class InferenceCache:
+    """Model outputs keyed by (model id + artifact hash, normalized text hash).
+
+    A new model file changes ``model_key``, so older entries are simply never read
+    again and age out through the store's size-based eviction.
+    """
+
+    def __init__(self, store: CacheStore, model_key: str) -> None:
+        self._store = store
+        self.model_key = model_key
+        self._counters = CacheCounters("hits", "misses", "writes")
+
+    def _key(self, text: str) -> str:
+        text_hash = hashlib.sha256(normalize_inference_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_key}|{text_hash}"
+
+    def get(self, text: str) -> Any | None:
+        cached = self._store.get(self._key(text))
+        self._counters.add("misses" if cached is None else "hits")
+        return copy.deepcopy(cached)
+
+    def put(self, text: str, value: Any) -> None:
+        self._store.put(self._key(text), copy.deepcopy(value))
+        self._counters.add("writes")
+
+    def resolve_many(self, texts: list[str], infer_many: Callable[[list[str]], list[Any]]) -> list[Any]:
+        """Return cached outputs for ``texts`` and run ``infer_many`` only on the misses."""
+        results: list[Any] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+        for idx, text in enumerate(texts):
+            if text in missing:
+                missing[text].append(idx)
+                continue
+            cached = self.get(text)
+            if cached is None:
+                missing[text] = [idx]
+            else:
+                results[idx] = cached
+
+        if missing:
+            pending = list(missing)
+            for text, value in zip(pending, infer_many(pending)):
+                self.put(text, value)
+                for idx in missing[text]:
+                    results[idx] = copy.deepcopy(value)
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        return {"model": self.model_key, **self._counters.snapshot()}
+
+
+@lru_cache(maxsize=1)
+def _get_shared_store() -> CacheStore:
+    settings = get_settings()
+    path = settings.inference_cache_path or os.path.join(settings.cache_dir, "inference.sqlite3")
+    # Keys carry the model key, so the spam, sentiment and type models can share
+    # one in-memory fallback as well.
+    return open_cache_store(
+        path if settings.inference_cache_enabled else None,
+        namespace="inference",
+        max_mb=settings.inference_cache_max_mb,
+        memory_entries=_MEMORY_ENTRIES * 4,
+    )
+
+
+def get_inference_cache(model_name: str, model_files: Callable[[], Iterable[Path]]) -> InferenceCache:
+    """Inference cache for one model, shared across processes when the persistent store is enabled.
+
+    ``model_files`` returns the artifacts that determine the model's outputs. Falls
+    back to a per-process in-memory cache when the store is disabled or the
+    artifacts cannot be resolved or hashed.
+    """
+    store = _get_shared_store()
+    try:
+        model_key = f"{model_name}:{model_fingerprint(model_files())}"
+    except Exception:
+        logger.warning("Cannot fingerprint %s artifacts, caching its outputs in memory only", model_name, exc_info=True)
+        model_key, store = model_name, MemoryCacheStore(max_entries=_MEMORY_ENTRIES)
+
+    cache = InferenceCache(store, model_key)
+    with _REGISTRY_LOCK:
+        _REGISTRY[model_name] = cache
+    return cache
+
+
+def get_inference_cache_stats() -> list[dict[str, Any]]:
+    with _REGISTRY_LOCK:
+        caches = list(_REGISTRY.values())
+    return [cache.stats() for cache in caches]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_EVICTION_CHECK_EVERY = 100
+
+
+class SqliteCacheStore:
+    # File-backed JSON key/value store that can be shared by several processes.
+    # Entries may expire (ttl) and the table can be capped by entry count or by
+    # total value size, evicting the least recently used entries first.
+    def __init__(
+        self,
+        path: str | Path,
+        namespace: str,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+    ) -> None:
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", namespace):
+            raise ValueError(f"Invalid cache namespace: {namespace!r}")
+        self._path = Path(path).expanduser()
+        self._table = namespace
+        self._max_entries = max(0, max_entries)
+        self._max_bytes = max(0, max_bytes)
+        self._local = threading.local()
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self._table} (
+                  key TEXT PRIMARY KEY,
+                  value TEXT NOT NULL,
+                  created_at REAL NOT NULL,
+                  expires_at REAL,
+                  accessed_at REAL NOT NULL,
+                  size_bytes INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self._table}_accessed_idx ON {self._table} (accessed_at)"
+            )
+
+    @property
+    def _tracks_access(self) -> bool:
+        return bool(self._max_entries or self._max_bytes)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            now = time.time()
+            if expires_at is not None and expires_at <= now:
+                conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                return None
+            if self._tracks_access:
+                conn.execute(f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except Exception:
+            logger.warning("Cache read failed table=%s path=%s", self._table, self._path, exc_info=True)
+            return None
+
+    def put(self, key: str, value: Any, ttl_s: float | None = None) -> None:
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+            now = time.time()
+            expires_at = now + ttl_s if ttl_s else None
+            self._connect().execute(
+                f"""
+                INSERT INTO {self._table} (key, value, created_at, expires_at, accessed_at, size_bytes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                  value = excluded.value,
+                  created_at = excluded.created_at,
+                  expires_at = excluded.expires_at,
+                  accessed_at = excluded.accessed_at,
+                  size_bytes = excluded.size_bytes
+                """,
+                (key, encoded, now, expires_at, now, len(encoded.encode("utf-8"))),
+            )
+        except Exception:
+            logger.warning("Cache write failed table=%s path=%s", self._table, self._path, exc_info=True)
+            return
+
+        # Expired rows are otherwise only dropped when their own key is read again.
+        if self._tracks_access or ttl_s:
+            with self._puts_lock:
+                self._puts += 1
+                should_evict = self._puts % _EVICTION_CHECK_EVERY == 0
+            if should_evict:
+                self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connect().execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+        except Exception:
+            logger.warning("Cache delete failed table=%s path=%s", self._table, self._path, exc_info=True)
+
+    def evict(self) -> int:
+        removed = 0
+        try:
+            conn = self._connect()
+            removed += conn.execute(
+                f"DELETE FROM {self._table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).rowcount
+            if self._max_entries:
+                removed += conn.execute(
+                    f"""
+                    DELETE FROM {self._table} WHERE key IN (
+                      SELECT key FROM {self._table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self._max_entries,),
+                ).rowcount
+            if self._max_bytes:
+                removed += conn.execute(
+                    f"""
+                    DELETE FROM {self._table} WHERE key IN (
+                      SELECT key FROM (
+                        SELECT key, SUM(size_bytes) OVER (ORDER BY accessed_at DESC, key) AS running_bytes
+                        FROM {self._table}
+                      ) WHERE running_bytes > ?
+                    )
+                    """,
+                    (self._max_bytes,),
+                ).rowcount
+        except Exception:
+            logger.warning("Cache eviction failed table=%s path=%s", self._table, self._path, exc_info=True)
+        return removed
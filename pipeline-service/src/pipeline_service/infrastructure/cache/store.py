@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Protocol
+
+from pipeline_service.infrastructure.cache.memory_store import MemoryCacheStore
+from pipeline_service.infrastructure.cache.sqlite_store import SqliteCacheStore
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStore(Protocol):
+    def get(self, key: str) -> Any | None:
+        ...
+
+    def put(self, key: str, value: Any, ttl_s: float | None = None) -> None:
+        ...
+
+
+class CacheCounters:
+    """Thread-safe hit/miss/write counters behind the caches' ``stats()``."""
+
+    def __init__(self, *names: str) -> None:
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(names, 0)
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def open_cache_store(path: str | None, namespace: str, max_mb: int = 0, memory_entries: int = 256) -> CacheStore:
+    """SQLite store at ``path`` capped at ``max_mb`` (0 = uncapped).
+
+    Without a path (cache disabled) or when the file cannot be opened, returns a
+    per-process in-memory store holding ``memory_entries`` entries.
+    """
+    if path:
+        try:
+            return SqliteCacheStore(path, namespace=namespace, max_bytes=max(0, max_mb) * 1024 * 1024)
+        except Exception:
+            logger.warning("Persistent %s cache unavailable at %s, using in-memory cache", namespace, path, exc_info=True)
+    return MemoryCacheStore(max_entries=memory_entries)
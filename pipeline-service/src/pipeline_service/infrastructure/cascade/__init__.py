@@ -0,0 +1,6 @@
+"""Tiered inference: cheap scorers in front of transformer models."""
+
+from pipeline_service.infrastructure.cascade.cascade import InferenceCascade, get_cascade_stats
+from pipeline_service.infrastructure.cascade.keyword_scorer import KeywordScorer
+
+__all__ = ["InferenceCascade", "KeywordScorer", "get_cascade_stats"]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+FastScorer = Callable[[str], tuple[str | None, float]]
+
+_REGISTRY: dict[str, "InferenceCascade"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+# Two-tier classifier: a cheap scorer answers tickets it is confident about and only
+# the rest are escalated to the model callable. A sample of fast-path answers
+# (`audit_rate`) is also sent to the model to measure how often the tiers agree.
+class InferenceCascade:
+
+    def __init__(
+        self,
+        name: str,
+        fast_scorer: FastScorer,
+        threshold: float,
+        audit_rate: float = 0.0,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self._fast_scorer = fast_scorer
+        self._threshold = threshold
+        self._audit_every = round(1 / audit_rate) if audit_rate > 0 else 0
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._total = 0
+        self._fast_hits = 0
+        self._escalated = 0
+        self._audited = 0
+        self._agreed = 0
+        with _REGISTRY_LOCK:
+            _REGISTRY[name] = self
+
+    def _fast_label(self, text: str) -> str | None:
+        if not self._enabled:
+            return None
+        try:
+            label, confidence = self._fast_scorer(text)
+        except Exception:
+            logger.debug("Fast scorer failed for cascade %s", self.name, exc_info=True)
+            return None
+        return label if label is not None and confidence >= self._threshold else None
+
+    def _should_audit(self) -> bool:
+        # Called under self._lock; deterministic 1-in-N sampling of fast-path hits.
+        return self._audit_every > 0 and self._fast_hits % self._audit_every == 0
+
+    def classify(self, text: str, model: Callable[[str], str]) -> str:
+        return self.classify_many([text], lambda texts: [model(texts[0])])[0]
+
+    def classify_many(self, texts: list[str], model_many: Callable[[list[str]], list[str]]) -> list[str]:
+        labels: list[str | None] = [self._fast_label(text) for text in texts]
+        to_model: list[int] = []
+        audits: list[int] = []
+        with self._lock:
+            self._total += len(texts)
+            for idx, label in enumerate(labels):
+                if label is None:
+                    to_model.append(idx)
+                    continue
+                self._fast_hits += 1
+                if self._should_audit():
+                    audits.append(idx)
+            self._escalated += len(to_model)
+
+        if not to_model and not audits:
+            return labels  # type: ignore[return-value]
+
+        model_positions = to_model + audits
+        model_labels = model_many([texts[idx] for idx in model_positions])
+        agreed = 0
+        for idx, model_label in zip(model_positions, model_labels):
+            if labels[idx] is None:
+                labels[idx] = model_label
+            elif labels[idx] == model_label:
+                agreed += 1
+        if audits:
+            with self._lock:
+                self._audited += len(audits)
+                self._agreed += agreed
+        return labels  # type: ignore[return-value]
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            total, fast_hits, escalated, audited, agreed = (
+                self._total,
+                self._fast_hits,
+                self._escalated,
+                self._audited,
+                self._agreed,
+            )
+        return {
+            "name": self.name,
+            "total": total,
+            "fast_hits": fast_hits,
+            "escalated": escalated,
+            "fast_hit_rate": fast_hits / total if total else 0.0,
+            "audited": audited,
+            "agreement_rate": agreed / audited if audited else None,
+        }
+
+
+def get_cascade_stats() -> list[dict[str, object]]:
+    with _REGISTRY_LOCK:
+        cascades = list(_REGISTRY.values())
+    return [cascade.stats() for cascade in cascades]
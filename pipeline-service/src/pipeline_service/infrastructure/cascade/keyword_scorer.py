@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Mapping, Sequence
+
+
+# Weighted substring rules per label. Confidence is the winning label's share of all
+# matched weight plus a prior, so a single weak hit or two competing labels stay
+# below any sensible threshold and get escalated to the model.
+class KeywordScorer:
+
+    def __init__(self, rules: Mapping[str, Sequence[tuple[str, float]]], prior: float = 1.0) -> None:
+        self._rules = {label: tuple(patterns) for label, patterns in rules.items()}
+        self._prior = max(0.0, prior)
+
+    def __call__(self, text: str) -> tuple[str | None, float]:
+        lowered = text.lower()
+        scores = {
+            label: sum(weight for pattern, weight in patterns if pattern in lowered)
+            for label, patterns in self._rules.items()
+        }
+        if not scores:
+            return None, 0.0
+        label, top = max(scores.items(), key=lambda item: item[1])
+        if top <= 0:
+            return None, 0.0
+        return label, top / (sum(scores.values()) + self._prior)
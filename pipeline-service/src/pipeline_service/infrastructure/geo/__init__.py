@@ -1,5 +1,24 @@
 """Geocoding infrastructure adapters."""
 
-from pipeline_service.infrastructure.geo.nominatim_client import NominatimClient
+from pipeline_service.infrastructure.geo.kz_gazetteer import GazetteerMatch, KzGazetteer, get_gazetteer
+from pipeline_service.infrastructure.geo.nominatim_client import (
+    AsyncNominatimClient,
+    NominatimClient,
+    get_geocoder_rate_stats,
+    host_latency_ewma_ms,
+)
+from pipeline_service.infrastructure.geo.variant_racer import RaceOutcome, arace_variants, hedge_delay_ms, race_variants
 
-__all__ = ["NominatimClient"]
+__all__ = [
+    "AsyncNominatimClient",
+    "GazetteerMatch",
+    "KzGazetteer",
+    "NominatimClient",
+    "RaceOutcome",
+    "arace_variants",
+    "get_gazetteer",
+    "get_geocoder_rate_stats",
+    "hedge_delay_ms",
+    "host_latency_ewma_ms",
+    "race_variants",
+]
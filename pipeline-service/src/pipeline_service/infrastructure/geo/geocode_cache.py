@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import copy
+import os
+from functools import lru_cache
+from typing import Any
+
+from pipeline_service.infrastructure.cache import CacheCounters, CacheStore, open_cache_store
+from pipeline_service.settings import get_settings
+
+
+def normalize_geocode_query(query: str) -> str:
+    return " ".join((query or "").split()).casefold()
+
+
+class GeocodeCache:
+    def __init__(self, store: CacheStore, ttl_s: float, negative_ttl_s: float) -> None:
+        self._store = store
+        self._ttl_s = ttl_s
+        self._negative_ttl_s = negative_ttl_s
+        self._counters = CacheCounters("hits", "negative_hits", "misses", "writes", "negative_writes")
+
+    @staticmethod
+    def _key(query: str, country_codes: str) -> str:
+        return f"{(country_codes or '').strip().lower()}|{normalize_geocode_query(query)}"
+
+    def get(self, query: str, country_codes: str) -> dict[str, Any] | None:
+        cached = self._store.get(self._key(query, country_codes))
+        if cached is None:
+            self._counters.add("misses")
+            return None
+        self._counters.add("hits" if cached.get("result") else "negative_hits")
+        return copy.deepcopy(cached)
+
+    def put(self, query: str, country_codes: str, detailed: dict[str, Any]) -> None:
+        # Transport/HTTP errors are not cached; an empty answer is cached with a shorter ttl.
+        if detailed.get("error"):
+            return
+        detailed = copy.deepcopy(detailed)
+        if detailed.get("result"):
+            self._store.put(self._key(query, country_codes), detailed, ttl_s=self._ttl_s)
+            self._counters.add("writes")
+        else:
+            self._store.put(self._key(query, country_codes), detailed, ttl_s=self._negative_ttl_s)
+            self._counters.add("negative_writes")
+
+    def stats(self) -> dict[str, int]:
+        return self._counters.snapshot()
+
+
+@lru_cache(maxsize=1)
+def get_geocode_cache() -> GeocodeCache:
+    settings = get_settings()
+    path = settings.geocode_cache_path or os.path.join(settings.cache_dir, "geocode.sqlite3")
+    store = open_cache_store(
+        path if settings.geocode_cache_enabled else None,
+        namespace="geocode",
+        max_mb=settings.geocode_cache_max_mb,
+        memory_entries=2048,
+    )
+    return GeocodeCache(
+        store,
+        ttl_s=settings.geocode_cache_ttl_seconds,
+        negative_ttl_s=settings.geocode_cache_negative_ttl_seconds,
+    )
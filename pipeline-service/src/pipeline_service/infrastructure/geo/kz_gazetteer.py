@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True, slots=True)
+class Locality:
+    name: str
+    kind: str
+    lat: float
+    lon: float
+    region: str = ""
+    aliases: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class GazetteerMatch:
+    locality: Locality
+    match: str
+    score: float
+
+
+# Region centers are the oblast administrative centers.
+_REGIONS: tuple[Locality, ...] = (
+    Locality("Абайская область", "region", 50.4111, 80.2275, aliases=("Абайская", "Абай облысы", "Abai Region")),
+    Locality("Акмолинская область", "region", 53.2833, 69.3833, aliases=("Акмолинская", "Ақмола облысы", "Akmola Region")),
+    Locality("Актюбинская область", "region", 50.2839, 57.1670, aliases=("Актюбинская", "Ақтөбе облысы", "Aktobe Region")),
+    Locality(
+        "Алматинская область",
+        "region",
+        43.8667,
+        77.0667,
+        aliases=("Алматинская", "Алматы облысы", "Almaty Region"),
+    ),
+    Locality("Атырауская область", "region", 47.1167, 51.8833, aliases=("Атырауская", "Атырау облысы", "Atyrau Region")),
+    Locality(
+        "Восточно-Казахстанская область",
+        "region",
+        49.9483,
+        82.6279,
+        aliases=("Восточно-Казахстанская", "ВКО", "Шығыс Қазақстан облысы", "East Kazakhstan Region"),
+    ),
+    Locality("Жамбылская область", "region", 42.9000, 71.3667, aliases=("Жамбылская", "Жамбыл облысы", "Jambyl Region")),
+    Locality("Жетысуская область", "region", 45.0156, 78.3739, aliases=("Жетысуская", "Жетісу облысы", "Jetisu Region")),
+    Locality(
+        "Западно-Казахстанская область",
+        "region",
+        51.2333,
+        51.3667,
+        aliases=("Западно-Казахстанская", "ЗКО", "Батыс Қазақстан облысы", "West Kazakhstan Region"),
+    ),
+    Locality(
+        "Карагандинская область",
+        "region",
+        49.8047,
+        73.1094,
+        aliases=("Карагандинская", "Қарағанды облысы", "Karaganda Region"),
+    ),
+    Locality(
+        "Костанайская область",
+        "region",
+        53.2144,
+        63.6246,
+        aliases=("Костанайская", "Қостанай облысы", "Kostanay Region"),
+    ),
+    Locality(
+        "Кызылординская область",
+        "region",
+        44.8528,
+        65.5092,
+        aliases=("Кызылординская", "Қызылорда облысы", "Kyzylorda Region"),
+    ),
+    Locality(
+        "Мангистауская область",
+        "region",
+        43.6500,
+        51.1500,
+        aliases=("Мангистауская", "Маңғыстау облысы", "Mangystau Region"),
+    ),
+    Locality(
+        "Павлодарская область",
+        "region",
+        52.2873,
+        76.9674,
+        aliases=("Павлодарская", "Павлодар облысы", "Pavlodar Region"),
+    ),
+    Locality(
+        "Северо-Казахстанская область",
+        "region",
+        54.8667,
+        69.1500,
+        aliases=("Северо-Казахстанская", "СКО", "Солтүстік Қазақстан облысы", "North Kazakhstan Region"),
+    ),
+    Locality(
+        "Туркестанская область",
+        "region",
+        43.2973,
+        68.2517,
+        aliases=("Туркестанская", "Түркістан облысы", "Turkistan Region"),
+    ),
+    Locality("Улытауская область", "region", 47.7833, 67.7000, aliases=("Улытауская", "Ұлытау облысы", "Ulytau Region")),
+)
+
+_LOCALITIES: tuple[Locality, ...] = (
+    Locality("Астана", "city", 51.1694, 71.4491, "", ("Astana", "Нур-Султан", "Nur-Sultan", "Акмола", "Целиноград")),
+    Locality("Алматы", "city", 43.238949, 76.889709, "", ("Almaty", "Алма-Ата", "Alma-Ata")),
+    Locality("Шымкент", "city", 42.3417, 69.5901, "", ("Shymkent", "Чимкент")),
+    Locality("Караганда", "city", 49.8047, 73.1094, "Карагандинская область", ("Karaganda", "Қарағанды", "Qaraghandy")),
+    Locality("Актобе", "city", 50.2839, 57.1670, "Актюбинская область", ("Aktobe", "Ақтөбе", "Актюбинск")),
+    Locality("Тараз", "city", 42.9000, 71.3667, "Жамбылская область", ("Taraz", "Джамбул", "Жамбыл")),
+    Locality("Павлодар", "city", 52.2873, 76.9674, "Павлодарская область", ("Pavlodar",)),
+    Locality(
+        "Усть-Каменогорск",
+        "city",
+        49.9483,
+        82.6279,
+        "Восточно-Казахстанская область",
+        ("Ust-Kamenogorsk", "Өскемен", "Оскемен", "Oskemen"),
+    ),
+    Locality("Семей", "city", 50.4111, 80.2275, "Абайская область", ("Semey", "Семипалатинск")),
+    Locality("Атырау", "city", 47.1167, 51.8833, "Атырауская область", ("Atyrau", "Гурьев")),
+    Locality("Костанай", "city", 53.2144, 63.6246, "Костанайская область", ("Kostanay", "Қостанай", "Кустанай")),
+    Locality("Кызылорда", "city", 44.8528, 65.5092, "Кызылординская область", ("Kyzylorda", "Қызылорда")),
+    Locality("Уральск", "city", 51.2333, 51.3667, "Западно-Казахстанская область", ("Oral", "Орал", "Uralsk")),
+    Locality(
+        "Петропавловск",
+        "city",
+        54.8667,
+        69.1500,
+        "Северо-Казахстанская область",
+        ("Petropavl", "Петропавл", "Petropavlovsk"),
+    ),
+    Locality("Актау", "city", 43.6500, 51.1500, "Мангистауская область", ("Aktau", "Ақтау", "Шевченко")),
+    Locality("Темиртау", "city", 50.0547, 72.9647, "Карагандинская область", ("Temirtau", "Теміртау")),
+    Locality("Туркестан", "city", 43.2973, 68.2517, "Туркестанская область", ("Turkistan", "Türkistan", "Түркістан")),
+    Locality("Кокшетау", "city", 53.2833, 69.3833, "Акмолинская область", ("Kokshetau", "Көкшетау", "Кокчетав")),
+    Locality("Талдыкорган", "city", 45.0156, 78.3739, "Жетысуская область", ("Taldykorgan", "Талдықорған")),
+    Locality("Экибастуз", "city", 51.7236, 75.3225, "Павлодарская область", ("Ekibastuz", "Екібастұз")),
+    Locality("Рудный", "city", 52.9667, 63.1167, "Костанайская область", ("Rudny", "Rudnyy")),
+    Locality("Жезказган", "city", 47.7833, 67.7000, "Улытауская область", ("Zhezkazgan", "Жезқазған")),
+    Locality("Балхаш", "city", 46.8481, 74.9950, "Карагандинская область", ("Balkhash", "Балқаш")),
+    Locality("Конаев", "city", 43.8667, 77.0667, "Алматинская область", ("Konaev", "Қонаев", "Капчагай", "Kapchagay")),
+    Locality("Жанаозен", "city", 43.3412, 52.8619, "Мангистауская область", ("Zhanaozen", "Жаңаөзен", "Новый Узень")),
+    Locality("Кентау", "town", 43.5167, 68.5167, "Туркестанская область", ("Kentau",)),
+    Locality("Сатпаев", "town", 47.9000, 67.5333, "Улытауская область", ("Satpayev", "Сәтбаев")),
+    Locality("Риддер", "town", 50.3444, 83.5125, "Восточно-Казахстанская область", ("Ridder", "Лениногорск")),
+    Locality("Степногорск", "town", 52.3500, 71.8833, "Акмолинская область", ("Stepnogorsk",)),
+    Locality("Щучинск", "town", 52.9333, 70.2000, "Акмолинская область", ("Shchuchinsk", "Щучье")),
+    Locality("Аксай", "town", 51.1667, 52.9833, "Западно-Казахстанская область", ("Aksay", "Ақсай")),
+    Locality("Байконур", "town", 45.6167, 63.3167, "Кызылординская область", ("Baikonur", "Байқоңыр")),
+    Locality("Аркалык", "town", 50.2486, 66.9114, "Костанайская область", ("Arkalyk", "Арқалық")),
+    Locality("Лисаковск", "town", 52.5369, 62.4936, "Костанайская область", ("Lisakovsk",)),
+    Locality("Житикара", "town", 52.1900, 61.2000, "Костанайская область", ("Zhitikara", "Жітіқара")),
+    Locality("Шахтинск", "town", 49.7100, 72.5900, "Карагандинская область", ("Shakhtinsk",)),
+    Locality("Сарань", "town", 49.7900, 72.8500, "Карагандинская область", ("Saran",)),
+    Locality("Жаркент", "town", 44.1667, 80.0000, "Жетысуская область", ("Zharkent", "Панфилов")),
+    Locality("Текели", "town", 44.8300, 78.8200, "Жетысуская область", ("Tekeli",)),
+    Locality("Тургень", "village", 43.4000, 77.5900, "Алматинская область", ("Turgen", "Түрген")),
+    Locality("Есик", "town", 43.3558, 77.4525, "Алматинская область", ("Esik", "Есік", "Иссык")),
+    Locality("Талгар", "town", 43.3033, 77.2397, "Алматинская область", ("Talgar",)),
+    Locality("Каскелен", "town", 43.2000, 76.6200, "Алматинская область", ("Kaskelen", "Қаскелең")),
+    Locality("Узынагаш", "village", 43.2200, 76.3100, "Алматинская область", ("Uzynagash", "Ұзынағаш")),
+    Locality("Шу", "town", 43.6000, 73.7600, "Жамбылская область", ("Shu", "Чу")),
+    Locality("Аральск", "town", 46.8000, 61.6667, "Кызылординская область", ("Aral", "Арал")),
+    Locality("Зайсан", "town", 47.4700, 84.8700, "Восточно-Казахстанская область", ("Zaysan",)),
+    Locality("Алтай", "town", 49.7200, 84.2700, "Восточно-Казахстанская область", ("Зыряновск", "Zyryanovsk")),
+    Locality("Курчатов", "town", 50.7500, 78.5400, "Абайская область", ("Kurchatov",)),
+    Locality("Аягоз", "town", 47.9700, 80.4400, "Абайская область", ("Ayagoz", "Аягөз")),
+    Locality("Атбасар", "town", 51.8000, 68.3333, "Акмолинская область", ("Atbasar",)),
+    Locality("Косшы", "town", 51.0300, 71.3300, "Акмолинская область", ("Kosshy", "Қосшы")),
+    Locality("Сарыагаш", "town", 41.4500, 69.1700, "Туркестанская область", ("Saryagash", "Сарыағаш")),
+    Locality("Жетысай", "town", 40.7700, 68.3300, "Туркестанская область", ("Zhetysay", "Жетісай")),
+    Locality("Кульсары", "town", 46.9500, 54.0200, "Атырауская область", ("Kulsary", "Құлсары")),
+    Locality("Хромтау", "town", 50.2500, 58.4400, "Актюбинская область", ("Khromtau",)),
+    Locality("Кандыагаш", "town", 49.4700, 57.4200, "Актюбинская область", ("Kandyagash", "Қандыағаш")),
+)
+
+_LOCALITY_PREFIXES = {
+    "г",
+    "город",
+    "гор",
+    "с",
+    "село",
+    "п",
+    "пос",
+    "поселок",
+    "пгт",
+    "аул",
+    "мкр",
+    "city",
+    "town",
+    "қ",
+    "қаласы",
+}
+_REGION_WORDS = {"область", "обл", "облысы", "oblast", "oblysy", "region"}
+# "г. Алматы" in a region field names the city, not the oblast around it.
+_CITY_WORDS = {"г", "город", "гор", "city", "қ", "қаласы"}
+_MIN_PREFIX_LENGTH = 4
+_MIN_FUZZY_SCORE = 0.5
+
+
+def normalize_place_name(value: str | None) -> str:
+    text = (value or "").casefold().replace("ё", "е")
+    text = re.sub(r"[^\w\s-]", " ", text).replace("-", " ")
+    words = [word for word in text.split() if word]
+    while len(words) > 1 and words[0] in _LOCALITY_PREFIXES:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in _LOCALITY_PREFIXES:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def _normalize_region_name(value: str | None) -> str:
+    words = [word for word in normalize_place_name(value).split() if word not in _REGION_WORDS]
+    return " ".join(words)
+
+
+def _names_city(value: str | None) -> bool:
+    text = re.sub(r"[^\w\s-]", " ", (value or "").casefold())
+    words = text.split()
+    return len(words) > 1 and (words[0] in _CITY_WORDS or words[-1] in _CITY_WORDS)
+
+
+def _trigrams(value: str) -> set[str]:
+    padded = f"  {value} "
+    return {padded[idx : idx + 3] for idx in range(len(padded) - 2)}
+
+
+class _NameIndex:
+    def __init__(self, entries: dict[str, list[Locality]]) -> None:
+        self._exact = entries
+        self._sorted_keys = sorted(entries)
+        self._trigram_keys: dict[str, set[str]] = {}
+        self._key_trigrams: dict[str, set[str]] = {}
+        for key in entries:
+            grams = _trigrams(key)
+            self._key_trigrams[key] = grams
+            for gram in grams:
+                self._trigram_keys.setdefault(gram, set()).add(key)
+
+    def exact(self, key: str) -> list[Locality]:
+        return self._exact.get(key, [])
+
+    def prefix(self, key: str) -> list[Locality]:
+        if len(key) < _MIN_PREFIX_LENGTH:
+            return []
+        start = bisect.bisect_left(self._sorted_keys, key)
+        found: list[Locality] = []
+        for candidate in self._sorted_keys[start:]:
+            if not candidate.startswith(key):
+                break
+            for locality in self._exact[candidate]:
+                if locality not in found:
+                    found.append(locality)
+        return found
+
+    def fuzzy(self, key: str) -> tuple[list[Locality], float]:
+        grams = _trigrams(key)
+        overlaps: dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_keys.get(gram, ()):
+                overlaps[candidate] = overlaps.get(candidate, 0) + 1
+
+        best_score = 0.0
+        best: list[Locality] = []
+        for candidate, overlap in overlaps.items():
+            score = overlap / len(grams | self._key_trigrams[candidate])
+            if score > best_score:
+                best_score = score
+                best = list(self._exact[candidate])
+            elif score == best_score:
+                best.extend(item for item in self._exact[candidate] if item not in best)
+        if best_score < _MIN_FUZZY_SCORE:
+            return [], best_score
+        return best, best_score
+
+
+def _build_index(localities: tuple[Locality, ...], normalizer) -> _NameIndex:
+    entries: dict[str, list[Locality]] = {}
+    for locality in localities:
+        for name in (locality.name, *locality.aliases):
+            key = normalizer(name)
+            if key and locality not in entries.setdefault(key, []):
+                entries[key].append(locality)
+    return _NameIndex(entries)
+
+
+class KzGazetteer:
+    def __init__(
+        self,
+        localities: tuple[Locality, ...] = _LOCALITIES,
+        regions: tuple[Locality, ...] = _REGIONS,
+    ) -> None:
+        self._localities = _build_index(localities, normalize_place_name)
+        self._regions = _build_index(regions, _normalize_region_name)
+
+    def lookup_region(self, name: str | None) -> GazetteerMatch | None:
+        key = _normalize_region_name(name)
+        if not key:
+            return None
+        if _names_city(name):
+            city = self._pick(self._localities.exact(normalize_place_name(name)), region_key="")
+            if city is not None:
+                return GazetteerMatch(locality=city, match="exact", score=1.0)
+        return self._match(self._regions, key, region_key="")
+
+    def lookup(self, name: str | None, region: str | None = None) -> GazetteerMatch | None:
+        key = normalize_place_name(name)
+        if not key:
+            return None
+        region_match = self.lookup_region(region) if region else None
+        region_key = ""
+        if region_match is not None:
+            found = region_match.locality
+            region_key = found.name if found.kind == "region" else found.region
+        return self._match(self._localities, key, region_key=region_key)
+
+    @staticmethod
+    def _pick(candidates: list[Locality], region_key: str) -> Locality | None:
+        if not candidates:
+            return None
+        if region_key:
+            # A place in another region is a different place, however close the name.
+            # Cities of republican significance belong to no oblast, so any region
+            # (usually the one around them) is consistent with them.
+            in_region = [item for item in candidates if item.region == region_key]
+            in_region = in_region or [item for item in candidates if not item.region]
+            return in_region[0] if in_region else None
+        return candidates[0] if len({item.name for item in candidates}) == 1 else None
+
+    def _match(self, index: _NameIndex, key: str, region_key: str) -> GazetteerMatch | None:
+        locality = self._pick(index.exact(key), region_key)
+        if locality is not None:
+            return GazetteerMatch(locality=locality, match="exact", score=1.0)
+
+        locality = self._pick(index.prefix(key), region_key)
+        if locality is not None:
+            return GazetteerMatch(locality=locality, match="prefix", score=len(key) / len(normalize_place_name(locality.name)))
+
+        candidates, score = index.fuzzy(key)
+        locality = self._pick(candidates, region_key)
+        if locality is not None:
+            return GazetteerMatch(locality=locality, match="fuzzy", score=score)
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> KzGazetteer:
+    return KzGazetteer()
@@ -1,46 +1,101 @@
 from __future__ import annotations
 
-import copy
-from functools import lru_cache
+import asyncio
+import os
+import threading
 from typing import Any
 
 import requests
 from requests.adapters import HTTPAdapter
 
+from pipeline_service.infrastructure.geo.geocode_cache import get_geocode_cache
+from pipeline_service.infrastructure.geo.rate_control import AdaptiveConcurrencyLimit, HostRateController, TokenBucket
+from pipeline_service.infrastructure.http import get_async_client
+
 _SESSION = requests.Session()
 _SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
 _SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
 
+GEOCODER_RATE_LIMIT_RPS = float(os.getenv("GEOCODER_RATE_LIMIT_RPS", "0"))
+GEOCODER_RATE_BURST = float(os.getenv("GEOCODER_RATE_BURST", "0"))
+GEOCODER_ADAPTIVE_CONCURRENCY = os.getenv("GEOCODER_ADAPTIVE_CONCURRENCY", "1").strip().lower() not in {"0", "false", "no", "off"}
+# Upper bound of the adaptive per-host limit (the fixed limit when adaptation is off).
+GEOCODER_HOST_CONCURRENCY = int(os.getenv("GEOCODER_HOST_CONCURRENCY", "8"))
+GEOCODER_MIN_CONCURRENCY = int(os.getenv("GEOCODER_MIN_CONCURRENCY", "1"))
+GEOCODER_INITIAL_CONCURRENCY = int(os.getenv("GEOCODER_INITIAL_CONCURRENCY", "4"))
+GEOCODER_LATENCY_TARGET_MS = float(os.getenv("GEOCODER_LATENCY_TARGET_MS", "800"))
+
+_CONTROLLERS: dict[str, HostRateController] = {}
+_CONTROLLERS_LOCK = threading.Lock()
+
+
+def _host_controller(base_url: str) -> HostRateController:
+    # Shared by every client instance and thread that talks to the same host.
+    with _CONTROLLERS_LOCK:
+        controller = _CONTROLLERS.get(base_url)
+        if controller is None:
+            controller = HostRateController(
+                base_url,
+                TokenBucket(GEOCODER_RATE_LIMIT_RPS, GEOCODER_RATE_BURST or GEOCODER_RATE_LIMIT_RPS),
+                AdaptiveConcurrencyLimit(
+                    initial=GEOCODER_INITIAL_CONCURRENCY,
+                    min_limit=GEOCODER_MIN_CONCURRENCY,
+                    max_limit=GEOCODER_HOST_CONCURRENCY,
+                    latency_target_s=GEOCODER_LATENCY_TARGET_MS / 1000,
+                    adaptive=GEOCODER_ADAPTIVE_CONCURRENCY,
+                ),
+            )
+            _CONTROLLERS[base_url] = controller
+        return controller
+
+
+def host_latency_ewma_ms(base_url: str) -> float | None:
+    """Smoothed latency of requests to ``base_url``; None until one has completed."""
+    with _CONTROLLERS_LOCK:
+        controller = _CONTROLLERS.get(base_url.rstrip("/"))
+    latency = controller.latency_ewma_s if controller is not None else None
+    return None if latency is None else latency * 1000
+
 
-@lru_cache(maxsize=2048)
-def _cached_geocode_detailed(
-    base_url: str,
-    user_agent: str,
-    timeout_s: float,
-    query: str,
-    country_codes: str,
-) -> dict[str, Any]:
-    headers = {
-        "User-Agent": user_agent,
-        "Accept": "*/*",
+def get_geocoder_rate_stats() -> list[dict[str, Any]]:
+    with _CONTROLLERS_LOCK:
+        controllers = list(_CONTROLLERS.values())
+    return [controller.stats() for controller in controllers]
+
+
+def _overloaded(response: Any) -> bool:
+    status_code = int(getattr(response, "status_code", 200))
+    return status_code == 429 or status_code >= 500
+
+
+def _search_params(query: str, country_codes: str) -> dict[str, Any]:
+    return {
+        "q": query,
+        "format": "jsonv2",
+        "addressdetails": 1,
+        "limit": 3,
+        "countrycodes": country_codes,
     }
+
+
+def _request_timeout(timeout_s: float) -> tuple[float, float]:
+    return (0.5, min(3.0, timeout_s))
+
+
+def _async_timeout(timeout_s: float) -> Any:
+    import httpx
+
+    connect_timeout, read_timeout = _request_timeout(timeout_s)
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def _parse_search_response(response: Any) -> dict[str, Any]:
+    # Works for both requests.Response and httpx.Response.
     out: dict[str, Any] = {
         "result": None,
         "first_candidate": None,
         "error": None,
     }
-    response = _SESSION.get(
-        f"{base_url}/search",
-        params={
-            "q": query,
-            "format": "jsonv2",
-            "addressdetails": 1,
-            "limit": 3,
-            "countrycodes": country_codes,
-        },
-        headers=headers,
-        timeout=(0.5, min(3.0, timeout_s)),
-    )
     try:
         response.raise_for_status()
         payload = response.json()
@@ -103,11 +158,65 @@ class NominatimClient:
         return result["result"]
 
     def geocode_detailed(self, query: str, country_codes: str = "kz") -> dict[str, Any]:
-        cached = _cached_geocode_detailed(
-            self._base_url,
-            self._headers["User-Agent"],
-            self._timeout_s,
-            query,
-            country_codes,
-        )
-        return copy.deepcopy(cached)
+        cache = get_geocode_cache()
+        detailed = cache.get(query, country_codes)
+        if detailed is None:
+            controller = _host_controller(self._base_url)
+            started_at = controller.acquire()
+            try:
+                response = _SESSION.get(
+                    f"{self._base_url}/search",
+                    params=_search_params(query, country_codes),
+                    headers=self._headers,
+                    timeout=_request_timeout(self._timeout_s),
+                )
+            except (requests.Timeout, requests.ConnectionError):
+                controller.release(started_at, overloaded=True)
+                raise
+            except BaseException:
+                controller.release(started_at, overloaded=False, error=True)
+                raise
+            controller.release(started_at, overloaded=_overloaded(response))
+            detailed = _parse_search_response(response)
+            cache.put(query, country_codes, detailed)
+        return detailed
+
+
+class AsyncNominatimClient(NominatimClient):
+    async def ageocode(self, query: str, country_codes: str = "kz") -> dict[str, Any] | None:
+        result = await self.ageocode_detailed(query=query, country_codes=country_codes)
+        return result["result"]
+
+    async def ageocode_detailed(self, query: str, country_codes: str = "kz") -> dict[str, Any]:
+        cache = get_geocode_cache()
+        detailed = cache.get(query, country_codes)
+        if detailed is None:
+            import httpx
+
+            controller = _host_controller(self._base_url)
+            started_at = await controller.aacquire()
+            try:
+                response = await get_async_client().get(
+                    f"{self._base_url}/search",
+                    params=_search_params(query, country_codes),
+                    headers=self._headers,
+                    timeout=_async_timeout(self._timeout_s),
+                )
+            except httpx.TransportError:
+                controller.release(started_at, overloaded=True)
+                raise
+            except asyncio.CancelledError:
+                # Cancelled by a variant race: says nothing about the geocoder's capacity.
+                controller.cancel()
+                raise
+            except BaseException:
+                controller.release(started_at, overloaded=False, error=True)
+                raise
+            controller.release(started_at, overloaded=_overloaded(response))
+            detailed = _parse_search_response(response)
+            cache.put(query, country_codes, detailed)
+        return detailed
+
+
+def geocode_cache_stats() -> dict[str, int]:
+    return get_geocode_cache().stats()
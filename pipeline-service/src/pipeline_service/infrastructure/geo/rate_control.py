@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``rate_per_s <= 0`` disables it."""
+
+    def __init__(self, rate_per_s: float, burst: float) -> None:
+        self._rate = rate_per_s
+        self._capacity = max(1.0, burst)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._rate > 0
+
+    def _reserve(self) -> float:
+        # Takes a token now, possibly going negative, and returns how long to wait for it.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def acquire(self) -> float:
+        if not self.enabled:
+            return 0.0
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self) -> float:
+        if not self.enabled:
+            return 0.0
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD concurrency limit driven by request latency and overload errors.
+
+    Each request under ``latency_target_s`` grows the limit by ``1 / limit``
+    (about +1 per window of requests); an error or a slow response multiplies it
+    by ``backoff``. Decreases happen at most once per ``latency_target_s`` so a
+    burst of timeouts from one overload episode only halves the limit once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_s: float,
+        backoff: float = 0.5,
+        adaptive: bool = True,
+    ) -> None:
+        self._min = max(1, min_limit)
+        self._max = max(self._min, max_limit)
+        self._limit = float(min(self._max, max(self._min, initial if adaptive else self._max)))
+        self._latency_target_s = latency_target_s
+        self._backoff = backoff
+        self._adaptive = adaptive
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self._counters = {"increases": 0, "decreases": 0, "waits": 0}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _try_acquire_locked(self) -> bool:
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            if not self._try_acquire_locked():
+                self._counters["waits"] += 1
+                self._cond.wait_for(self._try_acquire_locked)
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try_acquire_locked():
+                    return
+                self._counters["waits"] += 1
+                waiter: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _wake_locked(self) -> None:
+        self._cond.notify_all()
+        # Async waiters re-check the limit themselves, so waking all of them is safe.
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+    def release(self, latency_s: float | None, overloaded: bool = False) -> None:
+        """Frees a slot; ``latency_s=None`` (e.g. a cancelled request) leaves the limit as is."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if self._adaptive and latency_s is not None:
+                now = time.monotonic()
+                if overloaded or latency_s > self._latency_target_s:
+                    if now - self._last_decrease >= self._latency_target_s:
+                        self._limit = max(float(self._min), self._limit * self._backoff)
+                        self._last_decrease = now
+                        self._counters["decreases"] += 1
+                elif self._limit < self._max:
+                    self._limit = min(float(self._max), self._limit + 1 / self._limit)
+                    self._counters["increases"] += 1
+            self._wake_locked()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {"limit": int(self._limit), "in_flight": self._in_flight, **self._counters}
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+@dataclass
+class _Metrics:
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    rate_wait_s: float = 0.0
+    latency_ewma_s: float | None = None
+
+
+class HostRateController:
+    """Token bucket plus adaptive concurrency limit for one geocoder host.
+
+    ``overloaded`` marks timeouts, connection errors, HTTP 429 and 5xx; other
+    failures do not say anything about capacity and only count as errors.
+    """
+
+    def __init__(self, host: str, bucket: TokenBucket, limit: AdaptiveConcurrencyLimit) -> None:
+        self.host = host
+        self._bucket = bucket
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._metrics = _Metrics()
+
+    def _waited(self, delay: float) -> None:
+        if delay > 0:
+            with self._lock:
+                self._metrics.rate_limited += 1
+                self._metrics.rate_wait_s += delay
+
+    def acquire(self) -> float:
+        """Blocks until a request may start and returns its start time for ``release``."""
+        self._limit.acquire()
+        try:
+            self._waited(self._bucket.acquire())
+        except BaseException:
+            self._limit.release(None)
+            raise
+        return time.monotonic()
+
+    async def aacquire(self) -> float:
+        await self._limit.aacquire()
+        try:
+            self._waited(await self._bucket.aacquire())
+        except BaseException:
+            self._limit.release(None)
+            raise
+        return time.monotonic()
+
+    def release(self, started_at: float, overloaded: bool, error: bool = False) -> None:
+        latency_s = time.monotonic() - started_at
+        with self._lock:
+            self._metrics.requests += 1
+            self._metrics.errors += int(error or overloaded)
+            previous = self._metrics.latency_ewma_s
+            self._metrics.latency_ewma_s = latency_s if previous is None else 0.8 * previous + 0.2 * latency_s
+        self._limit.release(latency_s, overloaded)
+
+    def cancel(self) -> None:
+        self._limit.release(None)
+
+    @property
+    def latency_ewma_s(self) -> float | None:
+        with self._lock:
+            return self._metrics.latency_ewma_s
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            metrics = self._metrics
+            latency = metrics.latency_ewma_s
+            out: dict[str, Any] = {
+                "host": self.host,
+                "requests": metrics.requests,
+                "errors": metrics.errors,
+                "rate_limited": metrics.rate_limited,
+                "rate_wait_ms": round(metrics.rate_wait_s * 1000, 1),
+                "latency_ewma_ms": None if latency is None else round(latency * 1000, 1),
+            }
+        out.update(self._limit.stats())
+        return out
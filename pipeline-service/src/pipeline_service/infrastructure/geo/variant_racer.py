@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+GEOCODER_RACE_FANOUT = int(os.getenv("GEOCODER_RACE_FANOUT", "6"))
+# Fixed hedge delay; when unset it follows the geocoder's observed latency.
+_HEDGE_MS = os.getenv("GEOCODER_RACE_HEDGE_MS", "").strip()
+GEOCODER_RACE_HEDGE_MS: float | None = float(_HEDGE_MS) if _HEDGE_MS else None
+# Hedge delay before any request to the host has completed.
+GEOCODER_RACE_COLD_HEDGE_MS = float(os.getenv("GEOCODER_RACE_COLD_HEDGE_MS", "1000"))
+GEOCODER_RACE_WORKERS = int(os.getenv("GEOCODER_RACE_WORKERS", "32"))
+_MIN_HEDGE_MS = 50.0
+
+Detailed = dict[str, Any]
+
+
+@dataclass
+class RaceOutcome:
+    query: str | None = None
+    detailed: Detailed | None = None
+    # (query, detailed) for every variant that finished, in completion order.
+    attempts: list[tuple[str, Detailed]] = field(default_factory=list)
+
+
+def hedge_delay_ms(latency_ewma_ms: float | None) -> float:
+    """Delay before hedging with the next variant: about one typical request latency.
+
+    Hedging sooner than the host usually answers only multiplies its load, so the
+    delay tracks the latency EWMA (roughly the median) unless GEOCODER_RACE_HEDGE_MS
+    pins it.
+    """
+    if GEOCODER_RACE_HEDGE_MS is not None:
+        return GEOCODER_RACE_HEDGE_MS
+    if latency_ewma_ms is None:
+        return GEOCODER_RACE_COLD_HEDGE_MS
+    return max(_MIN_HEDGE_MS, latency_ewma_ms)
+
+
+def _error_detail(exc: BaseException) -> Detailed:
+    return {"result": None, "first_candidate": None, "error": f"{type(exc).__name__}: {exc}"}
+
+
+class _RaceState:
+    """Bookkeeping shared by the sync and async racers.
+
+    Variant ``i`` is launched ``hedge_s`` after variant ``i - 1`` or as soon as an
+    earlier variant misses, with at most ``fanout`` in flight. The winner is the
+    first variant in priority order with a result, once every variant before it
+    has missed.
+    """
+
+    def __init__(self, queries: list[str], fanout: int, hedge_s: float) -> None:
+        self.queries = queries
+        self.fanout = max(1, fanout)
+        self.hedge_s = max(0.0, hedge_s)
+        self.next_idx = 0
+        self.next_launch_at = time.monotonic()
+        self.results: dict[int, Detailed] = {}
+        self.outcome = RaceOutcome()
+
+    def launchable(self, in_flight: int) -> bool:
+        return (
+            self.next_idx < len(self.queries)
+            and in_flight < self.fanout
+            and time.monotonic() >= self.next_launch_at
+        )
+
+    def launched(self) -> int:
+        idx = self.next_idx
+        self.next_idx += 1
+        self.next_launch_at = time.monotonic() + self.hedge_s
+        return idx
+
+    def finished(self, idx: int, detailed: Detailed) -> None:
+        self.results[idx] = detailed
+        self.outcome.attempts.append((self.queries[idx], detailed))
+        if not detailed.get("result"):
+            # A miss frees its slot for the next variant right away.
+            self.next_launch_at = time.monotonic()
+
+    def winner(self) -> int | None:
+        for idx in range(len(self.queries)):
+            detailed = self.results.get(idx)
+            if detailed is None:
+                return None
+            if detailed.get("result"):
+                return idx
+        return None
+
+    def exhausted(self, in_flight: int) -> bool:
+        return self.next_idx >= len(self.queries) and in_flight == 0
+
+    def wait_timeout(self, in_flight: int) -> float | None:
+        if self.next_idx >= len(self.queries) or in_flight >= self.fanout:
+            return None
+        return max(0.0, self.next_launch_at - time.monotonic())
+
+    def finish(self) -> RaceOutcome:
+        idx = self.winner()
+        if idx is not None:
+            self.outcome.query = self.queries[idx]
+            self.outcome.detailed = self.results[idx]
+        return self.outcome
+
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max(1, GEOCODER_RACE_WORKERS),
+                    thread_name_prefix="geocode-race",
+                )
+    return _EXECUTOR
+
+
+def race_variants(
+    queries: list[str],
+    lookup: Callable[[str], Detailed],
+    fanout: int = GEOCODER_RACE_FANOUT,
+    hedge_ms: float | None = None,
+) -> RaceOutcome:
+    """Geocode ``queries`` concurrently and return the best hit by priority order.
+
+    ``hedge_ms`` defaults to ``hedge_delay_ms`` without a latency estimate.
+    Variants still queued when the winner is known are cancelled; ones already
+    sending a request finish in the background and only warm the geocode cache.
+    """
+    state = _RaceState(queries, fanout, (hedge_ms if hedge_ms is not None else hedge_delay_ms(None)) / 1000)
+    executor = _get_executor()
+    in_flight: dict[Future[Detailed], int] = {}
+    try:
+        while True:
+            # A decisive miss re-arms the launch timer, so look for the winner first.
+            if state.winner() is not None or state.exhausted(len(in_flight)):
+                return state.finish()
+            while state.launchable(len(in_flight)):
+                idx = state.launched()
+                in_flight[executor.submit(lookup, queries[idx])] = idx
+
+            done, _ = wait(set(in_flight), timeout=state.wait_timeout(len(in_flight)), return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = in_flight.pop(future)
+                try:
+                    state.finished(idx, future.result())
+                except Exception as exc:
+                    state.finished(idx, _error_detail(exc))
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+async def arace_variants(
+    queries: list[str],
+    lookup: Callable[[str], Awaitable[Detailed]],
+    fanout: int = GEOCODER_RACE_FANOUT,
+    hedge_ms: float | None = None,
+) -> RaceOutcome:
+    """Async counterpart of ``race_variants``; losing requests are cancelled."""
+    state = _RaceState(queries, fanout, (hedge_ms if hedge_ms is not None else hedge_delay_ms(None)) / 1000)
+    in_flight: dict[asyncio.Task[Detailed], int] = {}
+    try:
+        while True:
+            # A decisive miss re-arms the launch timer, so look for the winner first.
+            if state.winner() is not None or state.exhausted(len(in_flight)):
+                return state.finish()
+            while state.launchable(len(in_flight)):
+                idx = state.launched()
+                in_flight[asyncio.ensure_future(lookup(queries[idx]))] = idx
+
+            done, _ = await asyncio.wait(
+                set(in_flight),
+                timeout=state.wait_timeout(len(in_flight)),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                idx = in_flight.pop(task)
+                try:
+                    state.finished(idx, task.result())
+                except Exception as exc:
+                    state.finished(idx, _error_detail(exc))
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,5 @@
+"""Shared HTTP client helpers."""
+
+from pipeline_service.infrastructure.http.async_client import aclose_async_client, get_async_client
+
+__all__ = ["aclose_async_client", "get_async_client"]
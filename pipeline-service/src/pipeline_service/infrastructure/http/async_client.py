@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import weakref
+from typing import Any
+
+_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so keep one
+# pooled client per running loop.
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> Any:
+    try:
+        import httpx
+    except Exception as exc:
+        raise RuntimeError("httpx is not installed, cannot run async pipeline I/O") from exc
+
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _CLIENTS[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import csv
 from pathlib import Path
-from typing import Iterable
+from typing import IO, Iterable, Iterator
 
 
 def _normalize_header(header: str) -> str:
@@ -10,31 +10,48 @@ def _normalize_header(header: str) -> str:
     return header.lstrip("\ufeff").strip()
 
 
-def read_csv_rows(path: str, required_headers: Iterable[str] | None = None) -> list[dict[str, str]]:
-    csv_path = Path(path)
+def _iter_reader_rows(file: IO[str], required_headers: Iterable[str] | None) -> Iterator[dict[str, str]]:
+    reader = csv.DictReader(file)
+    raw_fieldnames = reader.fieldnames or []
+    normalized_fieldnames = [_normalize_header(field) for field in raw_fieldnames]
+    reader.fieldnames = normalized_fieldnames
+
+    if required_headers:
+        normalized_required = [_normalize_header(header) for header in required_headers]
+        missing = [header for header in normalized_required if header not in normalized_fieldnames]
+        if missing:
+            raise ValueError(f"CSV missing required columns: {', '.join(missing)}")
+
+    for row in reader:
+        normalized_row: dict[str, str] = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            normalized_key = _normalize_header(key)
+            normalized_row[normalized_key] = (value or "")
+        yield normalized_row
+
+
+def iter_csv_rows(
+    source: str | Path | IO[str],
+    required_headers: Iterable[str] | None = None,
+) -> Iterator[dict[str, str]]:
+    """Yield normalized rows one at a time from a CSV path or an open text stream.
+
+    Only the current row is held in memory, so multi-gigabyte exports can be
+    consumed with flat memory. A stream is read as-is and left open for the caller.
+    """
+    if not isinstance(source, (str, Path)):
+        yield from _iter_reader_rows(source, required_headers)
+        return
+
+    csv_path = Path(source)
     if not csv_path.exists():
-        raise ValueError(f"CSV file not found: {path}")
+        raise ValueError(f"CSV file not found: {source}")
 
     with csv_path.open("r", encoding="utf-8", newline="") as file:
-        reader = csv.DictReader(file)
-        raw_fieldnames = reader.fieldnames or []
-        normalized_fieldnames = [_normalize_header(field) for field in raw_fieldnames]
-        reader.fieldnames = normalized_fieldnames
-
-        if required_headers:
-            normalized_required = [_normalize_header(header) for header in required_headers]
-            missing = [header for header in normalized_required if header not in normalized_fieldnames]
-            if missing:
-                raise ValueError(f"CSV missing required columns: {', '.join(missing)}")
-
-        rows: list[dict[str, str]] = []
-        for row in reader:
-            normalized_row: dict[str, str] = {}
-            for key, value in row.items():
-                if key is None:
-                    continue
-                normalized_key = _normalize_header(key)
-                normalized_row[normalized_key] = (value or "")
-            rows.append(normalized_row)
-
-    return rows
+        yield from _iter_reader_rows(file, required_headers)
+
+
+def read_csv_rows(path: str, required_headers: Iterable[str] | None = None) -> list[dict[str, str]]:
+    return list(iter_csv_rows(path, required_headers))
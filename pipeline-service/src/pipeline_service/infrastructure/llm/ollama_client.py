@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
 import logging
+from typing import Callable
 
 import requests
 from requests.adapters import HTTPAdapter
 
+from pipeline_service.infrastructure.http import get_async_client
+from pipeline_service.infrastructure.llm.prompt_cache import SingleFlight, get_prompt_cache, prompt_key
 from pipeline_service.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -12,25 +16,42 @@ logger = logging.getLogger(__name__)
 _SESSION = requests.Session()
 _SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
 _SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+# Identical prompts in flight at the same time share one Ollama request.
+_SINGLE_FLIGHT = SingleFlight()
+
+StopPredicate = Callable[[str], bool]
+
+
+def has_complete_line(text: str) -> bool:
+    """True once ``text`` holds a non-empty line followed by a newline."""
+    stripped = text.lstrip()
+    return "\n" in stripped
+
+
+def first_line(text: str) -> str:
+    lines = text.strip().splitlines()
+    return lines[0].strip() if lines else ""
 
 
 class OllamaClient:
     def __init__(self) -> None:
         self._settings = get_settings()
 
-    def generate(self, prompt: str, model: str | None = None) -> str:
-        if self._settings.mock_llm:
-            logger.info("MOCK_LLM=1, returning stub LLM output")
-            return "stub-llm-response"
-
+    def _build_payload(
+        self,
+        prompt: str,
+        model: str | None,
+        stream: bool = False,
+        stop: list[str] | None = None,
+    ) -> dict[str, object]:
         selected_model = model or self._settings.ollama_model
-        payload = {
+        payload: dict[str, object] = {
             "model": selected_model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "keep_alive": self._settings.ollama_keep_alive,
         }
-        options: dict[str, int] = {}
+        options: dict[str, object] = {}
         if self._settings.ollama_num_predict > 0:
             options["num_predict"] = self._settings.ollama_num_predict
         elif self._settings.perf_mode:
@@ -39,14 +60,162 @@ class OllamaClient:
             options["num_ctx"] = self._settings.ollama_num_ctx
         elif self._settings.perf_mode:
             options["num_ctx"] = 1024
+        if stop:
+            options["stop"] = list(stop)
         if options:
             payload["options"] = options
+        return payload
 
+    @staticmethod
+    def _cache_key(payload: dict[str, object], tag: str = "") -> str:
+        options = dict(payload.get("options") or {})  # type: ignore[call-overload]
+        if tag:
+            # Streamed calls that stop early return a different text than a full generation.
+            options["_until"] = tag
+        return prompt_key(str(payload["model"]), options, str(payload["prompt"]))
+
+    def _post(self, payload: dict[str, object], key: str) -> str:
         response = _SESSION.post(
             f"{self._settings.ollama_base_url}/api/generate",
             json=payload,
             timeout=self._settings.request_timeout_seconds,
         )
         response.raise_for_status()
-        payload = response.json()
-        return str(payload.get("response", ""))
+        text = str(response.json().get("response", ""))
+        get_prompt_cache().put(key, text)
+        return text
+
+    async def _apost(self, payload: dict[str, object], key: str) -> str:
+        response = await get_async_client().post(
+            f"{self._settings.ollama_base_url}/api/generate",
+            json=payload,
+            timeout=self._settings.request_timeout_seconds,
+        )
+        response.raise_for_status()
+        text = str(response.json().get("response", ""))
+        get_prompt_cache().put(key, text)
+        return text
+
+    def _post_stream(self, payload: dict[str, object], until: StopPredicate, key: str | None) -> str:
+        parts: list[str] = []
+        # Leaving the block closes the connection, which makes Ollama cancel the generation.
+        with _SESSION.post(
+            f"{self._settings.ollama_base_url}/api/generate",
+            json=payload,
+            timeout=self._settings.request_timeout_seconds,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(str(chunk.get("response", "")))
+                if chunk.get("done") or until("".join(parts)):
+                    break
+        text = "".join(parts)
+        if key is not None:
+            get_prompt_cache().put(key, text)
+        return text
+
+    async def _apost_stream(self, payload: dict[str, object], until: StopPredicate, key: str | None) -> str:
+        parts: list[str] = []
+        async with get_async_client().stream(
+            "POST",
+            f"{self._settings.ollama_base_url}/api/generate",
+            json=payload,
+            timeout=self._settings.request_timeout_seconds,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(str(chunk.get("response", "")))
+                if chunk.get("done") or until("".join(parts)):
+                    break
+        text = "".join(parts)
+        if key is not None:
+            get_prompt_cache().put(key, text)
+        return text
+
+    def generate(self, prompt: str, model: str | None = None) -> str:
+        if self._settings.mock_llm:
+            logger.info("MOCK_LLM=1, returning stub LLM output")
+            return "stub-llm-response"
+
+        payload = self._build_payload(prompt, model)
+        key = self._cache_key(payload)
+        cached = get_prompt_cache().get(key)
+        if cached is not None:
+            return cached
+        return _SINGLE_FLIGHT.run(key, lambda: self._post(payload, key))
+
+    async def agenerate(self, prompt: str, model: str | None = None) -> str:
+        if self._settings.mock_llm:
+            logger.info("MOCK_LLM=1, returning stub LLM output")
+            return "stub-llm-response"
+
+        payload = self._build_payload(prompt, model)
+        key = self._cache_key(payload)
+        cached = get_prompt_cache().get(key)
+        if cached is not None:
+            return cached
+        return await _SINGLE_FLIGHT.arun(key, lambda: self._apost(payload, key))
+
+    def generate_until(
+        self,
+        prompt: str,
+        until: StopPredicate,
+        model: str | None = None,
+        stop: list[str] | None = None,
+        cache_tag: str | None = None,
+    ) -> str:
+        """Stream a generation and stop reading once ``until(text_so_far)`` is true.
+
+        ``stop`` is forwarded to Ollama as stop sequences. Results are cached and
+        coalesced only when ``cache_tag`` names the predicate, since different
+        predicates yield different texts for the same prompt.
+        """
+        if self._settings.mock_llm:
+            logger.info("MOCK_LLM=1, returning stub LLM output")
+            return "stub-llm-response"
+
+        payload = self._build_payload(prompt, model, stream=True, stop=stop)
+        if cache_tag is None:
+            return self._post_stream(payload, until, None)
+        key = self._cache_key(payload, cache_tag)
+        cached = get_prompt_cache().get(key)
+        if cached is not None:
+            return cached
+        return _SINGLE_FLIGHT.run(key, lambda: self._post_stream(payload, until, key))
+
+    async def agenerate_until(
+        self,
+        prompt: str,
+        until: StopPredicate,
+        model: str | None = None,
+        stop: list[str] | None = None,
+        cache_tag: str | None = None,
+    ) -> str:
+        if self._settings.mock_llm:
+            logger.info("MOCK_LLM=1, returning stub LLM output")
+            return "stub-llm-response"
+
+        payload = self._build_payload(prompt, model, stream=True, stop=stop)
+        if cache_tag is None:
+            return await self._apost_stream(payload, until, None)
+        key = self._cache_key(payload, cache_tag)
+        cached = get_prompt_cache().get(key)
+        if cached is not None:
+            return cached
+        return await _SINGLE_FLIGHT.arun(key, lambda: self._apost_stream(payload, until, key))
+
+    # No "\n" stop sequence here: small models often open with a blank line, and
+    # Ollama would then stop with an empty response. Closing the stream after the
+    # first complete line ends the generation just as early.
+    def generate_first_line(self, prompt: str, model: str | None = None) -> str:
+        return first_line(self.generate_until(prompt, has_complete_line, model=model, cache_tag="first_line"))
+
+    async def agenerate_first_line(self, prompt: str, model: str | None = None) -> str:
+        return first_line(await self.agenerate_until(prompt, has_complete_line, model=model, cache_tag="first_line"))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, TypeVar
+
+from pipeline_service.infrastructure.cache import CacheCounters, CacheStore, open_cache_store
+from pipeline_service.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def prompt_key(model: str, options: dict[str, Any] | None, prompt: str) -> str:
+    """Stable key for a generation request; transport fields such as keep_alive are excluded."""
+    material = json.dumps({"model": model, "options": options or {}, "prompt": prompt}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    Sync callers share a ``concurrent.futures.Future``; async callers share a task
+    on their event loop. Results are not retained once the call finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future[Any]] = {}
+        self._async_calls: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task[Any]]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def run(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def arun(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            task = calls.get(key)
+            if task is None:
+                task = loop.create_task(fn())
+                calls[key] = task
+                task.add_done_callback(lambda _: calls.pop(key, None))
+        # Shielded so one cancelled waiter does not cancel the call for the others.
+        return await asyncio.shield(task)
+
+
+class PromptCache:
+    def __init__(self, store: CacheStore, ttl_s: float | None) -> None:
+        self._store = store
+        self._ttl_s = ttl_s
+        self._counters = CacheCounters("hits", "misses", "writes")
+
+    def get(self, key: str) -> str | None:
+        cached = self._store.get(key)
+        self._counters.add("misses" if cached is None else "hits")
+        return None if cached is None else str(cached)
+
+    def put(self, key: str, response: str) -> None:
+        self._store.put(key, response, ttl_s=self._ttl_s)
+        self._counters.add("writes")
+
+    def stats(self) -> dict[str, int]:
+        return self._counters.snapshot()
+
+
+@lru_cache(maxsize=1)
+def get_prompt_cache() -> PromptCache:
+    settings = get_settings()
+    path = settings.llm_cache_path or os.path.join(settings.cache_dir, "llm.sqlite3")
+    store = open_cache_store(
+        path if settings.llm_cache_enabled else None,
+        namespace="llm_prompts",
+        max_mb=settings.llm_cache_max_mb,
+        memory_entries=1024,
+    )
+    return PromptCache(store, ttl_s=settings.llm_cache_ttl_seconds or None)
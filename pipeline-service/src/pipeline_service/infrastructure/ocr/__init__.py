@@ -1,5 +1,21 @@
 """OCR infrastructure adapters."""
 
-from pipeline_service.infrastructure.ocr.paddleocr_client import PaddleOcrClient
+from pipeline_service.infrastructure.ocr.ocr_cache import OcrCache, attachment_digest, get_ocr_cache
+from pipeline_service.infrastructure.ocr.paddleocr_client import (
+    PaddleOcrClient,
+    enabled_variants,
+    get_ocr_variant_stats,
+)
+from pipeline_service.infrastructure.ocr.process_pool import OcrProcessPool, PooledOcrClient, get_ocr_process_pool
 
-__all__ = ["PaddleOcrClient"]
+__all__ = [
+    "OcrCache",
+    "OcrProcessPool",
+    "PaddleOcrClient",
+    "PooledOcrClient",
+    "attachment_digest",
+    "enabled_variants",
+    "get_ocr_cache",
+    "get_ocr_process_pool",
+    "get_ocr_variant_stats",
+]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+from functools import lru_cache
+from importlib import metadata
+from typing import Any
+
+from pipeline_service.infrastructure.cache import CacheCounters, CacheStore, open_cache_store
+from pipeline_service.settings import get_settings
+
+
+@lru_cache(maxsize=1)
+def ocr_engine_version() -> str:
+    try:
+        return f"paddleocr-{metadata.version('paddleocr')}"
+    except metadata.PackageNotFoundError:
+        return "paddleocr-unknown"
+
+
+def attachment_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class OcrCache:
+    """OCR output per attachment, keyed by content hash, OCR language and engine version.
+
+    Entries hold the raw OCR text and the cleaned text per cleanup mode, so a hit
+    never needs the OCR engine and only a new cleanup mode re-runs ``clean_ocr_text``.
+    """
+
+    def __init__(self, store: CacheStore, engine_version: str) -> None:
+        self._store = store
+        self._engine_version = engine_version
+        self._counters = CacheCounters("hits", "misses", "writes")
+
+    def _key(self, digest: str, lang: str, variants: str) -> str:
+        return f"{self._engine_version}|{lang}|{variants}|{digest}"
+
+    def get(self, digest: str, lang: str, variants: str) -> dict[str, Any] | None:
+        cached = self._store.get(self._key(digest, lang, variants))
+        self._counters.add("misses" if cached is None else "hits")
+        return copy.deepcopy(cached)
+
+    def put(self, digest: str, lang: str, variants: str, raw_text: str, cleaned: dict[str, str]) -> None:
+        self._store.put(self._key(digest, lang, variants), {"raw_text": raw_text, "cleaned": dict(cleaned)})
+        self._counters.add("writes")
+
+    def stats(self) -> dict[str, int]:
+        return self._counters.snapshot()
+
+
+@lru_cache(maxsize=1)
+def get_ocr_cache() -> OcrCache:
+    settings = get_settings()
+    path = settings.ocr_cache_path or os.path.join(settings.cache_dir, "ocr.sqlite3")
+    store = open_cache_store(
+        path if settings.ocr_cache_enabled else None,
+        namespace="ocr",
+        max_mb=settings.ocr_cache_max_mb,
+        memory_entries=256,
+    )
+    return OcrCache(store, ocr_engine_version())
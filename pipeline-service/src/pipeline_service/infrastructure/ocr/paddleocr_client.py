@@ -1,35 +1,123 @@
 from __future__ import annotations
 
+import importlib.util
+import io
+import logging
 import os
-import tempfile
-from typing import Any
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_VARIANT = "original"
+PREPROCESS_VARIANTS = ("upscaled", "otsu", "adaptive", "inverted", "rotated")
+OCR_VARIANT_WORKERS = int(os.getenv("OCR_VARIANT_WORKERS", "2"))
+OCR_EARLY_EXIT_CONFIDENCE = float(os.getenv("OCR_EARLY_EXIT_CONFIDENCE", "0.9"))
+OCR_EARLY_EXIT_CHARS = int(os.getenv("OCR_EARLY_EXIT_CHARS", "200"))
+_MIN_CONFIDENT_CHARS = 8
+
+
+def enabled_variants() -> tuple[str, ...]:
+    configured = os.getenv("OCR_VARIANTS", "").strip()
+    if not configured:
+        return PREPROCESS_VARIANTS
+    requested = {item.strip().lower() for item in configured.split(",") if item.strip()}
+    return tuple(name for name in PREPROCESS_VARIANTS if name in requested)
+
+
+_VARIANT_STATS: dict[str, Counter[str]] = {"runs": Counter(), "wins": Counter(), "skipped": Counter()}
+_VARIANT_STATS_LOCK = threading.Lock()
+
+
+def _record_variants(ran: list[str], skipped: list[str], winner: str | None) -> None:
+    with _VARIANT_STATS_LOCK:
+        _VARIANT_STATS["runs"].update(ran)
+        _VARIANT_STATS["skipped"].update(skipped)
+        if winner:
+            _VARIANT_STATS["wins"][winner] += 1
+
+
+def get_ocr_variant_stats() -> dict[str, dict[str, int]]:
+    """Per-variant OCR runs, wins and early-exit skips since process start."""
+    with _VARIANT_STATS_LOCK:
+        names = [ORIGINAL_VARIANT, *PREPROCESS_VARIANTS]
+        return {
+            name: {
+                "runs": _VARIANT_STATS["runs"][name],
+                "wins": _VARIANT_STATS["wins"][name],
+                "skipped": _VARIANT_STATS["skipped"][name],
+            }
+            for name in names
+        }
+
+
+def _once(build: Callable[[], Any]) -> Callable[[], Any]:
+    # Memoizes a preprocessing step shared by several variants built on different threads.
+    lock = threading.Lock()
+    value: list[Any] = []
+
+    def get() -> Any:
+        with lock:
+            if not value:
+                value.append(build())
+            return value[0]
+
+    return get
+
+
+_VARIANT_EXECUTOR: ThreadPoolExecutor | None = None
+_VARIANT_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_variant_executor() -> ThreadPoolExecutor:
+    global _VARIANT_EXECUTOR
+    if _VARIANT_EXECUTOR is None:
+        with _VARIANT_EXECUTOR_LOCK:
+            if _VARIANT_EXECUTOR is None:
+                _VARIANT_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max(1, OCR_VARIANT_WORKERS),
+                    thread_name_prefix="ocr-variant",
+                )
+    return _VARIANT_EXECUTOR
 
 
 class PaddleOcrClient:
-    def __init__(self, lang: str = "ru") -> None:
+    def __init__(self, lang: str = "ru", inline_variants: bool = False) -> None:
         self._lang = lang
-        self._engine: Any | None = None
+        # PaddleOCR predictors are not safe to share between threads, so every
+        # variant worker thread gets its own engine.
+        self._local = threading.local()
         self._init_error = False
+        # Inline clients OCR variants one after another on the calling thread and
+        # so only ever need that thread's engine (e.g. in OCR worker processes).
+        self._inline_variants = inline_variants
 
     def _get_engine(self) -> Any | None:
-        if self._engine is not None:
-            return self._engine
+        engine = getattr(self._local, "engine", None)
+        if engine is not None:
+            return engine
         if self._init_error:
             return None
 
         try:
             from paddleocr import PaddleOCR
 
-            self._engine = PaddleOCR(use_angle_cls=True, lang=self._lang)
-            return self._engine
+            self._local.engine = PaddleOCR(use_angle_cls=True, lang=self._lang)
+            return self._local.engine
         except Exception:
             self._init_error = True
             return None
 
-    def _parse_result(self, result: Any) -> str:
-        lines: list[str] = []
+    def _engine_available(self) -> bool:
+        # Engines are created lazily on the worker threads; only check that one can be.
+        return not self._init_error and importlib.util.find_spec("paddleocr") is not None
+
+    def _parse_lines(self, result: Any) -> list[tuple[str, float]]:
+        lines: list[tuple[str, float]] = []
         if not result:
-            return ""
+            return lines
 
         pages = result if isinstance(result, list) else [result]
         for page in pages:
@@ -42,83 +130,157 @@ class PaddleOcrClient:
                 if not isinstance(text_block, (list, tuple)) or not text_block:
                     continue
                 text = str(text_block[0]).strip()
-                if text:
-                    lines.append(text)
-        return "\n".join(lines).strip()
+                if not text:
+                    continue
+                try:
+                    confidence = float(text_block[1]) if len(text_block) > 1 else 0.0
+                except (TypeError, ValueError):
+                    confidence = 0.0
+                lines.append((text, confidence))
+        return lines
+
+    def _parse_result(self, result: Any) -> str:
+        return "\n".join(text for text, _ in self._parse_lines(result)).strip()
+
+    @staticmethod
+    def _decode(data: bytes) -> Any | None:
+        """Verify ``data`` with PIL and decode it once into a BGR array for OpenCV and PaddleOCR."""
+        try:
+            from PIL import Image
+
+            with Image.open(io.BytesIO(data)) as img:
+                img.verify()
+        except Exception:
+            return None
 
-    def _preprocess_variants(self, image_path: str) -> list[str]:
-        paths: list[str] = []
         try:
             import cv2
+            import numpy as np
 
-            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
             if image is None:
-                return paths
+                # Formats OpenCV cannot decode (e.g. GIF) go through PIL instead.
+                with Image.open(io.BytesIO(data)) as img:
+                    image = cv2.cvtColor(np.asarray(img.convert("RGB")), cv2.COLOR_RGB2BGR)
+            return image
+        except Exception:
+            return None
+
+    def _preprocess_variants(
+        self, image: Any, names: tuple[str, ...] = PREPROCESS_VARIANTS
+    ) -> list[tuple[str, Callable[[], Any]]]:
+        """Builders for the requested variants; nothing is computed until a builder is called.
+
+        Variants skipped by an early exit are never built, and the shared steps
+        (grayscale, upscale, Otsu) are computed once on first use.
+        """
+        if not names:
+            return []
+        try:
+            import cv2
+        except Exception:
+            return []
 
-            upscaled = cv2.resize(image, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-            otsu = cv2.threshold(upscaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-            adaptive = cv2.adaptiveThreshold(
-                upscaled,
+        gray = _once(lambda: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        upscaled = _once(lambda: cv2.resize(gray(), None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC))
+        otsu = _once(lambda: cv2.threshold(upscaled(), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1])
+        builders: dict[str, Callable[[], Any]] = {
+            "upscaled": upscaled,
+            "otsu": otsu,
+            "adaptive": lambda: cv2.adaptiveThreshold(
+                upscaled(),
                 255,
                 cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                 cv2.THRESH_BINARY,
                 31,
                 11,
-            )
-            inverted = cv2.bitwise_not(otsu)
-
-            variants = [upscaled, otsu, adaptive, inverted]
-            for variant in variants:
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                    tmp_path = tmp.name
-                if cv2.imwrite(tmp_path, variant):
-                    paths.append(tmp_path)
-                elif os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-
-            rotated = cv2.rotate(upscaled, cv2.ROTATE_90_CLOCKWISE)
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                rotated_path = tmp.name
-            if cv2.imwrite(rotated_path, rotated):
-                paths.append(rotated_path)
-            elif os.path.exists(rotated_path):
-                os.remove(rotated_path)
-
-            return paths
-        except Exception:
-            return paths
+            ),
+            "inverted": lambda: cv2.bitwise_not(otsu()),
+            "rotated": lambda: cv2.rotate(upscaled(), cv2.ROTATE_90_CLOCKWISE),
+        }
+        # PaddleOCR accepts single-channel arrays and converts them to BGR itself.
+        return [(name, builders[name]) for name in names]
 
-    def _ocr_text(self, engine: Any, image_path: str) -> str:
+    def _ocr_candidate(self, build: Callable[[], Any]) -> tuple[str, float]:
+        engine = self._get_engine()
+        if engine is None:
+            return "", 0.0
         try:
-            raw_result = engine.ocr(image_path, cls=True)
-            return self._parse_result(raw_result)
+            lines = self._parse_lines(engine.ocr(build(), cls=True))
         except Exception:
-            return ""
+            return "", 0.0
+        text = "\n".join(text for text, _ in lines).strip()
+        confidence = sum(conf for _, conf in lines) / len(lines) if lines else 0.0
+        return text, confidence
 
-    def extract_text(self, image_path: str) -> str:
-        try:
-            from PIL import Image
+    @staticmethod
+    def _good_enough(text: str, confidence: float) -> bool:
+        if len(text) >= OCR_EARLY_EXIT_CHARS:
+            return True
+        return len(text) >= _MIN_CONFIDENT_CHARS and confidence >= OCR_EARLY_EXIT_CONFIDENCE
 
-            with Image.open(image_path) as img:
-                img.verify()
-        except Exception:
-            return ""
-
-        engine = self._get_engine()
-        if engine is None:
-            return ""
+    def _run_variants(self, variants: list[tuple[str, Callable[[], Any]]]) -> tuple[str, str | None, list[str]]:
+        """OCR ``variants`` (name, image builder) on the worker pool, stopping once a candidate is good enough.
 
-        best_text = self._ocr_text(engine, image_path)
+        Variants are submitted in priority order and each image is built on the
+        worker that OCRs it; after an early exit queued ones are cancelled before
+        they are built. Returns (best text, winning variant, variants that ran).
+        """
+        if self._inline_variants:
+            return self._run_variants_inline(variants)
+        executor = _get_variant_executor()
+        futures: dict[Future[tuple[str, float]], str] = {}
+        for name, build in variants:
+            futures[executor.submit(self._ocr_candidate, build)] = name
 
-        variant_paths = self._preprocess_variants(image_path)
+        best_text, winner, ran = "", None, []
+        pending = set(futures)
         try:
-            for path in variant_paths:
-                candidate = self._ocr_text(engine, path)
-                if len(candidate) > len(best_text):
-                    best_text = candidate
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                early_exit = False
+                for future in done:
+                    name = futures[future]
+                    ran.append(name)
+                    text, confidence = future.result()
+                    if len(text) > len(best_text):
+                        best_text, winner = text, name
+                    early_exit = early_exit or self._good_enough(text, confidence)
+                if early_exit:
+                    break
         finally:
-            for path in variant_paths:
-                if os.path.exists(path):
-                    os.remove(path)
+            for future in pending:
+                future.cancel()
+        return best_text, winner, ran
+
+    def _run_variants_inline(
+        self, variants: list[tuple[str, Callable[[], Any]]]
+    ) -> tuple[str, str | None, list[str]]:
+        best_text, winner, ran = "", None, []
+        for name, build in variants:
+            ran.append(name)
+            text, confidence = self._ocr_candidate(build)
+            if len(text) > len(best_text):
+                best_text, winner = text, name
+            if self._good_enough(text, confidence):
+                break
+        return best_text, winner, ran
+
+    def extract_text(self, image_path: str) -> str:
+        try:
+            with open(image_path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return ""
+        return self.extract_text_from_bytes(data, source=image_path)
+
+    def extract_text_from_bytes(self, data: bytes, source: str = "<bytes>") -> str:
+        image = self._decode(data)
+        if image is None or not self._engine_available():
+            return ""
 
+        variants = [(ORIGINAL_VARIANT, lambda: image), *self._preprocess_variants(image, enabled_variants())]
+        best_text, winner, ran = self._run_variants(variants)
+        _record_variants(ran, [name for name, _ in variants if name not in ran], winner)
+        logger.debug("OCR variants ran=%s winner=%s source=%s", ran, winner, source)
         return best_text
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from pipeline_service.infrastructure.ocr.paddleocr_client import PaddleOcrClient
+
+logger = logging.getLogger(__name__)
+
+# Per worker process: one preloaded client (and engine) per OCR language. Jobs
+# run on the worker's main thread, so variants are OCRed inline on that thread
+# and reuse the engine built by ``_init_worker`` instead of one per variant thread.
+_WORKER_CLIENTS: dict[str, PaddleOcrClient] = {}
+
+
+def _worker_client(lang: str) -> PaddleOcrClient:
+    client = _WORKER_CLIENTS.get(lang)
+    if client is None:
+        client = PaddleOcrClient(lang=lang, inline_variants=True)
+        _WORKER_CLIENTS[lang] = client
+    return client
+
+
+def _init_worker(langs: tuple[str, ...]) -> None:
+    for lang in langs:
+        # Build the engine up front so the first job does not pay the model load.
+        _worker_client(lang)._get_engine()
+
+
+def _extract_in_worker(lang: str, image_path: str | None, data: bytes | None) -> str:
+    client = _worker_client(lang)
+    if data is not None:
+        return client.extract_text_from_bytes(data, source=image_path or "<bytes>")
+    return client.extract_text(image_path or "")
+
+
+class OcrProcessPool:
+    """PaddleOCR in dedicated worker processes with engines preloaded per language.
+
+    OCR then runs on other cores instead of competing for the GIL with the rest of
+    the batch. Jobs are attachment paths or bytes. A job that exceeds ``timeout_s``
+    is cancelled if it has not started and reported as no text.
+    """
+
+    def __init__(self, workers: int, langs: tuple[str, ...], timeout_s: float) -> None:
+        self._workers = max(1, workers)
+        self._langs = langs
+        self._timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Paddle is not fork-safe, so workers are spawned fresh.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._langs,),
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, lang: str, image_path: str | None = None, data: bytes | None = None) -> Future[str]:
+        return self._get_executor().submit(_extract_in_worker, lang, image_path, data)
+
+    def extract_text(self, lang: str, image_path: str | None = None, data: bytes | None = None) -> str:
+        executor = self._get_executor()
+        future: Future[str] | None = None
+        try:
+            future = executor.submit(_extract_in_worker, lang, image_path, data)
+            return future.result(timeout=self._timeout_s)
+        except FutureTimeoutError:
+            if future is not None:
+                future.cancel()
+            logger.warning("OCR timed out after %.1fs path=%s lang=%s", self._timeout_s, image_path, lang)
+            return ""
+        except BrokenProcessPool:
+            logger.exception("OCR worker process died, restarting pool")
+            self._reset(executor)
+            return ""
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PooledOcrClient:
+    """``PaddleOcrClient``-compatible facade that runs jobs on an ``OcrProcessPool``."""
+
+    def __init__(self, pool: OcrProcessPool, lang: str) -> None:
+        self._pool = pool
+        self._lang = lang
+
+    def extract_text(self, image_path: str) -> str:
+        return self._pool.extract_text(self._lang, image_path=image_path)
+
+    def extract_text_from_bytes(self, data: bytes, source: str = "<bytes>") -> str:
+        return self._pool.extract_text(self._lang, image_path=source, data=data)
+
+
+_POOL: OcrProcessPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_ocr_process_pool(workers: int, langs: tuple[str, ...], timeout_s: float) -> OcrProcessPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = OcrProcessPool(workers, langs, timeout_s)
+            atexit.register(_POOL.shutdown)
+        return _POOL
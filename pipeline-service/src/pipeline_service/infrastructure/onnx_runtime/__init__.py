@@ -0,0 +1,10 @@
+"""ONNX Runtime execution backend for the local classifiers."""
+
+from pipeline_service.infrastructure.onnx_runtime.session import (
+    OnnxClassifier,
+    load_onnx_classifier,
+    onnx_runtime_enabled,
+    softmax,
+)
+
+__all__ = ["OnnxClassifier", "load_onnx_classifier", "onnx_runtime_enabled", "softmax"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from pipeline_service.infrastructure.onnx_runtime.session import ONNX_FP32_FILE, ONNX_INT8_FILE, ONNX_SUBDIR
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_TEXT = "Здравствуйте, приложение не открывается после обновления."
+
+
+def _logits_only(model, input_names: list[str]):
+    import torch
+
+    # HF models return ModelOutput objects; export a plain logits tensor with
+    # positional inputs in a fixed order instead.
+    class _LogitsOnly(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).logits
+
+    return _LogitsOnly().eval()
+
+
+def export_sequence_classifier(model, tokenizer, model_dir: Path, quantize: bool = False, opset: int = 17) -> list[Path]:
+    """Export a PyTorch sequence classifier to ``<model_dir>/onnx`` with dynamic batch/sequence axes."""
+    import torch
+
+    output_dir = model_dir / ONNX_SUBDIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / ONNX_FP32_FILE
+
+    model = model.to("cpu").eval()
+    encoded = tokenizer([_SAMPLE_TEXT, _SAMPLE_TEXT[:20]], return_tensors="pt", padding="longest")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in encoded]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            _logits_only(model, input_names),
+            tuple(encoded[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    written = [fp32_path]
+    logger.info("Exported ONNX model to %s", fp32_path)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = output_dir / ONNX_INT8_FILE
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+        written.append(int8_path)
+        logger.info("Wrote int8 dynamically quantized model to %s", int8_path)
+    return written
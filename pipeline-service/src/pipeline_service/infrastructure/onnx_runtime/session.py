@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Mapping
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_RUNTIME = os.getenv("CLASSIFIER_RUNTIME", "torch").strip().lower()
+ONNX_PREFER_INT8 = os.getenv("CLASSIFIER_ONNX_INT8", "1") in {"1", "true", "True"}
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "0"))
+
+ONNX_SUBDIR = "onnx"
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+
+def onnx_runtime_enabled() -> bool:
+    return CLASSIFIER_RUNTIME == "onnx"
+
+
+def onnx_model_file(model_dir: Path) -> Path | None:
+    onnx_dir = model_dir / ONNX_SUBDIR
+    candidates = [ONNX_INT8_FILE, ONNX_FP32_FILE] if ONNX_PREFER_INT8 else [ONNX_FP32_FILE, ONNX_INT8_FILE]
+    for name in candidates:
+        path = onnx_dir / name
+        if path.exists():
+            return path
+    return None
+
+
+def _create_session(model_file: Path):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    if ORT_INTRA_OP_THREADS > 0:
+        options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+    if ORT_INTER_OP_THREADS > 0:
+        options.inter_op_num_threads = ORT_INTER_OP_THREADS
+    return ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+
+
+class OnnxClassifier:
+    """CPU ONNX Runtime session that maps tokenizer output to classification logits."""
+
+    def __init__(self, session: Any, model_file: Path) -> None:
+        self._session = session
+        self._input_names = [item.name for item in session.get_inputs()]
+        self.model_file = model_file
+
+    def logits(self, encoded: Mapping[str, Any]):
+        import numpy as np
+
+        feeds = {name: np.asarray(encoded[name], dtype=np.int64) for name in self._input_names if name in encoded}
+        return self._session.run(None, feeds)[0]
+
+
+def load_onnx_classifier(model_dir: Path) -> OnnxClassifier:
+    model_file = onnx_model_file(model_dir)
+    if model_file is None:
+        raise RuntimeError(
+            f"No ONNX export under {model_dir / ONNX_SUBDIR}; run `python -m pipeline_service.interfaces.cli.export_onnx`"
+        )
+    logger.info("Loading ONNX Runtime session from %s", model_file)
+    return OnnxClassifier(_create_session(model_file), model_file)
+
+
+def softmax(logits):
+    import numpy as np
+
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
@@ -1 +1,5 @@
 """Persistence adapters."""
+
+from pipeline_service.infrastructure.persistence.pool import ConnectionPool
+
+__all__ = ["ConnectionPool"]
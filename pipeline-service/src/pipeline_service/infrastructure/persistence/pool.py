@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+# Bounded pool of DB-API connections. psycopg_pool is not a dependency, and the
+# pipeline only needs check-out/check-in with a hard cap on open connections.
+class ConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        acquire_timeout_s: float = 30.0,
+    ) -> None:
+        self._connect = connect
+        self._max_size = max(1, max_size)
+        self._acquire_timeout_s = acquire_timeout_s
+        self._idle: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self._opened
+
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._opened < self._max_size:
+                self._opened += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self._acquire_timeout_s)
+        except queue.Empty as exc:
+            raise TimeoutError(
+                f"No database connection available within {self._acquire_timeout_s}s"
+            ) from exc
+
+    def _discard(self, conn: Any) -> None:
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            logger.debug("Failed to close pooled connection", exc_info=True)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+                raise
+            if getattr(conn, "closed", False):
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+            raise
+        if getattr(conn, "closed", False) or self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
@@ -2,20 +2,38 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import uuid
+from collections import defaultdict, deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Protocol
 
+from pipeline_service.infrastructure.persistence.pool import ConnectionPool
 from pipeline_service.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+_INSERT_SQL = """
+INSERT INTO ticket_results (
+  external_ticket_id, segment, language, sentiment, ticket_type, priority,
+  summary, recommendation, enriched_text, geo_result, manager_id, office_id, payload, created_at
+)
+VALUES
+"""
+_VALUES_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s::jsonb, %s)"
+_ROW_WIDTH = _VALUES_ROW.count("%s")
+_INSERT_CHUNK_SIZE = 500
+
+
 class TicketRepository(Protocol):
     def save(self, payload: dict[str, object]) -> str:
         ...
 
+    def save_many(self, payloads: list[dict[str, object]]) -> list[str]:
+        ...
+
 
 class InMemoryTicketRepository:
     def __init__(self) -> None:
@@ -35,12 +53,18 @@ class InMemoryTicketRepository:
         )
         return persist_id
 
+    def save_many(self, payloads: list[dict[str, object]]) -> list[str]:
+        return [self.save(payload) for payload in payloads]
+
 
 class PostgresTicketRepository:
-    def __init__(self, dsn: str) -> None:
+    def __init__(self, dsn: str, pool_size: int = 4) -> None:
         self._dsn = self._normalize_dsn(dsn)
         if not self._dsn:
             raise RuntimeError("PERSIST_POSTGRES_DSN/BACKEND_DATABASE_URL is empty")
+        self._pool_size = max(1, pool_size)
+        self._pool: ConnectionPool | None = None
+        self._pool_lock = threading.Lock()
 
     @staticmethod
     def _normalize_dsn(dsn: str) -> str:
@@ -49,66 +73,90 @@ class PostgresTicketRepository:
             return "postgresql://" + value[len("postgresql+psycopg://") :]
         return value
 
-    def save(self, payload: dict[str, object]) -> str:
-        try:
-            import psycopg
-        except Exception as exc:
-            raise RuntimeError(
-                "psycopg is not installed, cannot persist to postgres"
-            ) from exc
-
-        ticket_id = str(payload.get("ticket_id", "") or "")
-        segment = str(payload.get("segment", "") or "")
-        language = str(payload.get("language", "") or "")
-        sentiment = str(payload.get("sentiment", "") or "")
-        ticket_type = str(payload.get("ticket_type", "") or "")
-        priority = int(payload.get("priority", 1) or 1)
-        summary = str(payload.get("summary", "") or "")
-        recommendation = str(payload.get("recommendation", "") or "")
-        enriched_text = str(payload.get("enriched_text", "") or "")
+    def _get_pool(self) -> ConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    try:
+                        import psycopg
+                    except Exception as exc:
+                        raise RuntimeError(
+                            "psycopg is not installed, cannot persist to postgres"
+                        ) from exc
+                    self._pool = ConnectionPool(
+                        lambda: psycopg.connect(self._dsn),
+                        max_size=self._pool_size,
+                    )
+        return self._pool
+
+    @staticmethod
+    def _row_params(payload: dict[str, object], created_at: datetime) -> tuple[object, ...]:
         geo_result = payload.get("geo_result", {})
         if not isinstance(geo_result, dict):
             geo_result = {}
         manager_id = payload.get("manager_id")
         office_id = payload.get("office_id")
-        created_at = datetime.now(timezone.utc)
-
-        sql = """
-        INSERT INTO ticket_results (
-          external_ticket_id, segment, language, sentiment, ticket_type, priority,
-          summary, recommendation, enriched_text, geo_result, manager_id, office_id, payload, created_at
+        return (
+            str(payload.get("ticket_id", "") or ""),
+            str(payload.get("segment", "") or ""),
+            str(payload.get("language", "") or ""),
+            str(payload.get("sentiment", "") or ""),
+            str(payload.get("ticket_type", "") or ""),
+            int(payload.get("priority", 1) or 1),
+            str(payload.get("summary", "") or ""),
+            str(payload.get("recommendation", "") or ""),
+            str(payload.get("enriched_text", "") or ""),
+            json.dumps(geo_result, ensure_ascii=False),
+            manager_id if isinstance(manager_id, int) else None,
+            office_id if isinstance(office_id, int) else None,
+            json.dumps(payload, ensure_ascii=False),
+            created_at,
         )
-        VALUES (
-          %(external_ticket_id)s, %(segment)s, %(language)s, %(sentiment)s, %(ticket_type)s, %(priority)s,
-          %(summary)s, %(recommendation)s, %(enriched_text)s, %(geo_result)s::jsonb, %(manager_id)s, %(office_id)s, %(payload)s::jsonb, %(created_at)s
-        )
-        RETURNING id
-        """
-
-        params = {
-            "external_ticket_id": ticket_id,
-            "segment": segment,
-            "language": language,
-            "sentiment": sentiment,
-            "ticket_type": ticket_type,
-            "priority": priority,
-            "summary": summary,
-            "recommendation": recommendation,
-            "enriched_text": enriched_text,
-            "geo_result": json.dumps(geo_result, ensure_ascii=False),
-            "manager_id": manager_id if isinstance(manager_id, int) else None,
-            "office_id": office_id if isinstance(office_id, int) else None,
-            "payload": json.dumps(payload, ensure_ascii=False),
-            "created_at": created_at,
-        }
-
-        with psycopg.connect(self._dsn) as conn:
+
+    @staticmethod
+    def _match_ids(keys: list[str], rows: list[tuple[object, ...]]) -> list[str]:
+        # RETURNING order is not guaranteed to follow the VALUES order, so ids are
+        # matched back on the ticket id each row was inserted with.
+        if len(rows) != len(keys):
+            raise RuntimeError(f"Inserted {len(rows)} rows for {len(keys)} tickets")
+        ids_by_key: dict[str, deque[str]] = defaultdict(deque)
+        for row_id, key in rows:
+            ids_by_key[str(key)].append(str(row_id) if row_id is not None else str(uuid.uuid4()))
+        try:
+            return [ids_by_key[key].popleft() for key in keys]
+        except IndexError:
+            raise RuntimeError("Inserted rows do not match the submitted ticket ids") from None
+
+    def save(self, payload: dict[str, object]) -> str:
+        return self.save_many([payload])[0]
+
+    def save_many(self, payloads: list[dict[str, object]]) -> list[str]:
+        if not payloads:
+            return []
+
+        created_at = datetime.now(timezone.utc)
+        persist_ids: list[str] = []
+        with self._get_pool().connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, params)
-                row = cur.fetchone()
+                for start in range(0, len(payloads), _INSERT_CHUNK_SIZE):
+                    chunk = payloads[start : start + _INSERT_CHUNK_SIZE]
+                    params: list[object] = []
+                    for payload in chunk:
+                        params.extend(self._row_params(payload, created_at))
+                    cur.execute(
+                        _INSERT_SQL
+                        + ",\n".join([_VALUES_ROW] * len(chunk))
+                        + "\nRETURNING id, external_ticket_id",
+                        params,
+                    )
+                    keys = [str(params[idx * _ROW_WIDTH]) for idx in range(len(chunk))]
+                    persist_ids.extend(self._match_ids(keys, cur.fetchall()))
             conn.commit()
+        return persist_ids
 
-        return str(row[0]) if row and row[0] is not None else str(uuid.uuid4())
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
 
 
 def build_ticket_repository() -> TicketRepository:
@@ -118,7 +166,10 @@ def build_ticket_repository() -> TicketRepository:
         return InMemoryTicketRepository()
 
     try:
-        return PostgresTicketRepository(settings.persist_postgres_dsn)
+        return PostgresTicketRepository(
+            settings.persist_postgres_dsn,
+            pool_size=settings.persist_pool_size,
+        )
     except Exception:
         logger.exception(
             "Failed to initialize postgres persistence; falling back to local json persistence"
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from pipeline_service.infrastructure.onnx_runtime.export import export_sequence_classifier
+
+_MODELS = ("type", "sentiment", "spam")
+
+
+def _load_model(name: str):
+    """Return (tokenizer, fp model, model_dir) using the same loaders as the nodes."""
+    if name == "type":
+        from pipeline_service.application.nodes import get_type
+
+        tokenizer, model, _, _ = get_type._get_local_components()
+        return tokenizer, model, get_type._resolve_artifacts()[0]
+    if name == "sentiment":
+        from pipeline_service.application.nodes import get_sentiment
+
+        # Export the unquantized model; int8 is applied to the ONNX graph instead.
+        model_dir = get_sentiment._resolve_model_path(get_sentiment.LOCAL_MODEL_PATH)
+        tokenizer, model = get_sentiment._load_fp_model(model_dir)
+        return tokenizer, model, model_dir
+
+    from pipeline_service.application.nodes import is_spam
+
+    tokenizer, model = is_spam._get_local_components()
+    return tokenizer, model, is_spam._resolve_model_path(is_spam.LOCAL_MODEL_PATH)
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Export local classifiers to ONNX for CLASSIFIER_RUNTIME=onnx")
+    parser.add_argument("--model", choices=[*_MODELS, "all"], default="all")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamically quantized model")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    names = _MODELS if args.model == "all" else (args.model,)
+    for name in names:
+        tokenizer, model, model_dir = _load_model(name)
+        written = export_sequence_classifier(model, tokenizer, Path(model_dir), quantize=args.quantize, opset=args.opset)
+        for path in written:
+            print(f"{name}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
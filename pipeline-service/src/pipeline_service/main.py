@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import logging
 import os
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
-from pipeline_service.application.graph.ticket_graph import build_ticket_graph
-from pipeline_service.application.services.csv_ingestion_service import load_tickets_from_csv
+from pipeline_service.application.graph.batch_runner import LeaderMemory, TicketBatchRunner
+from pipeline_service.application.graph.ticket_graph import build_async_ticket_graph, build_ticket_graph
+from pipeline_service.application.services.csv_ingestion_service import iter_tickets_from_csv
+from pipeline_service.application.services.ticket_dedup import get_dedup_stats
 from pipeline_service.application.state.ticket_state import TicketState
+from pipeline_service.infrastructure.cache import get_inference_cache_stats
+from pipeline_service.infrastructure.cascade import get_cascade_stats
+from pipeline_service.infrastructure.geo import get_geocoder_rate_stats
+from pipeline_service.infrastructure.geo.geocode_cache import get_geocode_cache
+from pipeline_service.infrastructure.http import aclose_async_client
+from pipeline_service.infrastructure.llm.prompt_cache import get_prompt_cache
+from pipeline_service.infrastructure.ocr import get_ocr_cache, get_ocr_variant_stats
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +73,82 @@ def warmup_if_enabled() -> None:
         logger.exception("Warmup failed")
 
 
+def print_cascade_stats() -> None:
+    for stats in get_cascade_stats():
+        if not stats["total"]:
+            continue
+        agreement = stats["agreement_rate"]
+        print(
+            f"Cascade {stats['name']}: fast_hits={stats['fast_hits']}/{stats['total']} "
+            f"({stats['fast_hit_rate']:.1%}) escalated={stats['escalated']} "
+            f"agreement={'n/a' if agreement is None else f'{agreement:.1%}'} (audited={stats['audited']})"
+        )
+
+
+def print_inference_cache_stats() -> None:
+    for stats in get_inference_cache_stats():
+        lookups = stats["hits"] + stats["misses"]
+        if not lookups:
+            continue
+        print(
+            f"Inference cache {stats['model']}: hits={stats['hits']}/{lookups} "
+            f"({stats['hits'] / lookups:.1%}) writes={stats['writes']}"
+        )
+
+
+def print_cache_stats() -> None:
+    caches = {"OCR": get_ocr_cache(), "LLM prompt": get_prompt_cache(), "Geocode": get_geocode_cache()}
+    for name, cache in caches.items():
+        stats = cache.stats()
+        hits = stats["hits"] + stats.get("negative_hits", 0)
+        lookups = hits + stats["misses"]
+        if not lookups:
+            continue
+        writes = stats["writes"] + stats.get("negative_writes", 0)
+        print(f"{name} cache: hits={hits}/{lookups} ({hits / lookups:.1%}) writes={writes}")
+
+
+def print_ocr_variant_stats() -> None:
+    stats = get_ocr_variant_stats()
+    if not any(item["runs"] for item in stats.values()):
+        return
+    summary = " ".join(
+        f"{name}={item['wins']}/{item['runs']}(skipped={item['skipped']})" for name, item in stats.items()
+    )
+    print(f"OCR variant wins/runs: {summary}")
+
+
+def print_geocoder_rate_stats() -> None:
+    for stats in get_geocoder_rate_stats():
+        if not stats["requests"]:
+            continue
+        print(
+            f"Geocoder {stats['host']}: requests={stats['requests']} errors={stats['errors']} "
+            f"latency_ewma={stats['latency_ewma_ms']}ms limit={stats['limit']} "
+            f"(+{stats['increases']}/-{stats['decreases']}, waits={stats['waits']}) "
+            f"rate_limited={stats['rate_limited']} ({stats['rate_wait_ms']}ms)"
+        )
+
+
+def print_dedup_stats() -> None:
+    stats = get_dedup_stats()
+    if not stats["tickets"]:
+        return
+    duplicates = stats["exact_duplicates"] + stats["near_duplicates"]
+    print(
+        f"Dedup: tickets={stats['tickets']} clusters={stats['leaders']} duplicates={duplicates} "
+        f"(exact={stats['exact_duplicates']} near={stats['near_duplicates']})"
+    )
+
+
+def finish_duplicate(runner: TicketBatchRunner, leaders: LeaderMemory, ticket: TicketState) -> dict[str, Any] | None:
+    """Completes a duplicate from its leader's remembered enrichment; None when it must run in full."""
+    if not leaders.knows_leader(ticket):
+        return None
+    batch = runner.run([ticket], leaders)
+    return dict(batch.states[0]) if batch.states else None
+
+
 def load_json_payload(file_path: str | None, use_sample: bool) -> TicketState:
     if use_sample or file_path is None:
         return SAMPLE_TICKET.copy()  # type: ignore[return-value]
@@ -71,6 +157,89 @@ def load_json_payload(file_path: str | None, use_sample: bool) -> TicketState:
     return payload
 
 
+def run_csv_in_batches(tickets: Iterable[TicketState], batch_size: int, show_timing: bool) -> None:
+    runner = TicketBatchRunner()
+    stage_totals_ms: dict[str, float] = {}
+    for batch in runner.run_batches(tickets, batch_size):
+        for final_state in batch.states:
+            logger.info("Pipeline completed for ticket_id=%s", final_state.get("ticket_id"))
+            print(json.dumps(final_state, ensure_ascii=False, indent=2))
+        for failure in batch.failures:
+            logger.warning(
+                "Pipeline failed for ticket_id=%s stage=%s error=%s",
+                failure["ticket_id"],
+                failure["stage"],
+                failure["error"],
+            )
+        for stage, elapsed_ms in batch.stage_timings_ms.items():
+            stage_totals_ms[stage] = stage_totals_ms.get(stage, 0.0) + elapsed_ms
+        if show_timing:
+            logger.info(
+                "Batch runtime tickets=%s stages=%s",
+                len(batch.states) + len(batch.failures),
+                {stage: round(ms, 2) for stage, ms in batch.stage_timings_ms.items()},
+            )
+
+    if show_timing:
+        for stage, elapsed_ms in stage_totals_ms.items():
+            print(f"Stage {stage} elapsed: {elapsed_ms:.2f} ms")
+
+
+async def run_csv_async(tickets: Iterable[TicketState], concurrency: int, show_timing: bool) -> None:
+    graph = build_async_ticket_graph()
+    limit = max(1, concurrency)
+    dedup_runner = TicketBatchRunner()
+    leaders = LeaderMemory()
+    leader_tasks: dict[str, asyncio.Task[tuple[dict[str, Any], float]]] = {}
+
+    async def _run_one(ticket: TicketState) -> tuple[dict[str, Any], float]:
+        started_at = time.perf_counter()
+        if ticket.get("duplicate_of"):
+            leader_task = leader_tasks.get(ticket.get("dedup_key", ""))
+            if leader_task is not None:
+                # Wait for the cluster leader instead of enriching the same content twice.
+                await asyncio.wait([leader_task])
+            final_state = await asyncio.to_thread(finish_duplicate, dedup_runner, leaders, ticket)
+            if final_state is not None:
+                return final_state, (time.perf_counter() - started_at) * 1000
+        final_state = await graph.ainvoke(ticket)
+        leaders.remember(final_state)  # type: ignore[arg-type]
+        return final_state, (time.perf_counter() - started_at) * 1000
+
+    def _report(ticket: TicketState, task: asyncio.Task[tuple[dict[str, Any], float]]) -> None:
+        # Finished leaders are in the leader memory, the task is no longer needed.
+        if leader_tasks.get(ticket.get("dedup_key", "")) is task:
+            del leader_tasks[ticket["dedup_key"]]
+        if task.exception() is not None:
+            logger.error("Pipeline failed for ticket_id=%s: %s", ticket.get("ticket_id"), task.exception())
+            return
+        final_state, elapsed_ms = task.result()
+        logger.info("Pipeline completed for ticket_id=%s", final_state.get("ticket_id"))
+        if show_timing:
+            logger.info("Ticket runtime ticket_id=%s elapsed_ms=%.2f", final_state.get("ticket_id"), elapsed_ms)
+        print(json.dumps(final_state, ensure_ascii=False, indent=2))
+
+    # Tickets are pulled from the iterator only when a slot frees up, so a large
+    # CSV is never materialized and at most `limit` tickets are in flight.
+    in_flight: dict[asyncio.Task[tuple[dict[str, Any], float]], TicketState] = {}
+    try:
+        for ticket in tickets:
+            if len(in_flight) >= limit:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    _report(in_flight.pop(task), task)
+            task = asyncio.create_task(_run_one(ticket))
+            if ticket.get("dedup_key") and not ticket.get("duplicate_of"):
+                leader_tasks[ticket["dedup_key"]] = task
+            in_flight[task] = ticket
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            for task in done:
+                _report(in_flight.pop(task), task)
+    finally:
+        await aclose_async_client()
+
+
 def main() -> int:
     configure_logging()
     configure_runtime()
@@ -85,6 +254,18 @@ def main() -> int:
         action="store_true",
         help="Print pipeline execution time summary",
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=int(os.getenv("PIPELINE_BATCH_SIZE", "0")),
+        help="Run CSV input stage-by-stage in batches of this size (0 = one graph run per ticket)",
+    )
+    parser.add_argument(
+        "--async_concurrency",
+        type=int,
+        default=int(os.getenv("PIPELINE_ASYNC_CONCURRENCY", "0")),
+        help="Run CSV input on the async graph with this many tickets in flight (0 = disabled)",
+    )
     args = parser.parse_args()
 
     show_timing = args.show_timing or os.getenv("SHOW_TIMING", "0").strip().lower() in {"1", "true", "yes", "on"}
@@ -95,10 +276,31 @@ def main() -> int:
         if not args.file:
             raise ValueError("--file is required when --input_type=csv")
 
-        tickets = load_tickets_from_csv(args.file)
+        tickets = iter_tickets_from_csv(args.file)
+        if args.batch_size > 0 or args.async_concurrency > 0:
+            if args.batch_size > 0:
+                run_csv_in_batches(tickets, args.batch_size, show_timing)
+            else:
+                asyncio.run(run_csv_async(tickets, args.async_concurrency, show_timing))
+            if show_timing:
+                total_elapsed_ms = (time.perf_counter() - total_started_at) * 1000
+                print(f"Pipeline total elapsed: {total_elapsed_ms:.2f} ms")
+                print_cascade_stats()
+                print_inference_cache_stats()
+                print_cache_stats()
+                print_ocr_variant_stats()
+                print_geocoder_rate_stats()
+                print_dedup_stats()
+            return 0
+
+        dedup_runner = TicketBatchRunner()
+        leaders = LeaderMemory()
         for ticket in tickets:
             started_at = time.perf_counter()
-            final_state = graph.invoke(ticket)
+            final_state = finish_duplicate(dedup_runner, leaders, ticket)
+            if final_state is None:
+                final_state = graph.invoke(ticket)
+                leaders.remember(final_state)  # type: ignore[arg-type]
             elapsed_ms = (time.perf_counter() - started_at) * 1000
             logger.info("Pipeline completed for ticket_id=%s", final_state.get("ticket_id"))
             if show_timing:
@@ -107,6 +309,12 @@ def main() -> int:
         if show_timing:
             total_elapsed_ms = (time.perf_counter() - total_started_at) * 1000
             print(f"Pipeline total elapsed: {total_elapsed_ms:.2f} ms")
+            print_cascade_stats()
+            print_inference_cache_stats()
+            print_cache_stats()
+            print_ocr_variant_stats()
+            print_geocoder_rate_stats()
+            print_dedup_stats()
         return 0
 
     started_at = time.perf_counter()
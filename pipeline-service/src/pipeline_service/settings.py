@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import tempfile
 from dataclasses import dataclass
 
 
@@ -23,9 +24,38 @@ class Settings:
         "PERSIST_POSTGRES_DSN",
         os.getenv("BACKEND_DATABASE_URL", ""),
     )
+    persist_pool_size: int = int(os.getenv("PERSIST_POOL_SIZE", "4"))
+    persist_batch_size: int = int(os.getenv("PERSIST_BATCH_SIZE", "1"))
+    persist_flush_interval_ms: float = float(os.getenv("PERSIST_FLUSH_INTERVAL_MS", "50"))
+    cache_dir: str = os.getenv(
+        "PIPELINE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "fire-pipeline-cache"),
+    )
+    geocode_cache_enabled: bool = os.getenv("GEOCODE_CACHE_ENABLED", "1") in {"1", "true", "True"}
+    geocode_cache_path: str = os.getenv("GEOCODE_CACHE_PATH", "")
+    geocode_cache_max_mb: int = int(os.getenv("GEOCODE_CACHE_MAX_MB", "16"))
+    geocode_cache_ttl_seconds: int = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    geocode_cache_negative_ttl_seconds: int = int(
+        os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_SECONDS", str(24 * 3600))
+    )
+    inference_cache_enabled: bool = os.getenv("INFERENCE_CACHE_ENABLED", "1") in {"1", "true", "True"}
+    inference_cache_path: str = os.getenv("INFERENCE_CACHE_PATH", "")
+    inference_cache_max_mb: int = int(os.getenv("INFERENCE_CACHE_MAX_MB", "64"))
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "1") in {"1", "true", "True"}
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "")
+    llm_cache_max_mb: int = int(os.getenv("LLM_CACHE_MAX_MB", "16"))
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    ocr_cache_enabled: bool = os.getenv("OCR_CACHE_ENABLED", "1") in {"1", "true", "True"}
+    ocr_cache_path: str = os.getenv("OCR_CACHE_PATH", "")
+    ocr_cache_max_mb: int = int(os.getenv("OCR_CACHE_MAX_MB", "32"))
+    ticket_dedup_enabled: bool = os.getenv("TICKET_DEDUP_ENABLED", "1") in {"1", "true", "True"}
+    ticket_dedup_near: bool = os.getenv("TICKET_DEDUP_NEAR", "0") in {"1", "true", "True"}
+    ticket_dedup_max_distance: int = int(os.getenv("TICKET_DEDUP_MAX_DISTANCE", "3"))
+    unified_classifier: bool = os.getenv("PIPELINE_UNIFIED_CLASSIFIER", "0") in {"1", "true", "True"}
     assign_enabled: bool = os.getenv("ASSIGN_ENABLED", "0") in {"1", "true", "True"}
     backend_base_url: str = os.getenv("BACKEND_BASE_URL", "http://localhost:8001")
     backend_assign_timeout_seconds: int = int(os.getenv("BACKEND_ASSIGN_TIMEOUT_SECONDS", "15"))
+    backend_assign_batch_timeout_seconds: int = int(os.getenv("BACKEND_ASSIGN_BATCH_TIMEOUT_SECONDS", "30"))
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+# Settings read the environment once at import, so this has to happen before any
+# pipeline_service module loads. Persistent caches would otherwise share results
+# with earlier test runs and with each other.
+os.environ["PIPELINE_CACHE_DIR"] = tempfile.mkdtemp(prefix="pipeline-tests-cache-")
+for _name in ("OCR_CACHE_ENABLED", "INFERENCE_CACHE_ENABLED", "LLM_CACHE_ENABLED", "GEOCODE_CACHE_ENABLED"):
+    os.environ[_name] = "0"
+
+import pytest
+
+from pipeline_service.application.nodes import get_sentiment, get_type, is_spam
+from pipeline_service.infrastructure.cache import inference_cache
+from pipeline_service.infrastructure.geo import geocode_cache
+from pipeline_service.infrastructure.llm import prompt_cache
+from pipeline_service.infrastructure.ocr import ocr_cache
+
+_CACHE_FACTORIES = (
+    ocr_cache.get_ocr_cache,
+    prompt_cache.get_prompt_cache,
+    geocode_cache.get_geocode_cache,
+    inference_cache._get_shared_store,
+    is_spam._inference_cache,
+    get_sentiment._inference_cache,
+    get_type._inference_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches():
+    """Give every test fresh in-memory OCR, inference, LLM and geocode caches."""
+    for factory in _CACHE_FACTORIES:
+        factory.cache_clear()
+    yield
+    for factory in _CACHE_FACTORIES:
+        factory.cache_clear()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+
+from pipeline_service.application.graph.ticket_graph import build_async_ticket_graph, build_ticket_graph
+from pipeline_service.application.nodes import get_geo_data
+
+
+def test_async_graph_matches_sync_graph() -> None:
+    payload = {
+        "ticket_id": "TST-ASYNC-1",
+        "raw_text": "Приложение не открывается после обновления.",
+        "country": "KZ",
+        "region": "Алматинская",
+        "city": "Тургень",
+        "street": "Садовая",
+        "house": "7",
+    }
+
+    expected = build_ticket_graph().invoke(dict(payload))
+    result = asyncio.run(build_async_ticket_graph().ainvoke(dict(payload)))
+
+    for key in ("geo_result", "language", "sentiment", "ticket_type", "priority", "summary", "recommendation"):
+        assert result[key] == expected[key], key
+    assert "persist_id" in result
+
+
+def test_async_geo_node_uses_async_geocoder(monkeypatch) -> None:
+    calls: list[str] = []
+
+    class _FakeAsyncClient:
+        def __init__(self, **_kwargs) -> None:
+            pass
+
+        async def ageocode_detailed(self, query: str, country_codes: str = "kz"):
+            calls.append(query)
+            return {"result": {"lat": 43.4, "lon": 77.6, "raw": {}}, "first_candidate": None, "error": None}
+
+    monkeypatch.setenv("GEOCODER_ENABLED", "1")
+    monkeypatch.setenv("GEO_USE_LLM_NORMALIZATION", "0")
+    monkeypatch.setattr(get_geo_data, "AsyncNominatimClient", _FakeAsyncClient)
+
+    result = asyncio.run(
+        get_geo_data.arun({"country": "KZ", "region": "Алматинская", "city": "Тургень", "street": "Садовая", "house": "7"})
+    )
+
+    assert result["geo_result"]["status"] == "ok"
+    assert result["geo_result"]["source"] == "nominatim"
+    assert len(calls) == 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pipeline_service.application.graph.batch_runner import DEFAULT_STAGES, TicketBatchRunner
+from pipeline_service.application.graph.ticket_graph import build_ticket_graph
+
+_TICKETS = [
+    {
+        "ticket_id": "BATCH-1",
+        "raw_text": "Приложение не открывается, ошибка при входе.",
+        "country": "",
+        "region": "Алматинская",
+        "house": "7",
+    },
+    {
+        "ticket_id": "BATCH-2",
+        "raw_text": "Вы выиграли бесплатно промокод казино!",
+        "country": "",
+    },
+    {
+        "ticket_id": "BATCH-3",
+        "raw_text": "Подскажите, как сменить номер телефона?",
+        "country": "KZ",
+        "city": "Тургень",
+    },
+]
+
+_COMPARED_KEYS = (
+    "language",
+    "sentiment",
+    "is_spam",
+    "ticket_type",
+    "priority",
+    "summary",
+    "recommendation",
+    "enriched_text",
+    "geo_result",
+)
+
+
+def test_batch_runner_matches_graph_per_ticket() -> None:
+    graph = build_ticket_graph()
+    expected = [graph.invoke(dict(ticket)) for ticket in _TICKETS]
+
+    result = TicketBatchRunner().run([dict(ticket) for ticket in _TICKETS])
+
+    assert not result.failures
+    assert [state["ticket_id"] for state in result.states] == [t["ticket_id"] for t in _TICKETS]
+    for actual, reference in zip(result.states, expected):
+        for key in _COMPARED_KEYS:
+            assert actual.get(key) == reference.get(key), key
+        assert "persist_id" in actual
+    assert result.states[1]["ticket_type"] == "Спам"
+    assert list(result.stage_timings_ms) == [stage.name for stage in DEFAULT_STAGES]
+
+
+def test_batch_runner_isolates_failing_ticket(monkeypatch) -> None:
+    from pipeline_service.application.graph import batch_runner
+
+    def _failing_priority(state):
+        if state.get("ticket_id") == "BATCH-1":
+            raise ValueError("boom")
+        return {"priority": 3}
+
+    stages = [
+        stage if stage.name != "get_priority" else batch_runner.BatchStage("get_priority", _failing_priority)
+        for stage in DEFAULT_STAGES
+    ]
+
+    batches = list(TicketBatchRunner(stages).run_batches(iter(_TICKETS), batch_size=2))
+
+    assert [len(batch.states) for batch in batches] == [1, 1]
+    assert batches[0].failures[0]["ticket_id"] == "BATCH-1"
+    assert batches[0].failures[0]["stage"] == "get_priority"
+
+
+def test_type_fallback_keeps_spam_label(monkeypatch) -> None:
+    from pipeline_service.application.graph import batch_runner
+
+    def _broken_batch(texts):
+        raise RuntimeError("batch inference failed")
+
+    monkeypatch.setattr(batch_runner.get_type, "classify_many", _broken_batch)
+
+    result = TicketBatchRunner().run([dict(ticket) for ticket in _TICKETS])
+
+    assert not result.failures
+    assert result.states[1]["is_spam"] is True
+    assert result.states[1]["ticket_type"] == "Спам"
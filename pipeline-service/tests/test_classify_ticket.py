@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pipeline_service.application.nodes import classify_ticket
+
+
+def test_unified_heads_map_to_pipeline_labels() -> None:
+    result = {"spam_probability": 0.1, "type_label": "fraud", "sentiment_label": "negative"}
+
+    assert classify_ticket._to_updates(result, "negative", keyword_spam=False) == {
+        "is_spam": False,
+        "ticket_type": "Мошеннические действия",
+        "sentiment": "Негативный",
+    }
+    assert classify_ticket._to_updates({**result, "spam_probability": 0.9}, "negative", keyword_spam=False)["ticket_type"] == "Спам"
+    assert classify_ticket._to_updates(result, "negative", keyword_spam=True)["is_spam"] is True
+
+
+def test_classify_many_falls_back_to_separate_models(monkeypatch) -> None:
+    monkeypatch.setattr(classify_ticket, "_model_ready", lambda: False)
+    monkeypatch.setattr(classify_ticket.get_sentiment, "run", lambda state: {"sentiment": "Нейтральный"})
+    monkeypatch.setattr(classify_ticket.is_spam, "run", lambda state: {"is_spam": "казино" in state["raw_text"]})
+    monkeypatch.setattr(classify_ticket.get_type, "run", lambda state: {"ticket_type": "Консультация"})
+
+    updates = classify_ticket.classify_many(
+        [{"raw_text": "Подскажите тариф"}, {"raw_text": "казино"}]  # type: ignore[list-item]
+    )
+
+    assert updates == [
+        {"sentiment": "Нейтральный", "is_spam": False, "ticket_type": "Консультация"},
+        {"sentiment": "Нейтральный", "is_spam": True},
+    ]
+
+
+def test_unified_sentiment_reads_raw_text_like_the_separate_node(monkeypatch) -> None:
+    batches: list[list[str]] = []
+
+    def infer(texts: list[str]) -> list[dict[str, object]]:
+        batches.append(list(texts))
+        return [
+            {"spam_probability": 0.0, "type_label": "consultation", "sentiment_label": "negative" if "жалоба" in text else "neutral"}
+            for text in texts
+        ]
+
+    monkeypatch.setattr(classify_ticket, "_model_ready", lambda: True)
+    monkeypatch.setattr(classify_ticket, "_infer_heads_many", infer)
+
+    updates = classify_ticket.classify_many(
+        [
+            {"raw_text": "Подскажите тариф", "enriched_text": "Подскажите тариф\nжалоба из вложения"},
+            {"raw_text": "Подскажите тариф", "enriched_text": "Подскажите тариф"},
+        ]  # type: ignore[list-item]
+    )
+
+    assert [update["sentiment"] for update in updates] == ["Нейтральный", "Нейтральный"]
+    assert batches == [["Подскажите тариф\nжалоба из вложения", "Подскажите тариф"]]
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import io
 from pathlib import Path
 
-from pipeline_service.application.services.csv_ingestion_service import load_tickets_from_csv
+from pipeline_service.application.services.csv_ingestion_service import (
+    iter_tickets_from_csv,
+    load_tickets_from_csv,
+)
 
 
 def test_load_tickets_from_csv_maps_expected_fields(tmp_path: Path) -> None:
@@ -20,3 +24,22 @@ fe44694a-10ed-f011-8406-0022481ba5f0,Мужской,1998-10-02 0:00,"Здрав
     assert tickets[0]["ticket_id"] == "fe44694a-10ed-f011-8406-0022481ba5f0"
     assert "Покупка акций" in tickets[0]["raw_text"]
     assert "Казахстан" in tickets[0]["raw_address"]
+
+
+def test_iter_tickets_from_csv_streams_rows_lazily() -> None:
+    header = "GUID клиента,Пол клиента,Дата рождения,Описание,Вложения,Сегмент клиента,Страна,Область,Населённый пункт,Улица,Дом\n"
+    stream = io.StringIO(
+        header
+        + "id-1,Мужской,1990-01-01,Первое,,Mass,Казахстан,,Астана,,\n"
+        + ",Женский,1991-01-01,Без GUID,,Mass,Казахстан,,Астана,,\n"
+        + "id-2,Женский,1992-01-01,Второе,,VIP,Казахстан,,Алматы,,\n"
+    )
+
+    tickets = iter_tickets_from_csv(stream)
+    first = next(tickets)
+
+    assert first["ticket_id"] == "id-1"
+    assert first["raw_address"] == "Казахстан, Астана"
+    # Only the rows consumed so far have been read from the stream.
+    assert stream.tell() < len(stream.getvalue())
+    assert [ticket["ticket_id"] for ticket in tickets] == ["id-2"]
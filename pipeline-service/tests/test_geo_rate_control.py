@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from pipeline_service.infrastructure.geo import nominatim_client
+from pipeline_service.infrastructure.geo.rate_control import (
+    AdaptiveConcurrencyLimit,
+    HostRateController,
+    TokenBucket,
+)
+
+
+def test_token_bucket_spaces_requests_after_burst() -> None:
+    bucket = TokenBucket(rate_per_s=50, burst=2)
+
+    started = time.monotonic()
+    delays = [bucket.acquire() for _ in range(4)]
+    elapsed = time.monotonic() - started
+
+    assert delays[:2] == [0.0, 0.0]
+    assert all(delay > 0 for delay in delays[2:])
+    assert elapsed >= 0.035
+
+
+def test_disabled_token_bucket_never_waits() -> None:
+    bucket = TokenBucket(rate_per_s=0, burst=0)
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+
+
+def test_aimd_grows_under_target_and_halves_on_overload() -> None:
+    limit = AdaptiveConcurrencyLimit(initial=2, min_limit=1, max_limit=8, latency_target_s=0.5)
+
+    for _ in range(20):
+        limit.acquire()
+        limit.release(0.01)
+    grown = limit.limit
+    assert grown > 2
+
+    limit.acquire()
+    limit.release(0.01, overloaded=True)
+    assert 1 <= limit.limit < grown
+
+    # A second overload inside the same window does not halve it again.
+    halved = limit.limit
+    limit.acquire()
+    limit.release(2.0)
+    assert limit.limit == halved
+    assert limit.stats()["decreases"] == 1
+
+
+def test_aimd_limit_blocks_extra_callers() -> None:
+    limit = AdaptiveConcurrencyLimit(initial=1, min_limit=1, max_limit=1, latency_target_s=1.0)
+    limit.acquire()
+    acquired = threading.Event()
+
+    def _second() -> None:
+        limit.acquire()
+        acquired.set()
+        limit.release(0.01)
+
+    thread = threading.Thread(target=_second)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limit.release(0.01)
+    assert acquired.wait(1.0)
+    thread.join()
+    assert limit.stats()["waits"] == 1
+
+
+def test_async_waiters_resume_and_cancel_does_not_adapt() -> None:
+    limit = AdaptiveConcurrencyLimit(initial=1, min_limit=1, max_limit=4, latency_target_s=1.0)
+    controller = HostRateController("http://geo", TokenBucket(0, 0), limit)
+    order: list[str] = []
+
+    async def _request(name: str) -> None:
+        started_at = await controller.aacquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        controller.release(started_at, overloaded=False)
+
+    async def _main() -> None:
+        await asyncio.gather(_request("a"), _request("b"))
+        await controller.aacquire()
+        controller.cancel()
+
+    asyncio.run(_main())
+
+    assert order == ["a", "b"]
+    stats = controller.stats()
+    assert stats["requests"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["increases"] == 2
+
+
+def test_nominatim_client_reports_timeouts_as_overload(monkeypatch) -> None:
+    import requests
+
+    class _Cache:
+        def get(self, query: str, country_codes: str) -> None:
+            return None
+
+        def put(self, query: str, country_codes: str, detailed: dict) -> None:
+            pass
+
+    def _timeout(*args, **kwargs):
+        raise requests.Timeout("slow")
+
+    monkeypatch.setattr(nominatim_client, "get_geocode_cache", lambda: _Cache())
+    monkeypatch.setattr(nominatim_client._SESSION, "get", _timeout)
+    monkeypatch.setattr(nominatim_client, "_CONTROLLERS", {})
+
+    client = nominatim_client.NominatimClient("http://geo.test", "test", 1.0)
+    try:
+        client.geocode_detailed("Алматы")
+    except requests.Timeout:
+        pass
+
+    (stats,) = nominatim_client.get_geocoder_rate_stats()
+    assert stats["host"] == "http://geo.test"
+    assert stats["errors"] == 1
+    assert stats["decreases"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from pipeline_service.infrastructure.geo import variant_racer
+from pipeline_service.infrastructure.geo.variant_racer import arace_variants, hedge_delay_ms, race_variants
+
+
+def _hit(query: str) -> dict[str, object]:
+    return {"result": {"lat": 1.0, "lon": 2.0, "display_name": query}, "first_candidate": None, "error": None}
+
+
+def _miss() -> dict[str, object]:
+    return {"result": None, "first_candidate": None, "error": None}
+
+
+def test_race_prefers_priority_order_over_first_finisher() -> None:
+    def _lookup(query: str) -> dict[str, object]:
+        if query == "a":
+            time.sleep(0.15)
+            return _hit(query)
+        return _hit(query)
+
+    outcome = race_variants(["a", "b", "c"], _lookup, fanout=3, hedge_ms=0)
+
+    assert outcome.query == "a"
+    assert outcome.detailed is not None and outcome.detailed["result"]["display_name"] == "a"
+
+
+def test_race_latency_is_bounded_by_one_slow_variant() -> None:
+    def _lookup(query: str) -> dict[str, object]:
+        time.sleep(0.2)
+        return _hit(query) if query == "d" else _miss()
+
+    started = time.monotonic()
+    outcome = race_variants(["a", "b", "c", "d"], _lookup, fanout=4, hedge_ms=0)
+    elapsed = time.monotonic() - started
+
+    assert outcome.query == "d"
+    assert elapsed < 0.5
+    assert {query for query, _ in outcome.attempts} == {"a", "b", "c", "d"}
+
+
+def test_race_treats_errors_as_misses() -> None:
+    def _lookup(query: str) -> dict[str, object]:
+        if query == "a":
+            raise ConnectionError("boom")
+        return _hit(query)
+
+    outcome = race_variants(["a", "b"], _lookup, fanout=2, hedge_ms=0)
+
+    assert outcome.query == "b"
+    assert any("ConnectionError" in str(detailed["error"]) for _, detailed in outcome.attempts)
+
+
+def test_race_stops_launching_after_a_decisive_miss(monkeypatch) -> None:
+    submitted: list[str] = []
+    executor = variant_racer._get_executor()
+
+    class _RecordingExecutor:
+        def submit(self, fn, query: str):
+            submitted.append(query)
+            return executor.submit(fn, query)
+
+    monkeypatch.setattr(variant_racer, "_get_executor", _RecordingExecutor)
+
+    def _lookup(query: str) -> dict[str, object]:
+        if query == "a":
+            time.sleep(0.15)
+            return _miss()
+        return _hit(query)
+
+    outcome = race_variants(["a", "b", "c"], _lookup, fanout=3, hedge_ms=100)
+
+    assert outcome.query == "b"
+    # The miss on "a" settles the race; "c" must not be sent and then cancelled.
+    assert submitted == ["a", "b"]
+
+
+def test_async_race_hedges_and_cancels_losers() -> None:
+    calls: list[str] = []
+    cancelled: list[str] = []
+
+    async def _lookup(query: str) -> dict[str, object]:
+        calls.append(query)
+        try:
+            await asyncio.sleep(0.05 if query == "a" else 1.0)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return _hit(query)
+
+    outcome = asyncio.run(arace_variants(["a", "b", "c"], _lookup, fanout=3, hedge_ms=20))
+
+    assert outcome.query == "a"
+    assert calls == ["a", "b", "c"]
+    assert sorted(cancelled) == ["b", "c"]
+
+
+def test_async_race_fast_hit_skips_other_variants() -> None:
+    calls: list[str] = []
+
+    async def _lookup(query: str) -> dict[str, object]:
+        calls.append(query)
+        return _hit(query)
+
+    outcome = asyncio.run(arace_variants(["a", "b", "c"], _lookup, fanout=3, hedge_ms=50))
+
+    assert outcome.query == "a"
+    assert calls == ["a"]
+
+
+def test_hedge_delay_follows_observed_latency(monkeypatch) -> None:
+    monkeypatch.setattr(variant_racer, "GEOCODER_RACE_HEDGE_MS", None)
+    monkeypatch.setattr(variant_racer, "GEOCODER_RACE_COLD_HEDGE_MS", 1000.0)
+
+    assert hedge_delay_ms(None) == 1000.0
+    assert hedge_delay_ms(420.0) == 420.0
+    assert hedge_delay_ms(3.0) == 50.0
+
+    monkeypatch.setattr(variant_racer, "GEOCODER_RACE_HEDGE_MS", 250.0)
+    assert hedge_delay_ms(420.0) == 250.0
+
+
+def test_host_latency_ewma_tracks_completed_requests(monkeypatch) -> None:
+    from pipeline_service.infrastructure.geo import nominatim_client
+
+    monkeypatch.setattr(nominatim_client, "_CONTROLLERS", {})
+    assert nominatim_client.host_latency_ewma_ms("http://geo.test/") is None
+
+    controller = nominatim_client._host_controller("http://geo.test")
+    controller.release(controller.acquire() - 0.2, overloaded=False)
+
+    latency = nominatim_client.host_latency_ewma_ms("http://geo.test/")
+    assert latency is not None and latency >= 200
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+from pipeline_service.infrastructure.cache import SqliteCacheStore
+from pipeline_service.infrastructure.geo import nominatim_client
+from pipeline_service.infrastructure.geo.geocode_cache import GeocodeCache
+
+_HIT = {"result": {"lat": 43.4, "lon": 77.6, "display_name": "Тургень", "raw": {}}, "first_candidate": None, "error": None}
+_MISS = {"result": None, "first_candidate": None, "error": None}
+
+
+def test_geocode_cache_persists_across_instances_and_normalizes_query(tmp_path: Path) -> None:
+    path = tmp_path / "geocode.sqlite3"
+    first = GeocodeCache(SqliteCacheStore(path, namespace="geocode"), ttl_s=60, negative_ttl_s=60)
+    first.put("Тургень,  Казахстан", "KZ", _HIT)
+
+    second = GeocodeCache(SqliteCacheStore(path, namespace="geocode"), ttl_s=60, negative_ttl_s=60)
+
+    assert second.get("тургень, казахстан", "kz") == _HIT
+    assert second.get("Алматы, Казахстан", "kz") is None
+    assert second.stats()["hits"] == 1
+    assert second.stats()["misses"] == 1
+
+
+def test_geocode_cache_negative_ttl_and_errors(tmp_path: Path) -> None:
+    cache = GeocodeCache(SqliteCacheStore(tmp_path / "geo.sqlite3", namespace="geocode"), ttl_s=60, negative_ttl_s=0.05)
+    cache.put("nowhere", "kz", _MISS)
+    cache.put("broken", "kz", {"result": None, "first_candidate": None, "error": "HTTPError: 500"})
+
+    assert cache.get("nowhere", "kz") == _MISS
+    assert cache.get("broken", "kz") is None
+    time.sleep(0.1)
+    assert cache.get("nowhere", "kz") is None
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_uncapped_store_sweeps_expired_rows_on_writes(tmp_path: Path) -> None:
+    path = tmp_path / "geo.sqlite3"
+    cache = GeocodeCache(SqliteCacheStore(path, namespace="geocode"), ttl_s=60, negative_ttl_s=0.05)
+    for idx in range(50):
+        cache.put(f"nowhere {idx}", "kz", _MISS)
+    time.sleep(0.1)
+    for idx in range(50):
+        cache.put(f"somewhere {idx}", "kz", _HIT)
+
+    with sqlite3.connect(path) as conn:
+        keys = [row[0] for row in conn.execute("SELECT key FROM geocode")]
+    assert len(keys) == 50
+    assert all("somewhere" in key for key in keys)
+
+
+def test_nominatim_client_serves_repeated_queries_from_cache(tmp_path: Path, monkeypatch) -> None:
+    calls: list[dict] = []
+
+    class _Response:
+        def raise_for_status(self) -> None:
+            pass
+
+        def json(self):
+            return [{"lat": "43.4", "lon": "77.6", "display_name": "Тургень", "address": {"country_code": "kz"}}]
+
+    def _fake_get(url, params, headers, timeout):
+        calls.append(params)
+        return _Response()
+
+    cache = GeocodeCache(SqliteCacheStore(tmp_path / "geo.sqlite3", namespace="geocode"), ttl_s=60, negative_ttl_s=60)
+    monkeypatch.setattr(nominatim_client, "get_geocode_cache", lambda: cache)
+    monkeypatch.setattr(nominatim_client._SESSION, "get", _fake_get)
+
+    client = nominatim_client.NominatimClient("http://geo", "test", timeout_s=1.0)
+    first = client.geocode_detailed("Тургень, Казахстан")
+    slower_client = nominatim_client.NominatimClient("http://geo", "test", timeout_s=5.0)
+    second = slower_client.geocode_detailed("тургень,  казахстан")
+
+    assert first["result"]["lat"] == 43.4
+    assert second == first
+    assert len(calls) == 1
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pipeline_service.application.nodes import get_language
+
+
+class _FakeFastText:
+    def __init__(self) -> None:
+        self.calls: list[object] = []
+
+    def predict(self, text, k=1):
+        self.calls.append(text)
+        predictions = {
+            "привет мир": ("__label__ru", 0.95),
+            "hello world": ("__label__en", 0.91),
+            "сәлем әлем": ("__label__kk", 0.88),
+            "bonjour": ("__label__fr", 0.99),
+            "???": ("__label__en", 0.2),
+        }
+        if isinstance(text, list):
+            labels = [[predictions[item][0]] for item in text]
+            scores = [[predictions[item][1]] for item in text]
+            return labels, scores
+        label, score = predictions[text]
+        return [label], [score]
+
+
+def test_detect_many_predicts_whole_batch_in_one_call(monkeypatch) -> None:
+    model = _FakeFastText()
+    monkeypatch.setattr(get_language, "_FASTTEXT_MODEL", model)
+
+    result = get_language.detect_many(["Привет   мир", "", "Hello\nworld", "Сәлем әлем", "Bonjour", "???"])
+
+    assert result == ["RU", "RU", "ENG", "KZ", "RU", "RU"]
+    assert len(model.calls) == 1
+
+
+def test_detect_many_matches_single_ticket_run(monkeypatch) -> None:
+    monkeypatch.setattr(get_language, "_FASTTEXT_MODEL", _FakeFastText())
+    texts = ["Hello world", "Сәлем әлем"]
+
+    batch = get_language.detect_many(texts)
+    single = [get_language.run({"raw_text": text})["language"] for text in texts]
+
+    assert batch == single
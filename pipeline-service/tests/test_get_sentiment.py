@@ -28,3 +28,26 @@ def test_get_sentiment_local_model_positive_text() -> None:
     elapsed_ms = (time.perf_counter() - started_at) * 1000
     print(f"[get_sentiment] raw_text={raw_text!r} result={result} latency_ms={elapsed_ms:.2f}")
     assert result["sentiment"] in {"Негативный", "Нейтральный", "Позитивный"}
+
+
+def test_classify_many_keeps_original_order_and_skips_empty(monkeypatch) -> None:
+    calls: list[list[str]] = []
+
+    def _fake_infer_many(texts: list[str]) -> list[dict[str, object]]:
+        calls.append(list(texts))
+        return [{"label": "negative" if "ужас" in text.lower() else "positive", "score": 0.9} for text in texts]
+
+    monkeypatch.setattr(get_sentiment, "_infer_text_classification_many", _fake_infer_many)
+
+    result = get_sentiment.classify_many(["Ужасно", "", "Спасибо", "Ужасно"])
+
+    assert result == ["Негативный", "Нейтральный", "Позитивный", "Негативный"]
+    assert calls == [["Ужасно", "Спасибо"]]
+
+
+def test_length_buckets_groups_similar_lengths() -> None:
+    from pipeline_service.infrastructure.batching import length_buckets
+
+    buckets = length_buckets([5, 1, 9, 2, 7], bucket_size=2)
+
+    assert buckets == [[1, 3], [0, 4], [2]]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pipeline_service.infrastructure.cache import InferenceCache, MemoryCacheStore, SqliteCacheStore, open_cache_store
+from pipeline_service.infrastructure.cache.inference_cache import model_fingerprint
+
+
+def test_inference_cache_skips_seen_texts_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "inference.sqlite3"
+    calls: list[list[str]] = []
+
+    def _infer_many(texts: list[str]) -> list[dict[str, str]]:
+        calls.append(list(texts))
+        return [{"label": text.upper()} for text in texts]
+
+    first = InferenceCache(SqliteCacheStore(path, namespace="inference"), "type:abc")
+    assert first.resolve_many(["a", "b", "a"], _infer_many) == [{"label": "A"}, {"label": "B"}, {"label": "A"}]
+
+    second = InferenceCache(SqliteCacheStore(path, namespace="inference"), "type:abc")
+    assert second.resolve_many([" a ", "c"], _infer_many) == [{"label": "A"}, {"label": "C"}]
+    assert calls == [["a", "b"], ["c"]]
+    assert second.stats() == {"model": "type:abc", "hits": 1, "misses": 1, "writes": 1}
+
+    other_version = InferenceCache(SqliteCacheStore(path, namespace="inference"), "type:def")
+    assert other_version.get("a") is None
+
+
+def test_model_fingerprint_changes_with_file_content(tmp_path: Path) -> None:
+    weights = tmp_path / "model.safetensors"
+    weights.write_bytes(b"v1")
+    first = model_fingerprint([weights, tmp_path / "missing.bin"])
+
+    weights.write_bytes(b"v2-longer")
+    assert model_fingerprint([weights]) != first
+
+
+def test_open_cache_store_falls_back_to_memory(tmp_path: Path) -> None:
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+
+    assert isinstance(open_cache_store(str(tmp_path / "ok.sqlite3"), namespace="ocr", max_mb=1), SqliteCacheStore)
+    assert isinstance(open_cache_store(str(blocker / "cache.sqlite3"), namespace="ocr"), MemoryCacheStore)
+    assert isinstance(open_cache_store(None, namespace="ocr"), MemoryCacheStore)
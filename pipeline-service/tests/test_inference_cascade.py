@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pipeline_service.infrastructure.cascade import InferenceCascade, KeywordScorer, get_cascade_stats
+
+_RULES = {
+    "fraud": (("мошенн", 2.0), ("украли", 1.5)),
+    "consultation": (("подскажите", 1.5),),
+}
+
+
+def test_keyword_scorer_confidence_drops_with_competing_labels() -> None:
+    scorer = KeywordScorer(_RULES)
+
+    label, confidence = scorer("Мошенники украли деньги")
+    assert label == "fraud"
+    assert confidence > 0.7
+
+    label, confidence = scorer("Подскажите, это мошенники?")
+    assert label == "fraud"
+    assert confidence < 0.5
+
+    assert scorer("Добрый день") == (None, 0.0)
+
+
+def test_cascade_escalates_only_ambiguous_texts_and_tracks_stats() -> None:
+    model_calls: list[list[str]] = []
+
+    def _model_many(texts: list[str]) -> list[str]:
+        model_calls.append(list(texts))
+        return ["model" for _ in texts]
+
+    cascade = InferenceCascade("test-escalation", KeywordScorer(_RULES), threshold=0.7)
+    texts = ["Мошенники украли деньги", "Добрый день", "Подскажите, это мошенники?"]
+
+    labels = cascade.classify_many(texts, _model_many)
+
+    assert labels == ["fraud", "model", "model"]
+    assert model_calls == [["Добрый день", "Подскажите, это мошенники?"]]
+    stats = cascade.stats()
+    assert (stats["total"], stats["fast_hits"], stats["escalated"]) == (3, 1, 2)
+    assert stats["agreement_rate"] is None
+    assert any(item["name"] == "test-escalation" for item in get_cascade_stats())
+
+
+def test_cascade_audits_fast_hits_for_agreement() -> None:
+    cascade = InferenceCascade("test-audit", KeywordScorer(_RULES), threshold=0.7, audit_rate=1.0)
+
+    labels = cascade.classify_many(
+        ["Мошенники украли деньги", "Мошенники украли карту"],
+        lambda texts: ["fraud", "consultation"][: len(texts)],
+    )
+
+    assert labels == ["fraud", "fraud"]
+    stats = cascade.stats()
+    assert stats["audited"] == 2
+    assert stats["agreement_rate"] == 0.5
+
+
+def test_disabled_cascade_always_uses_model() -> None:
+    cascade = InferenceCascade("test-disabled", KeywordScorer(_RULES), threshold=0.7, enabled=False)
+
+    assert cascade.classify("Мошенники украли деньги", lambda text: "model") == "model"
+    assert cascade.stats()["fast_hits"] == 0
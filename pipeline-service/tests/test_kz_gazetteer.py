@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import pytest
+
+from pipeline_service.application.nodes import get_geo_data
+from pipeline_service.infrastructure.geo import nominatim_client
+from pipeline_service.infrastructure.geo.kz_gazetteer import KzGazetteer, normalize_place_name
+
+
+def test_normalize_place_name_strips_prefixes_and_yo() -> None:
+    assert normalize_place_name("г. Усть-Каменогорск") == "усть каменогорск"
+    assert normalize_place_name("пос. Щучинск") == "щучинск"
+    assert normalize_place_name("Сёлок") == "селок"
+
+
+@pytest.mark.parametrize(
+    ("name", "expected", "match"),
+    [
+        ("Алматы", "Алматы", "exact"),
+        ("Nur-Sultan", "Астана", "exact"),
+        ("Өскемен", "Усть-Каменогорск", "exact"),
+        ("г. Караганда", "Караганда", "exact"),
+        ("Петропавл.", "Петропавловск", "exact"),
+        ("Талдыкор", "Талдыкорган", "prefix"),
+        ("Караганды", "Караганда", "fuzzy"),
+    ],
+)
+def test_lookup_resolves_aliases(name: str, expected: str, match: str) -> None:
+    found = KzGazetteer().lookup(name)
+
+    assert found is not None
+    assert found.locality.name == expected
+    assert found.match == match
+
+
+def test_lookup_rejects_unknown_names() -> None:
+    gazetteer = KzGazetteer()
+
+    assert gazetteer.lookup("Лондон") is None
+    assert gazetteer.lookup("") is None
+
+
+def test_lookup_region_accepts_short_forms() -> None:
+    gazetteer = KzGazetteer()
+
+    assert gazetteer.lookup_region("ВКО").locality.name == "Восточно-Казахстанская область"
+    assert gazetteer.lookup_region("Алматинская обл.").locality.name == "Алматинская область"
+
+
+def test_geo_node_resolves_city_without_network(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "1")
+    monkeypatch.setenv("GEO_USE_LLM_NORMALIZATION", "0")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("gazetteer hit must not reach Nominatim")
+
+    monkeypatch.setattr(nominatim_client.NominatimClient, "geocode_detailed", fail)
+
+    out = get_geo_data.run({"country": "KZ", "region": "Алматинская", "city": "Тургень"})
+
+    assert out["geo_result"]["status"] == "ok"
+    assert out["geo_result"]["source"] == "gazetteer_locality"
+    assert out["geo_result"]["lat"] == pytest.approx(43.4)
+
+
+def test_geo_node_falls_back_to_gazetteer_when_nominatim_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "1")
+    monkeypatch.setenv("GEO_USE_LLM_NORMALIZATION", "0")
+    calls: list[str] = []
+
+    def miss(self, query: str, country_codes: str = "kz"):
+        calls.append(query)
+        return {"result": None, "first_candidate": None, "error": None}
+
+    monkeypatch.setattr(nominatim_client.NominatimClient, "geocode_detailed", miss)
+
+    out = get_geo_data.run({"country": "KZ", "city": "Караганда", "street": "Ерубаева", "house": "1"})
+
+    assert calls
+    assert out["geo_result"]["source"] == "gazetteer_locality"
+    assert out["geo_result"]["matched_name"] == "Караганда"
+
+
+def test_geo_node_uses_gazetteer_instead_of_stub_when_geocoder_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "0")
+
+    out = get_geo_data.run({"country": "KZ", "city": "Актобе", "street": "Абая", "house": "5"})
+
+    assert out["geo_result"]["source"] == "gazetteer_locality"
+    assert out["geo_result"]["lat"] == pytest.approx(50.2839)
+
+    monkeypatch.setenv("GEO_GAZETTEER_ENABLED", "0")
+    assert get_geo_data.run({"country": "KZ", "city": "Актобе"})["geo_result"]["source"] == "stub_almaty"
+
+
+@pytest.mark.parametrize(
+    ("name", "region"),
+    [
+        ("Темир", "Актюбинская"),
+        ("Актас", "Карагандинская"),
+        ("Кызыл", "Карагандинская"),
+    ],
+)
+def test_lookup_rejects_candidates_from_another_region(name: str, region: str) -> None:
+    assert KzGazetteer().lookup(name, region=region) is None
+
+
+def test_lookup_keeps_partial_match_inside_named_region() -> None:
+    found = KzGazetteer().lookup("Караганды", region="Карагандинская")
+
+    assert found is not None
+    assert found.locality.name == "Караганда"
+
+
+def test_geo_node_queries_nominatim_for_region_conflicts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "1")
+    monkeypatch.setenv("GEO_USE_LLM_NORMALIZATION", "0")
+    calls: list[str] = []
+
+    def hit(self, query: str, country_codes: str = "kz"):
+        calls.append(query)
+        return {"result": {"lat": 50.3, "lon": 57.2, "display_name": query, "raw": {}}, "first_candidate": None, "error": None}
+
+    monkeypatch.setattr(nominatim_client.NominatimClient, "geocode_detailed", hit)
+
+    out = get_geo_data.run({"country": "KZ", "region": "Актюбинская", "city": "Темир"})
+
+    assert calls
+    assert out["geo_result"]["source"].startswith("nominatim")
+    assert out["geo_result"]["lat"] == pytest.approx(50.3)
+
+
+def test_geo_node_uses_partial_match_only_as_query_hint(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "1")
+    monkeypatch.setenv("GEO_USE_LLM_NORMALIZATION", "0")
+    calls: list[str] = []
+
+    def miss(self, query: str, country_codes: str = "kz"):
+        calls.append(query)
+        return {"result": None, "first_candidate": None, "error": None}
+
+    monkeypatch.setattr(nominatim_client.NominatimClient, "geocode_detailed", miss)
+
+    out = get_geo_data.run({"country": "KZ", "region": "Карагандинская", "city": "Караганды"})
+
+    assert "Караганда, Карагандинская, Казахстан" in calls
+    assert out["geo_result"]["status"] == "fallback_5050"
+
+
+@pytest.mark.parametrize(
+    ("region", "city", "expected"),
+    [
+        # Region/city pairs as they appear in docs/tickets.csv.
+        ("г. Алматы", "Алматы", "Алматы"),
+        ("г. Шымкент", "Шымкент", "Шымкент"),
+        ("Алматинская", "Тургень", "Тургень"),
+        ("Костанайская", "Костанай", "Костанай"),
+        ("Карагандинская", "Караганда", "Караганда"),
+        ("Восточно-Казахстанская", "Усть-Каменогорск", "Усть-Каменогорск"),
+        ("Mangystau obl.", "Aktau", "Актау"),
+        ("Алматинская", "Алматы", "Алматы"),
+        ("Акмолинская", "Астана", "Астана"),
+    ],
+)
+def test_lookup_resolves_ticket_locations(region: str, city: str, expected: str) -> None:
+    found = KzGazetteer().lookup(city, region=region)
+
+    assert found is not None
+    assert found.locality.name == expected
+    assert found.match == "exact"
+
+
+def test_lookup_region_reads_city_prefix_as_the_city() -> None:
+    gazetteer = KzGazetteer()
+
+    assert gazetteer.lookup_region("г. Алматы").locality.name == "Алматы"
+    assert gazetteer.lookup_region("Алматы облысы").locality.name == "Алматинская область"
+    assert gazetteer.lookup("Темиртау", region="г. Караганда").locality.name == "Темиртау"
+
+
+def test_geo_node_places_city_of_republican_significance_without_geocoder(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GEOCODER_ENABLED", "0")
+
+    out = get_geo_data.run({"country": "KZ", "region": "г. Алматы", "city": "Алматы"})
+    assert out["geo_result"]["source"] == "gazetteer_locality"
+    assert out["geo_result"]["lat"] == pytest.approx(43.238949)
+
+    out = get_geo_data.run({"country": "KZ", "region": "Акмолинская", "city": "Астана"})
+    assert out["geo_result"]["source"] == "gazetteer_locality"
+    assert out["geo_result"]["lat"] == pytest.approx(51.1694)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import threading
+import time
+
+from pipeline_service.infrastructure.cache import MemoryCacheStore
+from pipeline_service.infrastructure.llm import ollama_client
+from pipeline_service.infrastructure.llm.prompt_cache import PromptCache, SingleFlight, prompt_key
+
+
+def test_single_flight_collapses_concurrent_calls() -> None:
+    flight = SingleFlight()
+    calls: list[str] = []
+    results: list[str] = []
+
+    def _slow() -> str:
+        calls.append("call")
+        time.sleep(0.1)
+        return "answer"
+
+    threads = [threading.Thread(target=lambda: results.append(flight.run("key", _slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["call"]
+    assert results == ["answer"] * 5
+
+
+def test_single_flight_collapses_concurrent_async_calls() -> None:
+    flight = SingleFlight()
+    calls: list[str] = []
+
+    async def _slow() -> str:
+        calls.append("call")
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def _main() -> list[str]:
+        return await asyncio.gather(*(flight.arun("key", _slow) for _ in range(5)))
+
+    assert asyncio.run(_main()) == ["answer"] * 5
+    assert calls == ["call"]
+
+
+def test_prompt_key_covers_model_and_options() -> None:
+    assert prompt_key("m", {"num_predict": 96}, "p") == prompt_key("m", {"num_predict": 96}, "p")
+    assert prompt_key("m", {"num_predict": 96}, "p") != prompt_key("m", {"num_predict": 32}, "p")
+    assert prompt_key("m", None, "p") != prompt_key("other", None, "p")
+
+
+def test_ollama_client_serves_repeated_prompts_from_cache(monkeypatch) -> None:
+    posts: list[dict] = []
+
+    class _Response:
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict[str, str]:
+            return {"response": "Алматы, улица Абая 10"}
+
+    def _post(url: str, json: dict, timeout: int) -> _Response:
+        posts.append(json)
+        return _Response()
+
+    cache = PromptCache(MemoryCacheStore(), ttl_s=None)
+    monkeypatch.setattr(ollama_client, "get_prompt_cache", lambda: cache)
+    monkeypatch.setattr(ollama_client._SESSION, "post", _post)
+
+    client = ollama_client.OllamaClient()
+    client._settings = dataclasses.replace(client._settings, mock_llm=False)
+
+    assert client.generate("normalize: Абая 10") == "Алматы, улица Абая 10"
+    assert client.generate("normalize: Абая 10") == "Алматы, улица Абая 10"
+    assert len(posts) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1}
+
+
+def test_generate_first_line_stops_reading_the_stream(monkeypatch) -> None:
+    chunks = ["\n", "Алматы,", " улица Абая 10", "\nПояснение", ": адрес", " нормализован"]
+    consumed: list[str] = []
+    payloads: list[dict] = []
+
+    class _StreamResponse:
+        closed = False
+
+        def __enter__(self) -> "_StreamResponse":
+            return self
+
+        def __exit__(self, *exc: object) -> None:
+            self.closed = True
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def iter_lines(self):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield json.dumps({"response": chunk, "done": False}).encode("utf-8")
+            yield json.dumps({"response": "", "done": True}).encode("utf-8")
+
+    response = _StreamResponse()
+
+    def _post(url: str, json: dict, timeout: int, stream: bool) -> _StreamResponse:
+        payloads.append(json)
+        return response
+
+    monkeypatch.setattr(ollama_client, "get_prompt_cache", lambda: PromptCache(MemoryCacheStore(), ttl_s=None))
+    monkeypatch.setattr(ollama_client._SESSION, "post", _post)
+
+    client = ollama_client.OllamaClient()
+    client._settings = dataclasses.replace(client._settings, mock_llm=False)
+
+    assert client.generate_first_line("normalize") == "Алматы, улица Абая 10"
+    assert consumed == chunks[:4]
+    assert response.closed
+    assert payloads[0]["stream"] is True
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+
+from pipeline_service.infrastructure.batching import MicroBatcher
+
+
+def test_micro_batcher_groups_concurrent_requests_and_keeps_results_per_caller() -> None:
+    batch_sizes: list[int] = []
+
+    def _double(items: list[int]) -> list[int]:
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(_double, max_batch_size=8, max_wait_ms=50)
+    results: dict[int, int] = {}
+    barrier = threading.Barrier(8)
+
+    def _worker(value: int) -> None:
+        barrier.wait()
+        results[value] = batcher.run(value)
+
+    threads = [threading.Thread(target=_worker, args=(value,)) for value in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {value: value * 2 for value in range(8)}
+    assert sum(batch_sizes) == 8
+    assert len(batch_sizes) < 8
+
+
+def test_micro_batcher_propagates_batch_errors_to_every_caller() -> None:
+    def _fail(items: list[str]) -> list[str]:
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(_fail, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit("text")
+
+    try:
+        future.result(timeout=2)
+        assert False, "Expected RuntimeError"
+    except RuntimeError as exc:
+        assert "model unavailable" in str(exc)
@@ -12,6 +12,9 @@ class _FakeClient:
     def extract_text(self, image_path: str) -> str:
         return "ORDER ERROR" if Path(image_path).exists() else ""
 
+    def extract_text_from_bytes(self, data: bytes, source: str = "<bytes>") -> str:
+        return "ORDER ERROR" if data else ""
+
 
 def _create_test_image(path: Path) -> None:
     image = Image.new("RGB", (320, 90), color="white")
@@ -64,3 +67,60 @@ def test_graph_smoke_with_ocr_attachment(tmp_path: Path, monkeypatch) -> None:
     assert result["extracted_text"].strip() != ""
     assert "enriched_text" in result
     assert "[OCR]" in result["enriched_text"]
+
+
+def test_extract_ocr_text_serves_repeated_attachments_from_cache(tmp_path: Path, monkeypatch) -> None:
+    from pipeline_service.infrastructure.cache import SqliteCacheStore
+    from pipeline_service.infrastructure.ocr import OcrCache
+
+    first_path = tmp_path / "first.png"
+    _create_test_image(first_path)
+    duplicate_path = tmp_path / "duplicate.png"
+    duplicate_path.write_bytes(first_path.read_bytes())
+
+    calls: list[str] = []
+
+    class _CountingClient(_FakeClient):
+        def extract_text_from_bytes(self, data: bytes, source: str = "<bytes>") -> str:
+            calls.append(source)
+            return super().extract_text_from_bytes(data, source)
+
+    cache = OcrCache(SqliteCacheStore(tmp_path / "ocr.sqlite3", namespace="ocr"), "paddleocr-test")
+    monkeypatch.setattr(extract_ocr_text, "get_ocr_cache", lambda: cache)
+    monkeypatch.setattr(extract_ocr_text, "_get_ocr_client", lambda lang: _CountingClient())
+
+    first = extract_ocr_text.run({"ticket_id": "OCR-2", "attachments": str(first_path), "errors": []})
+    second = extract_ocr_text.run({"ticket_id": "OCR-3", "attachments": str(duplicate_path), "errors": []})
+
+    assert first["extracted_text"] == second["extracted_text"] != ""
+    assert calls == [str(first_path)]
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1}
+
+
+def test_extract_ocr_text_caches_llm_cleanup_only_when_rewrite_succeeds(tmp_path: Path, monkeypatch) -> None:
+    from pipeline_service.application.services import ocr_cleanup
+    from pipeline_service.infrastructure.cache import SqliteCacheStore
+    from pipeline_service.infrastructure.ocr import OcrCache
+
+    image_path = tmp_path / "order_error.png"
+    _create_test_image(image_path)
+    rewrites: list[str] = []
+
+    def _rewrite(text: str) -> str:
+        rewrites.append(text)
+        return "" if len(rewrites) == 1 else "Ошибка при выставлении ордера."
+
+    cache = OcrCache(SqliteCacheStore(tmp_path / "ocr.sqlite3", namespace="ocr"), "paddleocr-test")
+    monkeypatch.setenv("OCR_CLEAN_WITH_LLM", "1")
+    monkeypatch.setattr(ocr_cleanup, "_llm_rewrite", _rewrite)
+    monkeypatch.setattr(extract_ocr_text, "get_ocr_cache", lambda: cache)
+    monkeypatch.setattr(extract_ocr_text, "_get_ocr_client", lambda lang: _FakeClient())
+
+    state = {"ticket_id": "OCR-4", "attachments": str(image_path), "errors": []}
+    fallback = extract_ocr_text.run(state)
+    rewritten = extract_ocr_text.run(state)
+    cached = extract_ocr_text.run(state)
+
+    assert fallback["extracted_text"] == "ORDER ERROR"
+    assert rewritten["extracted_text"] == cached["extracted_text"] == "Ошибка при выставлении ордера."
+    assert len(rewrites) == 2
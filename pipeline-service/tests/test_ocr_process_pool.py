@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pipeline_service.application.nodes import extract_ocr_text
+from pipeline_service.infrastructure.ocr import OcrProcessPool, PooledOcrClient
+
+
+def test_process_pool_runs_jobs_in_worker_processes(tmp_path: Path) -> None:
+    pool = OcrProcessPool(workers=1, langs=(), timeout_s=60)
+    try:
+        # Not an image: the worker rejects it and the pool reports no text.
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        assert pool.extract_text("ru", image_path=str(broken)) == ""
+        assert pool.extract_text("ru", data=b"not an image") == ""
+        assert pool.submit("ru", image_path=str(tmp_path / "missing.png")).result(timeout=60) == ""
+    finally:
+        pool.shutdown()
+
+
+def test_node_uses_process_pool_when_workers_configured(monkeypatch) -> None:
+    monkeypatch.setattr(extract_ocr_text, "OCR_PROCESS_WORKERS", 2)
+    monkeypatch.setattr(extract_ocr_text, "_OCR_CLIENTS", {})
+    pools: list[tuple[int, tuple[str, ...], float]] = []
+
+    def _fake_pool(workers: int, langs: tuple[str, ...], timeout_s: float) -> OcrProcessPool:
+        pools.append((workers, langs, timeout_s))
+        return OcrProcessPool(workers, langs, timeout_s)
+
+    monkeypatch.setattr(extract_ocr_text, "get_ocr_process_pool", _fake_pool)
+    monkeypatch.setenv("OCR_PRELOAD_LANGS", "ru, en, ru")
+
+    client = extract_ocr_text._get_ocr_client("ru")
+
+    assert isinstance(client, PooledOcrClient)
+    assert extract_ocr_text._get_ocr_client("ru") is client
+    assert pools == [(2, ("ru", "en"), extract_ocr_text.OCR_TIMEOUT_SECONDS)]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+import time
+from typing import Callable
+
+import pytest
+from PIL import Image, ImageDraw
+
+from pipeline_service.infrastructure.ocr import paddleocr_client
+from pipeline_service.infrastructure.ocr.paddleocr_client import PaddleOcrClient
+
+
+class _FakeEngine:
+    def __init__(self, answers: dict[str, tuple[str, float]]) -> None:
+        self._answers = answers
+        self.calls: list[str] = []
+
+    def ocr(self, image: str, cls: bool = True):
+        # Variants are passed as their names instead of arrays.
+        name = image
+        self.calls.append(name)
+        if name != "original":
+            time.sleep(0.05)
+        text, confidence = self._answers.get(name, ("", 0.0))
+        return [[[[[0, 0]], (text, confidence)]]] if text else [[]]
+
+
+def _client(engine: _FakeEngine) -> PaddleOcrClient:
+    client = PaddleOcrClient()
+    client._get_engine = lambda: engine  # type: ignore[method-assign]
+    return client
+
+
+def _variants(names: list[str], built: list[str] | None = None) -> list[tuple[str, Callable[[], str]]]:
+    def _builder(name: str) -> Callable[[], str]:
+        def _build() -> str:
+            if built is not None:
+                built.append(name)
+            return name
+
+        return _build
+
+    return [(name, _builder(name)) for name in names]
+
+
+def test_confident_original_skips_remaining_variants() -> None:
+    engine = _FakeEngine({"original": ("ORDER 12345 ERROR", 0.97), "otsu": ("ORDER 12345 ERROR TEXT", 0.6)})
+    variants = _variants(["original", "upscaled", "otsu", "adaptive", "inverted", "rotated"])
+
+    text, winner, ran = _client(engine)._run_variants(variants)
+
+    assert (text, winner) == ("ORDER 12345 ERROR", "original")
+    assert ran == ["original"]
+    assert "rotated" not in engine.calls
+
+
+def test_skipped_variants_are_never_built() -> None:
+    engine = _FakeEngine({"original": ("ORDER 12345 ERROR", 0.97)})
+    built: list[str] = []
+
+    _client(engine)._run_variants_inline(_variants(["original", "upscaled", "otsu", "rotated"], built))
+
+    assert built == ["original"]
+
+
+def test_longest_candidate_wins_without_early_exit(monkeypatch) -> None:
+    monkeypatch.setattr(paddleocr_client, "OCR_EARLY_EXIT_CONFIDENCE", 1.1)
+    engine = _FakeEngine({"original": ("ORDER", 0.5), "otsu": ("ORDER ERROR", 0.7)})
+    variants = _variants(["original", "upscaled", "otsu"])
+
+    text, winner, ran = _client(engine)._run_variants(variants)
+
+    assert (text, winner) == ("ORDER ERROR", "otsu")
+    assert sorted(ran) == ["original", "otsu", "upscaled"]
+
+
+def test_inline_client_runs_variants_on_the_calling_thread() -> None:
+    import threading
+
+    threads: list[str] = []
+    engine = _FakeEngine({"original": ("ORDER", 0.5), "otsu": ("ORDER 12345 ERROR", 0.95)})
+    client = PaddleOcrClient(inline_variants=True)
+
+    def _engine():
+        threads.append(threading.current_thread().name)
+        return engine
+
+    client._get_engine = _engine  # type: ignore[method-assign]
+
+    text, winner, ran = client._run_variants(_variants(["original", "upscaled", "otsu", "adaptive"]))
+
+    assert (text, winner) == ("ORDER 12345 ERROR", "otsu")
+    assert ran == ["original", "upscaled", "otsu"]
+    assert set(threads) == {threading.current_thread().name}
+
+
+def _image_bytes(fmt: str) -> bytes:
+    image = Image.new("RGB", (160, 48), color="white")
+    ImageDraw.Draw(image).text((8, 16), "ORDER ERROR", fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_decode_rejects_non_images() -> None:
+    assert PaddleOcrClient._decode(b"not an image") is None
+    assert PaddleOcrClient._decode(_image_bytes("PNG")[:32]) is None
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "GIF"])
+def test_extract_text_from_real_image_bytes(fmt: str, monkeypatch) -> None:
+    pytest.importorskip("cv2")
+    shapes: list[tuple[int, ...]] = []
+
+    class _ShapeEngine:
+        def ocr(self, image, cls: bool = True):
+            shapes.append(tuple(image.shape))
+            return [[[[[0, 0]], ("ORDER ERROR", 0.95)]]]
+
+    monkeypatch.setattr(paddleocr_client, "OCR_EARLY_EXIT_CONFIDENCE", 1.1)
+    monkeypatch.setenv("OCR_VARIANTS", "upscaled,rotated")
+    client = PaddleOcrClient(inline_variants=True)
+    client._get_engine = lambda: _ShapeEngine()  # type: ignore[method-assign]
+    client._engine_available = lambda: True  # type: ignore[method-assign]
+
+    decoded = PaddleOcrClient._decode(_image_bytes(fmt))
+    text = client.extract_text_from_bytes(_image_bytes(fmt), source=f"order.{fmt.lower()}")
+
+    assert decoded is not None and decoded.shape == (48, 160, 3)
+    assert text == "ORDER ERROR"
+    assert shapes == [(48, 160, 3), (96, 320), (320, 96)]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from pipeline_service.infrastructure.onnx_runtime import session
+
+
+def test_onnx_model_file_prefers_int8_export(tmp_path: Path, monkeypatch) -> None:
+    assert session.onnx_model_file(tmp_path) is None
+
+    onnx_dir = tmp_path / session.ONNX_SUBDIR
+    onnx_dir.mkdir()
+    (onnx_dir / session.ONNX_FP32_FILE).write_bytes(b"")
+    assert session.onnx_model_file(tmp_path) == onnx_dir / session.ONNX_FP32_FILE
+
+    (onnx_dir / session.ONNX_INT8_FILE).write_bytes(b"")
+    monkeypatch.setattr(session, "ONNX_PREFER_INT8", True)
+    assert session.onnx_model_file(tmp_path) == onnx_dir / session.ONNX_INT8_FILE
+    monkeypatch.setattr(session, "ONNX_PREFER_INT8", False)
+    assert session.onnx_model_file(tmp_path) == onnx_dir / session.ONNX_FP32_FILE
+
+
+def test_load_onnx_classifier_reports_missing_export(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="export_onnx"):
+        session.load_onnx_classifier(tmp_path)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline_service.application.nodes import persist
+from pipeline_service.infrastructure.persistence import ConnectionPool
+from pipeline_service.infrastructure.persistence.repository import PostgresTicketRepository
+from pipeline_service.settings import get_settings
+
+
+class _FakeCursor:
+    def __init__(self, conn: "_FakeConnection") -> None:
+        self._conn = conn
+        self._rows: list[tuple[int, object]] = []
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def execute(self, sql: str, params: list[object]) -> None:
+        self._conn.statements.append((sql, params))
+        rows = sql.count("::jsonb, %s, %s, %s::jsonb")
+        width = len(params) // rows
+        self._rows = [(self._conn.next_id + idx, params[idx * width]) for idx in range(rows)]
+        self._conn.next_id += rows
+        # RETURNING order is not guaranteed; hand rows back reversed to prove ids are matched by key.
+        self._rows.reverse()
+
+    def fetchall(self) -> list[tuple[int, object]]:
+        return self._rows
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.closed = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.next_id = 1
+        self.statements: list[tuple[str, list[object]]] = []
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_pool_reuses_connections_and_caps_size() -> None:
+    opened: list[_FakeConnection] = []
+
+    def connect() -> _FakeConnection:
+        conn = _FakeConnection()
+        opened.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, max_size=2, acquire_timeout_s=0.05)
+    with pool.connection() as first:
+        with pool.connection() as second:
+            assert first is not second
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+    with pool.connection() as again:
+        assert again in (first, second)
+
+    assert len(opened) == 2
+    pool.close()
+    assert all(conn.closed for conn in opened)
+
+
+def test_pool_rolls_back_on_error() -> None:
+    conn = _FakeConnection()
+    pool = ConnectionPool(lambda: conn, max_size=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("boom")
+
+    assert conn.rollbacks == 1
+    with pool.connection() as reused:
+        assert reused is conn
+
+
+def test_postgres_save_many_uses_one_multi_row_insert() -> None:
+    conn = _FakeConnection()
+    repository = PostgresTicketRepository("postgresql://localhost/test")
+    repository._pool = ConnectionPool(lambda: conn, max_size=1)
+
+    ids = repository.save_many(
+        [{"ticket_id": "T-1", "priority": 3}, {"ticket_id": "T-2", "geo_result": "bad"}, {"ticket_id": "T-3"}]
+    )
+
+    assert ids == ["1", "2", "3"]
+    assert len(conn.statements) == 1
+    sql, params = conn.statements[0]
+    assert sql.strip().endswith("RETURNING id, external_ticket_id")
+    assert len(params) == 3 * 14
+    assert params[0] == "T-1" and params[5] == 3
+    assert params[14 + 9] == "{}"
+    assert conn.commits == 1
+
+
+def test_persist_node_groups_concurrent_saves(monkeypatch: pytest.MonkeyPatch) -> None:
+    batches: list[int] = []
+    lock = threading.Lock()
+
+    class _Repository:
+        def save(self, payload: dict[str, object]) -> str:
+            raise AssertionError("buffered persist must use save_many")
+
+        def save_many(self, payloads: list[dict[str, object]]) -> list[str]:
+            with lock:
+                batches.append(len(payloads))
+            return [f"id-{payload['ticket_id']}" for payload in payloads]
+
+    settings = dataclasses.replace(get_settings(), persist_batch_size=8, persist_flush_interval_ms=50)
+    monkeypatch.setattr(persist, "_repository", _Repository())
+    monkeypatch.setattr(persist, "get_settings", lambda: settings)
+    persist._get_batcher.cache_clear()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(persist.run, [{"ticket_id": str(idx)} for idx in range(8)]))
+    finally:
+        persist._get_batcher.cache_clear()
+
+    assert [result["persist_id"] for result in results] == [f"id-{idx}" for idx in range(8)]
+    assert sum(batches) == 8
+    assert len(batches) < 8
+
+
+def test_persist_node_isolates_a_bad_row_in_a_group(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Repository:
+        def save(self, payload: dict[str, object]) -> str:
+            if payload["ticket_id"] == "bad":
+                raise ValueError("value too long")
+            return f"id-{payload['ticket_id']}"
+
+        def save_many(self, payloads: list[dict[str, object]]) -> list[str]:
+            if any(payload["ticket_id"] == "bad" for payload in payloads):
+                raise ValueError("value too long")
+            return [self.save(payload) for payload in payloads]
+
+    settings = dataclasses.replace(get_settings(), persist_batch_size=4, persist_flush_interval_ms=200)
+    monkeypatch.setattr(persist, "_repository", _Repository())
+    monkeypatch.setattr(persist, "get_settings", lambda: settings)
+    persist._get_batcher.cache_clear()
+    try:
+        batcher = persist._get_batcher()
+        futures = [batcher.submit({"ticket_id": ticket_id}) for ticket_id in ("a", "bad", "b", "c")]
+    finally:
+        persist._get_batcher.cache_clear()
+
+    assert [futures[idx].result(timeout=5) for idx in (0, 2, 3)] == ["id-a", "id-b", "id-c"]
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+
+from pipeline_service.application.graph.batch_runner import BatchStage, LeaderMemory, TicketBatchRunner
+from pipeline_service.application.services.csv_ingestion_service import iter_tickets_from_csv
+from pipeline_service.application.services.ticket_dedup import TicketDeduplicator, hamming_distance, simhash
+
+_SPAM = "Вы выиграли бесплатно промокод казино! Переходите по ссылке и заберите приз сегодня"
+
+
+def _ticket(ticket_id: str, text: str, city: str = "Астана") -> dict[str, str]:
+    return {"ticket_id": ticket_id, "raw_text": text, "raw_address": f"Казахстан, {city}", "segment": "Mass"}
+
+
+def test_exact_duplicates_ignore_case_and_whitespace() -> None:
+    dedup = TicketDeduplicator()
+
+    first = dedup.assign(_ticket("a", "Не работает  приложение"))
+    second = dedup.assign(_ticket("b", " не работает приложение "))
+    other_city = dedup.assign(_ticket("c", "Не работает приложение", city="Алматы"))
+
+    assert "duplicate_of" not in first
+    assert second["duplicate_of"] == "a"
+    assert second["dedup_key"] == first["dedup_key"]
+    assert "duplicate_of" not in other_city
+
+
+def test_near_duplicates_cluster_only_when_enabled() -> None:
+    assert hamming_distance(simhash(_SPAM), simhash(_SPAM + "!!")) <= 3
+
+    exact_only = TicketDeduplicator()
+    exact_only.assign(_ticket("a", _SPAM))
+    assert "duplicate_of" not in exact_only.assign(_ticket("b", _SPAM + " сейчас"))
+
+    near = TicketDeduplicator(near_duplicates=True, max_distance=12)
+    leader = near.assign(_ticket("a", _SPAM))
+    member = near.assign(_ticket("b", _SPAM + " сейчас"))
+    unrelated = near.assign(_ticket("c", "Подскажите, как сменить номер телефона в приложении?"))
+
+    assert member["duplicate_of"] == "a"
+    assert member["dedup_key"] == leader["dedup_key"]
+    assert "duplicate_of" not in unrelated
+
+
+def test_csv_ingestion_tags_duplicates() -> None:
+    header = "GUID клиента,Пол клиента,Дата рождения,Описание,Вложения,Сегмент клиента,Страна,Область,Населённый пункт,Улица,Дом\n"
+    stream = io.StringIO(
+        header
+        + "id-1,Мужской,1990-01-01,Спам рассылка,,Mass,Казахстан,,Астана,,\n"
+        + "id-2,Женский,1991-01-01,Спам рассылка,,Mass,Казахстан,,Астана,,\n"
+    )
+
+    first, second = iter_tickets_from_csv(stream)
+
+    assert second["duplicate_of"] == "id-1"
+    assert second["dedup_key"] == first["dedup_key"]
+
+
+def test_batch_runner_enriches_each_cluster_once() -> None:
+    enriched: list[str] = []
+    persisted: list[str] = []
+
+    def _enrich(state):
+        enriched.append(state["ticket_id"])
+        return {"summary": f"summary of {state['ticket_id']}", "priority": 5}
+
+    def _persist(state):
+        persisted.append(state["ticket_id"])
+        return {"persist_id": f"p-{state['ticket_id']}"}
+
+    runner = TicketBatchRunner(
+        stages=[BatchStage("enrich", _enrich), BatchStage("persist", _persist, per_ticket=True)]
+    )
+    dedup = TicketDeduplicator()
+    tickets = [dedup.assign(_ticket(ticket_id, "Спам рассылка")) for ticket_id in ("a", "b", "c")]
+
+    leaders = LeaderMemory()
+    first = runner.run(tickets[:2], leaders)
+    later = runner.run(tickets[2:], leaders)
+
+    assert enriched == ["a"]
+    assert sorted(persisted) == ["a", "b", "c"]
+    by_id = {state["ticket_id"]: state for state in first.states + later.states}
+    assert by_id["b"]["summary"] == by_id["c"]["summary"] == "summary of a"
+    assert by_id["c"]["duplicate_of"] == "a"
+    assert by_id["c"]["persist_id"] == "p-c"
+
+
+def test_batch_runner_reruns_duplicates_of_failed_leader_in_full() -> None:
+    enriched: list[str] = []
+
+    def _enrich(state):
+        enriched.append(state["ticket_id"])
+        if state["ticket_id"] == "a":
+            raise RuntimeError("model down")
+        return {"summary": f"summary of {state['ticket_id']}"}
+
+    runner = TicketBatchRunner(stages=[BatchStage("enrich", _enrich)])
+    dedup = TicketDeduplicator()
+    tickets = [dedup.assign(_ticket(ticket_id, "Спам рассылка")) for ticket_id in ("a", "b")]
+
+    result = runner.run(tickets)
+
+    assert enriched == ["a", "b"]
+    assert [(failure["ticket_id"], failure["stage"]) for failure in result.failures] == [("a", "enrich")]
+    assert [(state["ticket_id"], state["summary"]) for state in result.states] == [("b", "summary of b")]
+
+
+def test_leader_memory_is_scoped_to_one_stream() -> None:
+    enriched: list[str] = []
+
+    def _enrich(state):
+        enriched.append(state["ticket_id"])
+        return {"summary": f"summary of {state['ticket_id']}"}
+
+    runner = TicketBatchRunner(stages=[BatchStage("enrich", _enrich)])
+    dedup = TicketDeduplicator()
+    tickets = [dedup.assign(_ticket(ticket_id, "Спам рассылка")) for ticket_id in ("a", "b", "c")]
+
+    list(runner.run_batches(tickets[:2], batch_size=1))
+    list(runner.run_batches(tickets[2:], batch_size=1))
+
+    # "b" reuses "a" within the stream; "c" arrives in another request and runs in full.
+    assert enriched == ["a", "c"]